@@ -0,0 +1,167 @@
+"""Local stand-in for the Message Batches API, for offline runs of claude.py --batch.
+
+Accepts batch creation, status and results requests the way the API does
+and answers every request with stub_chat.StubChat (header-only CSVs unless
+another responder is given). A batch stays in progress for `delay` seconds;
+a share of requests (`error_rate`) comes back errored so the synchronous
+fallback can be exercised.
+
+    python batch_server.py --port 8766 --delay 30
+    python claude.py --batch --batch-base-url http://127.0.0.1:8766
+
+claude.py --stub --batch starts one in-process, so no server is needed there.
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from stub_chat import StubChat
+
+CUSTOM_ID = re.compile(r'^[a-zA-Z0-9_-]{1,64}$')
+BATCH_PATH = re.compile(r'^/v1/messages/batches/([A-Za-z0-9_]+)(/results)?$')
+
+
+def _timestamp(seconds: float) -> str:
+    return datetime.fromtimestamp(seconds, timezone.utc).isoformat().replace('+00:00', 'Z')
+
+
+class StandInBatches:
+    """In-memory batches whose results are computed by a StubChat on creation"""
+
+    def __init__(self, chat: StubChat = None, delay: float = 5, error_rate: float = 0.0, seed: int = 1):
+        self.chat = chat or StubChat()
+        self.delay = delay
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.batches = {}
+        self.lock = threading.Lock()
+
+    def _respond(self, custom_id: str, params: dict) -> dict:
+        if self.random.random() < self.error_rate:
+            return {'custom_id': custom_id, 'result': {'type': 'errored', 'error': {
+                'type': 'error', 'error': {'type': 'api_error', 'message': 'Stand-in error'}}}}
+        messages = [SystemMessage(content=params.get('system', ''))]
+        messages += [HumanMessage(content=message['content']) for message in params['messages']]
+        response = self.chat.invoke(messages)
+        usage = response.usage_metadata
+        details = usage['input_token_details']
+        return {'custom_id': custom_id, 'result': {'type': 'succeeded', 'message': {
+            'id': f"msg_{uuid.uuid4().hex[:24]}", 'type': 'message', 'role': 'assistant',
+            'model': params.get('model') or self.chat.model,
+            'content': [{'type': 'text', 'text': response.content}],
+            'stop_reason': 'end_turn', 'stop_sequence': None,
+            'usage': {'input_tokens': usage['input_tokens'] - details['cache_read'] - details['cache_creation'],
+                      'cache_read_input_tokens': details['cache_read'],
+                      'cache_creation_input_tokens': details['cache_creation'],
+                      'output_tokens': usage['output_tokens']}}}}
+
+    def create(self, requests: list) -> str:
+        custom_ids = [request.get('custom_id', '') for request in requests]
+        if not requests or not all(CUSTOM_ID.match(custom_id) for custom_id in custom_ids):
+            raise ValueError("every request needs a custom_id matching ^[a-zA-Z0-9_-]{1,64}$")
+        if len(set(custom_ids)) != len(custom_ids):
+            raise ValueError("custom_id values must be unique within a batch")
+        with self.lock:
+            results = [self._respond(request['custom_id'], request['params']) for request in requests]
+            batch_id = f"msgbatch_{uuid.uuid4().hex[:24]}"
+            self.batches[batch_id] = {'created': time.time(), 'results': results}
+        return batch_id
+
+    def describe(self, batch_id: str, base_url: str) -> dict:
+        batch = self.batches[batch_id]
+        ended = time.time() - batch['created'] >= self.delay
+        errored = sum(1 for result in batch['results'] if result['result']['type'] == 'errored')
+        total = len(batch['results'])
+        return {
+            'id': batch_id, 'type': 'message_batch',
+            'processing_status': 'ended' if ended else 'in_progress',
+            'request_counts': {'processing': 0 if ended else total, 'succeeded': total - errored if ended else 0,
+                               'errored': errored if ended else 0, 'canceled': 0, 'expired': 0},
+            'created_at': _timestamp(batch['created']),
+            'expires_at': _timestamp(batch['created'] + timedelta(days=1).total_seconds()),
+            'ended_at': _timestamp(batch['created'] + self.delay) if ended else None,
+            'archived_at': None, 'cancel_initiated_at': None,
+            'results_url': f"{base_url}/v1/messages/batches/{batch_id}/results" if ended else None,
+        }
+
+    def results(self, batch_id: str) -> str:
+        return "".join(json.dumps(result) + "\n" for result in self.batches[batch_id]['results'])
+
+
+def make_server(batches: StandInBatches, host: str = '127.0.0.1', port: int = 8766) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status: int, body: str, content_type: str = 'application/json'):
+            data = body.encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _error(self, status: int, kind: str, message: str):
+            self._send(status, json.dumps({'type': 'error', 'error': {'type': kind, 'message': message}}))
+
+        def do_POST(self):
+            if self.path.split('?')[0] != '/v1/messages/batches':
+                return self._error(404, 'not_found_error', f"Unknown path {self.path}")
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            try:
+                batch_id = batches.create(body.get('requests') or [])
+            except (ValueError, KeyError, TypeError) as e:
+                return self._error(400, 'invalid_request_error', str(e))
+            self._send(200, json.dumps(batches.describe(batch_id, server.base_url)))
+
+        def do_GET(self):
+            match = BATCH_PATH.match(self.path.split('?')[0])
+            if not match or match.group(1) not in batches.batches:
+                return self._error(404, 'not_found_error', f"Unknown batch or path {self.path}")
+            batch = batches.describe(match.group(1), server.base_url)
+            if not match.group(2):
+                return self._send(200, json.dumps(batch))
+            if batch['processing_status'] != 'ended':
+                return self._error(400, 'invalid_request_error', "Batch has not ended yet")
+            self._send(200, batches.results(match.group(1)), 'application/binary')
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.base_url = f"http://{host}:{server.server_address[1]}"
+    return server
+
+
+def start_in_thread(batches: StandInBatches = None, port: int = 0) -> ThreadingHTTPServer:
+    """Serve a stand-in from a daemon thread (port 0 picks a free one); see server.base_url"""
+    server = make_server(batches or StandInBatches(), port=port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Message Batches API")
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--delay', type=float, default=5, help="Seconds a batch stays in progress")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Share of requests that come back errored")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    server = make_server(StandInBatches(delay=args.delay, error_rate=args.error_rate, seed=args.seed), port=args.port)
+    print(f"Batch stand-in listening on {server.base_url} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+import json
+import os
+import time
+from datetime import datetime
+
+STATE_NAME = 'work_orders.batch.json'
+# The API takes at most 100,000 requests or 256 MB per batch; image pages make the size limit the one to watch
+MAX_BATCH_REQUESTS = 100_000
+MAX_BATCH_BYTES = 200 * 1024 * 1024
+DEFAULT_POLL_SECONDS = 60
+
+
+def make_client(base_url: str = None):
+    """Anthropic client for the Message Batches API (base_url points it at batch_server.py)"""
+    import anthropic
+
+    api_key = os.getenv('ANTHROPIC_API_KEY')
+    if not api_key and base_url is None:
+        raise ValueError("ANTHROPIC_API_KEY not found in environment variables")
+    return anthropic.Anthropic(api_key=api_key or 'stand-in', base_url=base_url)
+
+
+def split_requests(requests: list, max_requests: int = MAX_BATCH_REQUESTS, max_bytes: int = MAX_BATCH_BYTES) -> list:
+    """Group requests into batches within the per-batch count and size limits, in order"""
+    batches, current, size = [], [], 0
+    for request in requests:
+        request_size = len(json.dumps(request))
+        if current and (len(current) >= max_requests or size + request_size > max_bytes):
+            batches.append(current)
+            current, size = [], 0
+        current.append(request)
+        size += request_size
+    if current:
+        batches.append(current)
+    return batches
+
+
+class BatchJob:
+    """Batches submitted for one extraction run, persisted next to work_orders.csv
+
+    The state file records every batch ID as soon as it is created, so an
+    interrupted or polling run picks the same batches up again instead of
+    submitting (and paying for) the pages twice.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.state = {'input_dir': None, 'batches': []}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.state = json.load(f)
+
+    @property
+    def pending(self) -> list:
+        return [entry for entry in self.state['batches'] if not entry.get('collected')]
+
+    def save(self):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def submit(processor, client, input_dir: str, job: BatchJob) -> int:
+    """Submit every page the run would send to the API; returns the number of requests"""
+    requests, stats = processor.plan_batch_requests(input_dir)
+    print(f"\n{stats['pages']} pages: {stats['local']} resolved without the API "
+          f"(fast path, cache or skipped), {len(requests)} batch requests")
+    job.state['input_dir'] = os.path.abspath(input_dir)
+    for chunk in split_requests(requests):
+        batch = client.messages.batches.create(requests=chunk)
+        job.state['batches'].append({'id': batch.id, 'requests': len(chunk),
+                                     'submitted_at': datetime.now().isoformat(timespec='seconds')})
+        job.save()
+        print(f"Submitted batch {batch.id} with {len(chunk)} requests")
+    return len(requests)
+
+
+def wait_for_batches(client, job: BatchJob, poll_seconds: float = DEFAULT_POLL_SECONDS, wait: bool = True) -> bool:
+    """Poll the pending batches until all have ended (or once, with wait=False)"""
+    while True:
+        ended = True
+        for entry in job.pending:
+            batch = client.messages.batches.retrieve(entry['id'])
+            counts = batch.request_counts
+            print(f"Batch {batch.id}: {batch.processing_status} ({counts.succeeded} succeeded, "
+                  f"{counts.errored} errored, {counts.processing} processing)")
+            ended = ended and batch.processing_status == 'ended'
+        if ended or not wait:
+            return ended
+        time.sleep(poll_seconds)
+
+
+def collect(processor, client, job: BatchJob) -> dict:
+    """Store the responses of ended batches in the extraction cache; returns counts per result type"""
+    counts = {}
+    usage = {'input_tokens': 0, 'cache_read_tokens': 0, 'cache_write_tokens': 0, 'output_tokens': 0}
+    for entry in job.pending:
+        for result in client.messages.batches.results(entry['id']):
+            kind = result.result.type
+            counts[kind] = counts.get(kind, 0) + 1
+            if kind != 'succeeded':
+                continue
+            message = result.result.message
+            content = ''.join(block.text for block in message.content if block.type == 'text')
+            try:
+                processor._parse_csv(content)
+            except ValueError as e:
+                # Not cached, so the final pass sends the page again synchronously
+                print(f"Unusable reply for {result.custom_id[:12]} ({e})")
+                counts['unusable'] = counts.get('unusable', 0) + 1
+            else:
+                processor.cache.put(result.custom_id, content)
+            usage['input_tokens'] += message.usage.input_tokens
+            usage['cache_read_tokens'] += message.usage.cache_read_input_tokens or 0
+            usage['cache_write_tokens'] += message.usage.cache_creation_input_tokens or 0
+            usage['output_tokens'] += message.usage.output_tokens
+        entry['collected'] = True
+        job.save()
+    print("Batch results: " + ", ".join(f"{count} {kind}" for kind, count in counts.items()))
+    print(f"Batch usage: {usage['input_tokens']} uncached input tokens, {usage['cache_read_tokens']} cached, "
+          f"{usage['cache_write_tokens']} written to cache, {usage['output_tokens']} output tokens "
+          f"(billed at the batch discount)")
+    return counts
+
+
+def run_batch(processor, client, input_dir: str, output_dir: str, poll_seconds: float = DEFAULT_POLL_SECONDS,
+              wait: bool = True, resume: bool = True) -> bool:
+    """Submit (or pick up) the run's batches, wait for them and write work_orders.csv
+
+    The results land in the extraction cache under each page's cache key,
+    so the final process_directory() pass writes the same CSV as a
+    synchronous run. Pages whose request errored or expired, or whose reply
+    is not usable CSV, are sent synchronously in that pass. With wait=False the call returns False
+    while batches are still running; call it again later to continue.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    job = BatchJob(os.path.join(output_dir, STATE_NAME))
+    if job.state['batches']:
+        if job.state['input_dir'] != os.path.abspath(input_dir):
+            raise ValueError(f"{job.path} belongs to a run over {job.state['input_dir']}; "
+                             f"collect or delete it first")
+        print(f"Resuming batch job from {job.path}")
+    else:
+        submit(processor, client, input_dir, job)
+
+    if job.pending:
+        if not wait_for_batches(client, job, poll_seconds, wait):
+            print(f"\nBatches still running; rerun with --batch to collect them (job saved in {job.path})")
+            return False
+        collect(processor, client, job)
+
+    processor.process_directory(input_dir, output_dir, resume=resume)
+    job.clear()
+    return True
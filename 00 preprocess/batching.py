@@ -0,0 +1,63 @@
+import re
+
+PAGE_MARKER = "=== PAGE {page_id} ==="
+MARKER_PATTERN = re.compile(r'^\s*=+\s*PAGE\s+(\d+)\s*=+\s*$', re.MULTILINE | re.IGNORECASE)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) used for packing decisions"""
+    return len(text or '') // 4 + 1
+
+
+def pack_pages(jobs, token_budget: int, overhead_tokens: int = 0, max_pages: int = 20,
+               text_of=lambda job: job):
+    """Group jobs into batches whose combined page text fits within token_budget.
+
+    Works lazily on any iterable. Order is preserved and a page larger than
+    the budget is sent on its own.
+    """
+    current = []
+    used = overhead_tokens
+    for job in jobs:
+        cost = estimate_tokens(text_of(job)) + 10  # page marker and spacing
+        if current and (used + cost > token_budget or len(current) >= max_pages):
+            yield current
+            current = []
+            used = overhead_tokens
+        current.append(job)
+        used += cost
+    if current:
+        yield current
+
+
+def build_batch_text(page_texts: list) -> str:
+    """Combine several pages into one prompt body with explicit page delimiters"""
+    header = (
+        f"The content below contains {len(page_texts)} separate pages. Each page starts with a line "
+        f"'{PAGE_MARKER.format(page_id='<n>')}'. Process every page independently.\n"
+        f"For EACH page, output its marker line exactly as given, followed by that page's CSV "
+        f"(with headers). Output the marker even when a page has no matching data."
+    )
+    sections = [f"{PAGE_MARKER.format(page_id=i)}\n{text or ''}" for i, text in enumerate(page_texts, 1)]
+    return header + "\n\n" + "\n\n".join(sections)
+
+
+def split_batch_response(content: str, page_count: int):
+    """Split a batched response into per-page CSV strings.
+
+    Returns a list with one CSV string per page, or None when the response
+    cannot be attributed to pages unambiguously (missing, repeated or unknown
+    markers), in which case the caller should fall back to one page per call.
+    """
+    matches = list(MARKER_PATTERN.finditer(content or ''))
+    page_ids = [int(m.group(1)) for m in matches]
+    if sorted(page_ids) != list(range(1, page_count + 1)):
+        return None
+    if content[:matches[0].start()].strip():
+        return None
+
+    parts = [None] * page_count
+    for idx, match in enumerate(matches):
+        end = matches[idx + 1].start() if idx + 1 < len(matches) else len(content)
+        parts[int(match.group(1)) - 1] = content[match.end():end].strip()
+    return parts
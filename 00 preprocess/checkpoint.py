@@ -0,0 +1,79 @@
+import csv
+import os
+
+import pandas as pd
+
+
+class CheckpointedCsvWriter:
+    """Append page results to a CSV as they arrive and record finished pages.
+
+    Alongside the output CSV a manifest lists every (file, page) pair whose
+    rows have been written, with the CSV's size once they were. Both files
+    are fsynced, rows first, so on resume the CSV is truncated to the last
+    size the manifest committed: rows of a page that crashed before its
+    manifest entry are dropped and the page is simply run again. The
+    manifest is removed by ``finish()`` once the whole run has completed.
+    """
+
+    def __init__(self, output_path: str, manifest_path: str = None, resume: bool = True):
+        self.output_path = output_path
+        self.manifest_path = manifest_path or output_path + '.checkpoint'
+        self.done = set()
+        self.rows_written = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+        if resume and os.path.exists(self.manifest_path) and os.path.exists(self.output_path):
+            committed = self._load_manifest()
+            with open(self.output_path, 'r+b') as f:
+                f.truncate(committed)
+            print(f"Resuming: {len(self.done)} pages already completed in {self.output_path}")
+            mode = 'a'
+        else:
+            mode = 'w'
+
+        self.output = open(self.output_path, mode, encoding='utf-8', newline='')
+        self.manifest = open(self.manifest_path, mode, encoding='utf-8', newline='')
+        self.manifest_writer = csv.writer(self.manifest)
+        self.needs_header = self.output.tell() == 0
+
+    def _load_manifest(self) -> int:
+        """Read the completed pages and return the committed CSV size
+
+        A torn last line (crash mid-write) is cut off so appends continue
+        from a whole entry.
+        """
+        with open(self.manifest_path, 'r+b') as f:
+            data = f.read()
+            complete = data.rfind(b'\n') + 1
+            f.truncate(complete)
+        committed = 0
+        for row in csv.reader(data[:complete].decode('utf-8').splitlines()):
+            if len(row) == 3:
+                self.done.add((row[0], int(row[1])))
+                committed = int(row[2])
+        return committed
+
+    def is_done(self, filename: str, page: int) -> bool:
+        return (filename, page) in self.done
+
+    def write_page(self, filename: str, page: int, df: pd.DataFrame):
+        """Append one page's rows, then mark the page complete at the CSV's new size"""
+        if df is not None and not df.empty:
+            df.to_csv(self.output, index=False, header=self.needs_header)
+            self.needs_header = False
+            self.rows_written += len(df)
+            self.output.flush()
+            os.fsync(self.output.fileno())
+        self.manifest_writer.writerow([filename, page, os.fstat(self.output.fileno()).st_size])
+        self.manifest.flush()
+        os.fsync(self.manifest.fileno())
+        self.done.add((filename, page))
+
+    def close(self):
+        self.output.close()
+        self.manifest.close()
+
+    def finish(self):
+        """Close the files and drop the manifest once every page is written"""
+        self.close()
+        os.remove(self.manifest_path)
@@ -1,23 +1,83 @@
 import os
+import sys
 from dotenv import load_dotenv
-from pypdf import PdfReader, PdfWriter
 from langchain_anthropic import ChatAnthropic
-from langchain.schema import HumanMessage
+from langchain.schema import HumanMessage, SystemMessage
 import pandas as pd
 import io
+import re
+import base64
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from throttle import TokenBucket, call_with_backoff
+from extraction_cache import ExtractionCache
+from checkpoint import CheckpointedCsvWriter
+from batching import estimate_tokens, pack_pages, build_batch_text, split_batch_response
+from page_source import iter_pages, bounded_ordered_map
+from stub_chat import StubChat
+from text_layer import parse_page_text, COLUMNS, DEFAULT_THRESHOLD
+from page_router import PageRouter, RenderCache, PageImage, SkippedPage, DEFAULT_MIN_TEXT_SCORE, DEFAULT_DPI
+from batch_submit import make_client, run_batch, DEFAULT_POLL_SECONDS
+from item_normalizer import normalize_item_numbers, merge_counts, format_counts, load_rules
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from timing import span, configure, current
 
 # Load environment variables from .env file
 load_dotenv()
 
+
+class UnusableResponse(ValueError):
+    """Reply that is not the requested CSV (a refusal, prose, a truncated answer)"""
+
+
 class PDFProcessor:
-    def __init__(self):
-        """Initialize with API key from environment variable"""
-        api_key = os.getenv('ANTHROPIC_API_KEY')
-        if not api_key:
-            raise ValueError("ANTHROPIC_API_KEY not found in environment variables")
+    def __init__(self, max_workers: int = 1, requests_per_minute: float = None,
+                 cache: ExtractionCache = None, batch_tokens: int = None,
+                 pdf_workers: int = None, item_rules: list = None,
+                 prompt_caching: bool = True, chat=None, fast_path_threshold: float = None,
+                 router: PageRouter = None):
+        """Initialize with API key from environment variable
+
+        max_workers > 1 sends pages concurrently; requests_per_minute caps the
+        call rate with a token bucket that backs off on 429/overload errors.
+        cache, when given, short-circuits pages whose text, prompt and model
+        were already extracted. batch_tokens packs several short pages into one
+        request up to that many estimated input tokens. pdf_workers sets the
+        size of the process pool that extracts page text (default: all cores).
+        item_rules is the Item Number normalization rule table applied to each
+        page before it is written (None disables normalization).
+        The fixed instructions are sent as a system block marked for prompt
+        caching (prompt_caching=False sends it uncached); chat replaces the
+        Claude client, e.g. with stub_chat.StubChat for offline runs.
+        fast_path_threshold, when set, parses each page's text layer first and
+        only sends pages whose parse confidence is below it to the API.
+        router, when given, sends pages with a weak text layer (scans,
+        handwriting) as rendered images and skips cover sheets and blank pages.
+        """
+        if chat is None:
+            api_key = os.getenv('ANTHROPIC_API_KEY')
+            if not api_key:
+                raise ValueError("ANTHROPIC_API_KEY not found in environment variables")
+            chat = ChatAnthropic(api_key=api_key)
         
-        self.chat = ChatAnthropic(api_key=api_key)
-        self.prompt_template = """We need to extract the following data from the PDF and export it as a single CSV in this format:'Project Number, Work Order Number, Item Number, Issued Qty'
+        self.chat = chat
+        self.max_workers = max(1, max_workers)
+        self.bucket = TokenBucket(requests_per_minute, burst=self.max_workers) if requests_per_minute else None
+        self.cache = cache
+        self.batch_tokens = batch_tokens
+        self.pdf_workers = pdf_workers
+        self.item_rules = item_rules
+        self._run_span = None
+        self.prompt_caching = prompt_caching
+        self.fast_path_threshold = fast_path_threshold
+        self.router = router
+        self.usage = {}
+        self.fast_path_stats = {'pages': 0, 'fast': 0}
+        self._usage_lock = threading.Lock()
+        # Static instructions: identical on every call, so the provider can cache them
+        self.system_prompt = """We need to extract the following data from the PDF and export it as a single CSV in this format:'Project Number, Work Order Number, Item Number, Issued Qty'
 
 1. Project Number:
    * 5-digit number starting with 7
@@ -48,73 +108,463 @@ Additional Instructions:
 Example output format:
 Project Number,Work Order Number,Item Number,Issued Qty
 70034,21,172IHD7S2-3,150
-70034,21,172CCB,150
-
-Here is the page content to process:
+70034,21,172CCB,150"""
+        # Only this part varies per request
+        self.page_template = """Here is the page content to process:
 {page_text}
 
 Remember to return ONLY the CSV data without any explanations or additional text."""
+        # Pages routed as images: the scan goes as an image block, the text layer as a hint
+        self.image_template = """The attached image is a scan of the page to process.{text_hint}
+
+Remember to return ONLY the CSV data without any explanations or additional text."""
+        self.text_hint = """
+Its text layer is below; it may be incomplete and misses anything handwritten:
+{page_text}"""
+
+    @property
+    def prompt_template(self) -> str:
+        """Full prompt (system block + page template); keys the extraction cache"""
+        return self.system_prompt + "\n\n" + self.page_template
+
+    def _cache_lookup(self, page) -> tuple:
+        """Return (cache key, cached rows or None) for a page's text or PageImage
+
+        Entries that do not parse (cached before replies were checked) count
+        as misses, so the page is sent again and the entry replaced.
+        """
+        if self.cache is None:
+            return None, None
+        model = getattr(self.chat, 'model', '') or ''
+        if isinstance(page, PageImage):
+            cache_key = ExtractionCache.make_key(f"image:{page.digest}\n{page.text or ''}",
+                                                 self.system_prompt + "\n\n" + self.image_template, model)
+        else:
+            cache_key = ExtractionCache.make_key(page, self.prompt_template, model)
+        content = self.cache.get(cache_key)
+        if content is None:
+            return cache_key, None
+        try:
+            return cache_key, self._parse_csv(content)
+        except UnusableResponse:
+            return cache_key, None
 
-    def split_pdf(self, input_path: str) -> list:
-        """Split PDF into individual pages and return their text content"""
-        reader = PdfReader(input_path)
-        pages = []
+    def _messages(self, prompt: str, image: PageImage = None) -> list:
+        system_block = {'type': 'text', 'text': self.system_prompt}
+        if self.prompt_caching:
+            system_block['cache_control'] = {'type': 'ephemeral'}
+        if image is None:
+            return [SystemMessage(content=[system_block]), HumanMessage(content=prompt)]
+        image_block = {'type': 'image', 'source': {'type': 'base64', 'media_type': image.media_type,
+                                                   'data': base64.b64encode(image.data).decode('ascii')}}
+        return [SystemMessage(content=[system_block]),
+                HumanMessage(content=[image_block, {'type': 'text', 'text': prompt}])]
+
+    def _record_usage(self, usage: dict) -> dict:
+        """Add one response's token usage to the run totals and return its breakdown"""
+        details = usage.get('input_token_details') or {}
+        counts = {
+            'api_calls': 1,
+            'input_tokens': usage.get('input_tokens') or 0,
+            'cache_read_tokens': details.get('cache_read') or 0,
+            'cache_write_tokens': details.get('cache_creation') or 0,
+            'output_tokens': usage.get('output_tokens') or 0,
+        }
+        # langchain-anthropic's input_tokens already includes cache reads and writes
+        counts['uncached_tokens'] = counts['input_tokens'] - counts['cache_read_tokens'] - counts['cache_write_tokens']
+        with self._usage_lock:
+            for key, value in counts.items():
+                self.usage[key] = self.usage.get(key, 0) + value
+        return counts
+
+    def usage_summary(self) -> str:
+        usage = self.usage
+        if not usage.get('api_calls'):
+            return "API usage: no calls"
+        total = usage['input_tokens'] or 1
+        return (f"API usage: {usage['api_calls']} calls, {usage['input_tokens']} input tokens "
+                f"({usage['cache_read_tokens']} cached [{usage['cache_read_tokens'] / total:.0%}], "
+                f"{usage['cache_write_tokens']} written to cache, {usage['uncached_tokens']} uncached), "
+                f"{usage['output_tokens']} output tokens"
+                + (f"\nNo tokens were cached: the ~{estimate_tokens(self.system_prompt)}-token system block may be "
+                   f"below the model's minimum cacheable prompt length"
+                   if self.prompt_caching and not usage['cache_read_tokens'] + usage['cache_write_tokens'] else ""))
+
+    def _invoke(self, prompt: str, image: PageImage = None) -> str:
+        messages = self._messages(prompt, image)
+        with span('api_call', getattr(self.chat, 'model', None), prompt_chars=len(prompt),
+                  image_bytes=len(image.data) if image is not None else 0) as s:
+            response = call_with_backoff(lambda: self.chat.invoke(messages), self.bucket)
+            counts = self._record_usage(getattr(response, 'usage_metadata', None) or {})
+            s.set(**counts)
+        return response.content
+
+    def _parse_csv(self, content: str, allow_empty: bool = False) -> pd.DataFrame:
+        """Rows of a CSV reply; raises UnusableResponse unless it starts with the expected header
+
+        A header-only reply means the page has no rows. allow_empty also takes
+        an empty reply that way (a batched page whose marker came back alone).
+        """
+        text = re.sub(r'^```[a-z]*\s*|\s*```$', '', (content or '').strip())
+        if not text and allow_empty:
+            return pd.DataFrame(columns=COLUMNS)
+        try:
+            df = pd.read_csv(io.StringIO(text))
+        except Exception as e:
+            raise UnusableResponse(f"reply is not CSV ({e})") from e
+        if [str(column).strip().lower() for column in df.columns] != [column.lower() for column in COLUMNS]:
+            raise UnusableResponse(f"reply has no CSV header: {text[:60]!r}")
+        df.columns = COLUMNS
+        return df
+
+    def _fast_path(self, page_text: str):
+        """Rows parsed straight from the text layer if confident enough, else None"""
+        if self.fast_path_threshold is None:
+            return None
+        result = parse_page_text(page_text)
+        accepted = result.confidence >= self.fast_path_threshold
+        with self._usage_lock:
+            self.fast_path_stats['pages'] += 1
+            self.fast_path_stats['fast'] += accepted
+        current().set(fast_path=accepted, confidence=round(result.confidence, 3))
+        return result.rows if accepted else None
+
+    def fast_path_summary(self) -> str:
+        stats = self.fast_path_stats
+        if not stats['pages']:
+            return "Fast path: no pages checked"
+        return (f"Fast path: {stats['fast']} of {stats['pages']} pages parsed from the text layer "
+                f"({stats['fast'] / stats['pages']:.0%}), {stats['pages'] - stats['fast']} sent to the LLM")
+
+    def _image_prompt(self, image: PageImage) -> str:
+        text_hint = self.text_hint.format(page_text=image.text) if (image.text or '').strip() else ''
+        return self.image_template.format(text_hint=text_hint)
+
+    def process_page(self, page_text, cache_key: str = None, try_fast_path: bool = True) -> pd.DataFrame:
+        """Send page text (or a routed PageImage) to Claude and get CSV response"""
+        if isinstance(page_text, SkippedPage):
+            return pd.DataFrame(columns=COLUMNS)
+        image = page_text if isinstance(page_text, PageImage) else None
+        if try_fast_path and image is None:
+            rows = self._fast_path(page_text)
+            if rows is not None:
+                return rows
         
-        for page_num in range(len(reader.pages)):
-            page = reader.pages[page_num]
-            text = page.extract_text()
-            pages.append(text)
-            
-        return pages
+        rows = None
+        if cache_key is None:
+            cache_key, rows = self._cache_lookup(page_text)
+        if rows is not None:
+            return rows
+        
+        if image is not None:
+            content = self._invoke(self._image_prompt(image), image)
+        else:
+            content = self._invoke(self.page_template.format(page_text=page_text))
+        # Raises on an unusable reply, which is then neither cached nor checkpointed
+        rows = self._parse_csv(content)
+        if cache_key is not None:
+            self.cache.put(cache_key, content)
+        return rows
+
+    def process_batch(self, page_texts: list) -> list:
+        """Send several pages in one request and return one DataFrame per page
 
-    def process_page(self, page_text: str) -> pd.DataFrame:
-        """Send page text to Claude and get CSV response"""
-        prompt = self.prompt_template.format(page_text=page_text)
+        Falls back to one request per page when the response cannot be split
+        back into pages by its page markers, and for pages whose part of it is
+        not usable CSV. A page whose own request also fails comes back as None.
+        """
+        results = [None] * len(page_texts)
+        keys = [None] * len(page_texts)
+        pending = []
+        for idx, page_text in enumerate(page_texts):
+            if not isinstance(page_text, str):
+                # Images and skipped pages are never packed with others
+                results[idx] = self._process_single(page_text, None)
+                continue
+            results[idx] = self._fast_path(page_text)
+            if results[idx] is not None:
+                continue
+            keys[idx], results[idx] = self._cache_lookup(page_text)
+            if results[idx] is None:
+                pending.append(idx)
         
-        messages = [HumanMessage(content=prompt)]
-        response = self.chat.invoke(messages)
+        if len(pending) == 1:
+            idx = pending[0]
+            results[idx] = self._process_single(page_texts[idx], keys[idx])
+        elif pending:
+            batch_text = build_batch_text([page_texts[idx] for idx in pending])
+            parts = split_batch_response(self._invoke(self.page_template.format(page_text=batch_text)),
+                                         len(pending))
+            if parts is None:
+                print(f"Could not attribute batched response to {len(pending)} pages, "
+                      f"falling back to one page per request...")
+                for idx in pending:
+                    results[idx] = self._process_single(page_texts[idx], keys[idx])
+            else:
+                for idx, content in zip(pending, parts):
+                    try:
+                        results[idx] = self._parse_csv(content, allow_empty=True)
+                    except UnusableResponse as e:
+                        print(f"Unusable reply for batched page {idx + 1} ({e}), retrying it on its own...")
+                        results[idx] = self._process_single(page_texts[idx], keys[idx])
+                        continue
+                    if keys[idx] is not None:
+                        self.cache.put(keys[idx], content)
         
+        return results
+
+    def _process_single(self, page_text, cache_key: str):
+        """process_page for one page of a batch; None if its reply is unusable"""
         try:
-            df = pd.read_csv(io.StringIO(response.content))
-            expected_columns = ['Project Number', 'Work Order Number', 'Item Number', 'Issued Qty']
-            df.columns = expected_columns
-            return df
-        except Exception as e:
-            print(f"Error parsing CSV response: {str(e)}")
-            return pd.DataFrame(columns=['Project Number', 'Work Order Number', 'Item Number', 'Issued Qty'])
+            return self.process_page(page_text, cache_key=cache_key, try_fast_path=False)
+        except UnusableResponse as e:
+            print(f"Unusable reply ({e})")
+            return None
+
+    def _request_params(self, prompt: str, image: PageImage = None) -> dict:
+        """Messages API parameters for one page, as sent in a batch request"""
+        system, user = self._messages(prompt, image)
+        return {'model': getattr(self.chat, 'model', None), 'max_tokens': getattr(self.chat, 'max_tokens', None) or 4096,
+                'system': system.content, 'messages': [{'role': 'user', 'content': user.content}]}
+
+    def plan_batch_requests(self, input_dir: str) -> tuple:
+        """Batch requests for every page a synchronous run would send to the API
+
+        Returns (requests, stats). Each request's custom_id is the page's
+        extraction-cache key, so once the results are stored in the cache a
+        normal process_directory() run writes the CSV without API calls.
+        Fast-path, cached and skipped pages need no request; pages are sent
+        one per request (batch_tokens packing is not used).
+        """
+        if self.cache is None or not self.cache.enabled:
+            raise ValueError("Batch mode keeps its results in the extraction cache; run it with the cache enabled")
+        pdf_paths = [os.path.join(input_dir, filename) for filename in sorted(os.listdir(input_dir))
+                     if filename.endswith('.pdf')]
+        jobs = iter_pages(pdf_paths, max_workers=self.pdf_workers)
+        if self.router is not None:
+            jobs = self.router.route_jobs(jobs, input_dir)
+
+        requests = {}
+        stats = {'pages': 0, 'local': 0}
+        for _, _, _, page in jobs:
+            stats['pages'] += 1
+            if isinstance(page, SkippedPage) or (isinstance(page, str) and self._fast_path(page) is not None):
+                stats['local'] += 1
+                continue
+            cache_key, rows = self._cache_lookup(page)
+            if rows is not None:
+                stats['local'] += 1
+                continue
+            if isinstance(page, PageImage):
+                params = self._request_params(self._image_prompt(page), page)
+            else:
+                params = self._request_params(self.page_template.format(page_text=page))
+            # Identical pages share one request and one cache entry
+            requests.setdefault(cache_key, {'custom_id': cache_key, 'params': params})
+        return list(requests.values()), stats
+
+    def _process_page_safe(self, job: tuple) -> pd.DataFrame:
+        """Process one (filename, page number, page count, text) job, logging failures"""
+        filename, i, total, page_text = job
+        # Skipped pages were logged by the router
+        if not isinstance(page_text, SkippedPage):
+            as_image = " as an image" if isinstance(page_text, PageImage) else ""
+            print(f"Processing {filename} page {i} of {total}{as_image}...")
+        with span('page', f"{filename} p{i}", parent=self._run_span, pdf=filename, page=i) as s:
+            try:
+                df = self.process_page(page_text)
+                s.set(rows=len(df))
+                return df
+            except Exception as e:
+                print(f"Error processing {filename} page {i}: {str(e)}")
+                s.set(error=type(e).__name__)
+                return None
+
+    def _process_batch_safe(self, batch: list) -> list:
+        """Process a list of page jobs in one request, logging failures"""
+        if len(batch) == 1:
+            return [self._process_page_safe(batch[0])]
+        pages = ", ".join(f"{filename} p{i}" for filename, i, _, _ in batch)
+        print(f"Processing batch of {len(batch)} pages ({pages})...")
+        with span('batch', pages, parent=self._run_span, pdf=batch[0][0], pages=len(batch)) as s:
+            try:
+                frames = self.process_batch([job[3] for job in batch])
+                s.set(rows=sum(len(df) for df in frames if df is not None))
+                return frames
+            except Exception as e:
+                print(f"Error processing batch ({pages}): {str(e)}")
+                s.set(error=type(e).__name__)
+                return [None] * len(batch)
+
+    def process_directory(self, input_dir: str, output_dir: str, resume: bool = True):
+        """Process all PDFs in directory and create consolidated CSV
+
+        Rows are streamed to work_orders.csv page by page alongside a checkpoint
+        manifest; with resume=True an interrupted run skips pages already written.
+        """
+        self.usage = {}
+        self.fast_path_stats = {'pages': 0, 'fast': 0}
+        with span('directory', input_dir) as run_span:
+            self._run_span = run_span
+            try:
+                self._process_directory(input_dir, output_dir, resume)
+            finally:
+                self._run_span = None
 
-    def process_directory(self, input_dir: str, output_dir: str):
-        """Process all PDFs in directory and create consolidated CSV"""
-        all_data = pd.DataFrame()
+    def _process_directory(self, input_dir: str, output_dir: str, resume: bool):
+        output_path = os.path.join(output_dir, 'work_orders.csv')
+        writer = CheckpointedCsvWriter(output_path, resume=resume)
         
-        for filename in sorted(os.listdir(input_dir)):
-            if filename.endswith('.pdf'):
-                input_path = os.path.join(input_dir, filename)
-                print(f"\nProcessing {filename}...")
-                
-                pages = self.split_pdf(input_path)
-                for i, page_text in enumerate(pages, 1):
-                    print(f"Processing page {i} of {len(pages)}...")
-                    try:
-                        df = self.process_page(page_text)
-                        all_data = pd.concat([all_data, df], ignore_index=True)
-                    except Exception as e:
-                        print(f"Error processing page {i}: {str(e)}")
+        pdf_paths = [os.path.join(input_dir, filename) for filename in sorted(os.listdir(input_dir))
+                     if filename.endswith('.pdf')]
+        # Pages are extracted lazily in a process pool and fed to the API as they become ready
+        jobs = iter_pages(pdf_paths, max_workers=self.pdf_workers, skip=writer.is_done)
+        if self.router is not None:
+            jobs = self.router.route_jobs(jobs, input_dir)
+        
+        if self.batch_tokens:
+            overhead = estimate_tokens(self.prompt_template)
+            batches = pack_pages(jobs, self.batch_tokens, overhead_tokens=overhead,
+                                 text_of=lambda job: job[3] if isinstance(job[3], str) else '')
+        else:
+            batches = ([job] for job in jobs)
+        
+        # Results are yielded in submission order, so the CSV matches a sequential run
+        failed = 0
+        requests = 0
+        rule_counts = {}
+        executor = None
+        try:
+            if self.max_workers > 1:
+                executor = ThreadPoolExecutor(max_workers=self.max_workers)
+                results = bounded_ordered_map(executor, self._process_batch_safe, batches,
+                                              window=self.max_workers * 2)
+            else:
+                results = ((batch, self._process_batch_safe(batch)) for batch in batches)
+            
+            for batch, frames in results:
+                requests += 1
+                for (filename, i, _, _), df in zip(batch, frames):
+                    if df is None:
+                        failed += 1
+                        continue
+                    if self.item_rules is not None and not df.empty:
+                        df, counts = normalize_item_numbers(df, self.item_rules)
+                        merge_counts(rule_counts, counts)
+                    with span('csv_write', f"{filename} p{i}", pdf=filename, page=i, rows=len(df)):
+                        writer.write_page(filename, i, df)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
         
-        if not all_data.empty:
-            os.makedirs(output_dir, exist_ok=True)
-            output_path = os.path.join(output_dir, 'work_orders.csv')
-            all_data.to_csv(output_path, index=False)
+        if self.batch_tokens:
+            print(f"\nPacked pages into {requests} requests")
+        if rule_counts:
+            print("\n" + format_counts(rule_counts))
+        
+        if failed:
+            writer.close()
+            print(f"\n{failed} pages failed; rerun to retry them (completed pages are kept in {output_path})")
+        else:
+            writer.finish()
+        
+        if os.path.getsize(output_path) > 0:
             print(f"\nCSV file created at: {output_path}")
         else:
             print("\nNo data was extracted from the PDFs")
+        
+        if self.fast_path_threshold is not None:
+            print(self.fast_path_summary())
+        if self.router is not None:
+            print(self.router.summary())
+        print(self.usage_summary())
+        
+        if self.cache is not None:
+            evicted = self.cache.prune()
+            print(self.cache.summary() + (f", evicted {evicted} entries" if evicted else ""))
 
 def main():
-    input_dir = r"D:\auto\00 preprocess\pdfs"
-    output_dir = r"D:\auto\00 preprocess\csvs"
+    parser = argparse.ArgumentParser(description="Extract work order data from PDFs with Claude")
+    parser.add_argument('--input-dir', default=r"D:\auto\00 preprocess\pdfs")
+    parser.add_argument('--output-dir', default=r"D:\auto\00 preprocess\csvs")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Number of pages to send to the API concurrently")
+    parser.add_argument('--rpm', type=float, default=None,
+                        help="Maximum API requests per minute (adaptive, backs off on 429s)")
+    parser.add_argument('--cache-dir', default=r"D:\auto\00 preprocess\.extraction_cache")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Bypass the extraction cache for this run")
+    parser.add_argument('--clear-cache', action='store_true',
+                        help="Invalidate all cached page results before running")
+    parser.add_argument('--cache-max-mb', type=float, default=200)
+    parser.add_argument('--cache-max-age-days', type=float, default=30)
+    parser.add_argument('--restart', action='store_true',
+                        help="Ignore any checkpoint and start work_orders.csv from scratch")
+    parser.add_argument('--batch-tokens', type=int, default=None,
+                        help="Pack several pages per request up to this many estimated input tokens")
+    parser.add_argument('--pdf-workers', type=int, default=None,
+                        help="Processes used to extract PDF text (default: all cores)")
+    parser.add_argument('--item-rules', default=None,
+                        help="JSON Item Number normalization rules (defaults to the built-in table)")
+    parser.add_argument('--no-normalize', action='store_true',
+                        help="Write Item Numbers exactly as extracted")
+    parser.add_argument('--no-prompt-cache', action='store_true',
+                        help="Send the instructions without the prompt-caching marker")
+    parser.add_argument('--stub', action='store_true',
+                        help="Use the offline stub client instead of the Claude API")
+    parser.add_argument('--fast-path-threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="Minimum text-layer parse confidence (0-1) for a page to skip the LLM")
+    parser.add_argument('--no-fast-path', action='store_true',
+                        help="Send every page to the LLM")
+    parser.add_argument('--no-routing', action='store_true',
+                        help="Send every page as text (no image pages, no skipped cover sheets or blank pages)")
+    parser.add_argument('--min-text-score', type=float, default=DEFAULT_MIN_TEXT_SCORE,
+                        help="Text-layer quality (0-1) below which a page is sent as an image")
+    parser.add_argument('--render-dpi', type=int, default=DEFAULT_DPI)
+    parser.add_argument('--render-workers', type=int, default=None,
+                        help="Processes used to render image pages (default: all cores)")
+    parser.add_argument('--render-cache-dir', default=r"D:\auto\00 preprocess\.render_cache")
+    parser.add_argument('--batch', action='store_true',
+                        help="Submit the pages as Message Batches jobs, wait for them and write the same CSV "
+                             "(rerun to pick up a saved job)")
+    parser.add_argument('--batch-poll-seconds', type=float, default=DEFAULT_POLL_SECONDS)
+    parser.add_argument('--batch-no-wait', action='store_true',
+                        help="Submit or check the batch job once and exit if it is still running")
+    parser.add_argument('--batch-base-url', default=None,
+                        help="Batch API endpoint, e.g. a batch_server.py stand-in (--stub starts one itself)")
+    parser.add_argument('--timing-log', default=None,
+                        help="Append JSON-lines timing spans to this file (see timing.py report)")
+    args = parser.parse_args()
+    if args.timing_log:
+        configure(args.timing_log)
+    
+    cache = ExtractionCache(args.cache_dir, max_bytes=int(args.cache_max_mb * 1024 * 1024),
+                            max_age_days=args.cache_max_age_days, enabled=not args.no_cache)
+    if args.clear_cache:
+        cache.clear()
+        print(f"Cleared extraction cache at {args.cache_dir}")
     
-    processor = PDFProcessor()
-    processor.process_directory(input_dir, output_dir)
+    processor = PDFProcessor(max_workers=args.workers, requests_per_minute=args.rpm, cache=cache,
+                             batch_tokens=args.batch_tokens, pdf_workers=args.pdf_workers,
+                             item_rules=None if args.no_normalize else load_rules(args.item_rules),
+                             prompt_caching=not args.no_prompt_cache,
+                             chat=StubChat() if args.stub else None,
+                             fast_path_threshold=None if args.no_fast_path else args.fast_path_threshold,
+                             router=None if args.no_routing else PageRouter(
+                                 RenderCache(args.render_cache_dir, enabled=not args.no_cache),
+                                 min_text_score=args.min_text_score, dpi=args.render_dpi,
+                                 render_workers=args.render_workers))
+    if not args.batch:
+        processor.process_directory(args.input_dir, args.output_dir, resume=not args.restart)
+        return
+    if args.no_cache:
+        parser.error("--batch keeps its results in the extraction cache; drop --no-cache")
+    base_url = args.batch_base_url
+    if base_url is None and args.stub:
+        from batch_server import StandInBatches, start_in_thread
+        base_url = start_in_thread(StandInBatches(delay=0)).base_url
+    run_batch(processor, make_client(base_url), args.input_dir, args.output_dir,
+              poll_seconds=args.batch_poll_seconds, wait=not args.batch_no_wait, resume=not args.restart)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
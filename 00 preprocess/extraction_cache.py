@@ -0,0 +1,108 @@
+import hashlib
+import os
+import shutil
+import threading
+import time
+
+
+class ExtractionCache:
+    """On-disk cache of raw LLM responses keyed by page text, prompt and model.
+
+    Each entry is a small text file named by the SHA-256 of its inputs, so a
+    changed prompt or model simply misses. Entries older than ``max_age_days``
+    are dropped, and the least recently used entries are evicted once the
+    cache grows past ``max_bytes``.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 200 * 1024 * 1024,
+                 max_age_days: float = 30, enabled: bool = True):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age = max_age_days * 86400
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        if self.enabled:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(page_text: str, prompt_template: str, model: str) -> str:
+        digest = hashlib.sha256()
+        for part in (model, prompt_template, page_text):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key + '.txt')
+
+    def get(self, key: str):
+        """Return the cached response for key, or None on a miss"""
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.max_age:
+                os.remove(path)
+                raise FileNotFoundError(path)
+            with open(path, 'r', encoding='utf-8') as f:
+                content = f.read()
+            os.utime(path)  # mark as recently used for LRU eviction
+        except OSError:
+            with self.lock:
+                self.misses += 1
+            return None
+        with self.lock:
+            self.hits += 1
+        return content
+
+    def put(self, key: str, content: str):
+        if not self.enabled:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+    def prune(self):
+        """Drop expired entries, then evict least recently used ones above max_bytes"""
+        if not self.enabled or not os.path.isdir(self.cache_dir):
+            return 0
+        now = time.time()
+        entries = []
+        removed = 0
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                stat = os.stat(path)
+                if now - stat.st_mtime > self.max_age:
+                    os.remove(path)
+                    removed += 1
+                else:
+                    entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self):
+        """Invalidate every cached entry"""
+        if os.path.isdir(self.cache_dir):
+            shutil.rmtree(self.cache_dir)
+        if self.enabled:
+            os.makedirs(self.cache_dir, exist_ok=True)
+        self.hits = self.misses = 0
+
+    def summary(self) -> str:
+        if not self.enabled:
+            return "Cache disabled"
+        total = self.hits + self.misses
+        rate = (self.hits / total * 100) if total else 0.0
+        return f"Cache hits: {self.hits}, misses: {self.misses} ({rate:.1f}% hit rate)"
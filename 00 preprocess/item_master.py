@@ -0,0 +1,293 @@
+import argparse
+import re
+import sqlite3
+from collections import Counter, defaultdict
+
+import pandas as pd
+
+ITEM_COLUMN = 'Item Number'
+AUDIT_COLUMNS = ['Item Number', 'Status', 'Snapped To', 'Distance', 'Candidates', 'Rows']
+# Statuses per extracted item; ambiguous and not_found rows are quarantined by row_validator
+EXACT, CORRECTED, AMBIGUOUS, NOT_FOUND = 'exact', 'corrected', 'ambiguous', 'not_found'
+
+GRAM = 3
+MAX_DISTANCE = 2        # candidates are searched up to this many edits away
+CORRECT_DISTANCE = 1    # a single best candidate this close is taken without review
+MIN_FUZZY_LENGTH = 5    # shorter items have too many one-edit neighbours to correct safely
+MAX_CANDIDATES = 5
+
+
+def item_key(item) -> str:
+    """Upper-cased, whitespace-collapsed form used for every comparison (matches item_normalizer)"""
+    return re.sub(r'\s+', ' ', str(item)).strip().upper()
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein distance counting an adjacent swap as one edit; limit + 1 once it exceeds limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return min(previous[-1], limit + 1)
+
+
+def read_item_export(path: str, column: str = None) -> pd.Series:
+    """Item numbers from a JDE item list export
+
+    CSV files are read by header: the named column, else the first one with
+    'item' in its name, else the first column. Other files are read as one
+    item per line (text before the first tab).
+    """
+    if path.lower().endswith('.csv'):
+        df = pd.read_csv(path, dtype=str, keep_default_na=False)
+        if column is None:
+            column = next((name for name in df.columns if 'item' in name.lower()), df.columns[0])
+        items = df[column]
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            items = pd.Series([line.split('\t')[0] for line in f])
+    items = items.str.strip()
+    return items[items.ne('')].drop_duplicates().reset_index(drop=True)
+
+
+class ItemMasterStore:
+    """Persistent list of valid JDE item numbers backed by SQLite.
+
+    Exports are merged in with ``import_file``; ``replace=True`` first drops
+    items missing from the new export (a full item list).
+    """
+
+    def __init__(self, db_path: str):
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS item_master (
+                item_number TEXT PRIMARY KEY,
+                updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+            )""")
+        self.conn.commit()
+
+    def upsert(self, items, replace: bool = False) -> int:
+        rows = [(str(item).strip(),) for item in items if str(item).strip()]
+        with self.conn:
+            if replace:
+                self.conn.execute("DELETE FROM item_master")
+            self.conn.executemany("""
+                INSERT INTO item_master (item_number) VALUES (?)
+                ON CONFLICT (item_number) DO UPDATE SET updated_at = CURRENT_TIMESTAMP
+                """, rows)
+        return len(rows)
+
+    def import_file(self, path: str, column: str = None, replace: bool = False) -> int:
+        return self.upsert(read_item_export(path, column), replace=replace)
+
+    def items(self) -> list:
+        return [row[0] for row in self.conn.execute("SELECT item_number FROM item_master")]
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM item_master").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+
+class ItemIndex:
+    """In-memory index over the item master for exact and near-match lookup
+
+    Exact lookups are a dict hit on item_key(). Near matches come from a
+    trigram inverted index: an item within k edits of the query shares all
+    but at most k * (GRAM + 1) of its trigrams. Shared trigrams are counted
+    over the query's rarer trigrams only, and the items that share enough of
+    them are checked with the (bounded) edit distance.
+    """
+
+    def __init__(self, items):
+        self.exact = {}
+        self.keys = []
+        self.postings = defaultdict(list)
+        self.by_length = defaultdict(list)
+        for item in items:
+            key = item_key(item)
+            if not key or key in self.exact:
+                continue
+            self.exact[key] = item
+            item_id = len(self.keys)
+            self.keys.append(key)
+            self.by_length[len(key)].append(item_id)
+            for gram in self._grams(key):
+                self.postings[gram].append(item_id)
+
+    @staticmethod
+    def _grams(key: str) -> set:
+        padded = f"^{key}$"
+        return {padded[i:i + GRAM] for i in range(max(1, len(padded) - GRAM + 1))}
+
+    def __len__(self):
+        return len(self.keys)
+
+    def lookup(self, item):
+        """The master's spelling of item, or None if it is not an exact match"""
+        return self.exact.get(item_key(item))
+
+    def candidates(self, item, max_distance: int = MAX_DISTANCE, limit: int = MAX_CANDIDATES) -> list:
+        """(master item, distance) pairs within max_distance edits, closest first"""
+        key = item_key(item)
+        postings = sorted((self.postings.get(gram, ()) for gram in self._grams(key)), key=len)
+        # A match shares all but max_distance * (GRAM + 1) grams. Counting only the rarest m grams
+        # it must still share m - (len - needed) of them; common grams like 'OC-' are never scanned
+        # as long as that leaves at least one
+        needed = len(postings) - max_distance * (GRAM + 1)
+        if needed < 1:
+            # Short items can lose every shared gram; compare against all items of similar length
+            item_ids = [item_id for length in range(len(key) - max_distance, len(key) + max_distance + 1)
+                        for item_id in self.by_length.get(length, ())]
+        else:
+            common = len(self.keys) // 50
+            scanned = max(len(postings) - needed + 1, sum(1 for items in postings if len(items) <= common))
+            threshold = scanned - len(postings) + needed
+            shared = Counter()
+            for items in postings[:scanned]:
+                shared.update(items)
+            item_ids = [item_id for item_id, count in shared.items()
+                        if count >= threshold and abs(len(self.keys[item_id]) - len(key)) <= max_distance]
+        found = []
+        for item_id in item_ids:
+            candidate = self.keys[item_id]
+            distance = edit_distance(key, candidate, max_distance)
+            if distance <= max_distance:
+                found.append((distance, candidate))
+        found.sort()
+        return [(self.exact[candidate], distance) for distance, candidate in found[:limit]]
+
+    def resolve(self, item, max_distance: int = MAX_DISTANCE, correct_distance: int = CORRECT_DISTANCE) -> tuple:
+        """(status, master item or None, distance, candidates) for one extracted item"""
+        match = self.lookup(item)
+        if match is not None:
+            return EXACT, match, 0, []
+        if len(item_key(item)) < MIN_FUZZY_LENGTH:
+            return NOT_FOUND, None, None, []
+        # Most misreads are one character; the wider search only runs when nothing is that close
+        found = self.candidates(item, min(correct_distance, max_distance))
+        if not found and max_distance > correct_distance:
+            found = self.candidates(item, max_distance)
+        if not found:
+            return NOT_FOUND, None, None, []
+        best, distance = found[0]
+        ties = [candidate for candidate, d in found if d == distance]
+        if len(ties) == 1 and distance <= correct_distance:
+            return CORRECTED, best, distance, found
+        return AMBIGUOUS, None, distance, found
+
+
+def load_index(db_path: str) -> ItemIndex:
+    store = ItemMasterStore(db_path)
+    try:
+        return ItemIndex(store.items())
+    finally:
+        store.close()
+
+
+def snap_item_numbers(df: pd.DataFrame, index: ItemIndex, column: str = ITEM_COLUMN,
+                      max_distance: int = MAX_DISTANCE, correct_distance: int = CORRECT_DISTANCE) -> tuple:
+    """Replace near-miss item numbers with their unambiguous item master match
+
+    Each distinct item is resolved once, and exact matches take the master's
+    spelling. Returns (DataFrame with corrected items, audit) where the
+    audit has one row per distinct item that was not an exact match, with
+    its status, the item it was snapped to and the candidates considered.
+    """
+    df = df.copy()
+    items = df[column].astype('string').fillna('')
+    audit_rows = []
+    replacements = {}
+    for item, rows in items[items.ne('')].value_counts(sort=False).items():
+        status, match, distance, found = index.resolve(item, max_distance, correct_distance)
+        if status == EXACT:
+            if match != item:
+                replacements[item] = match  # same item, master spelling
+            continue
+        if status == CORRECTED:
+            replacements[item] = match
+        audit_rows.append({
+            'Item Number': item, 'Status': status, 'Snapped To': match or '',
+            'Distance': '' if distance is None else distance,
+            'Candidates': '; '.join(f"{candidate} ({d})" for candidate, d in found), 'Rows': rows,
+        })
+    df[column] = items.replace(replacements) if replacements else df[column]
+    audit = pd.DataFrame(audit_rows, columns=AUDIT_COLUMNS)
+    return df, audit
+
+
+def item_masks(df: pd.DataFrame, audit: pd.DataFrame, column: str = ITEM_COLUMN) -> dict:
+    """Boolean Series per item reason code for row_validator.validate_rows(extra_masks=...)"""
+    status = df[column].astype('string').fillna('').map(dict(zip(audit['Item Number'], audit['Status'])))
+    return {
+        'ITEM_AMBIGUOUS': status.eq(AMBIGUOUS).fillna(False),
+        'ITEM_NOT_IN_MASTER': status.eq(NOT_FOUND).fillna(False),
+    }
+
+
+def format_summary(audit: pd.DataFrame) -> str:
+    rows = audit.groupby('Status')['Rows'].agg(['size', 'sum'])
+    parts = [f"{int(rows.loc[status, 'size'])} items on {int(rows.loc[status, 'sum'])} rows {status.replace('_', ' ')}"
+             for status in (CORRECTED, AMBIGUOUS, NOT_FOUND) if status in rows.index]
+    return "Item master: " + (", ".join(parts) if parts else "every item matched exactly")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain and query the local JDE item master index")
+    parser.add_argument('--db', default='item_master.db')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    import_parser = sub.add_parser('import', help="Load an exported item list (CSV or one item per line)")
+    import_parser.add_argument('path')
+    import_parser.add_argument('--column', help="CSV column holding the item number")
+    import_parser.add_argument('--replace', action='store_true', help="Drop items missing from this export")
+
+    lookup_parser = sub.add_parser('lookup', help="Show how item numbers would be resolved")
+    lookup_parser.add_argument('items', nargs='+')
+    lookup_parser.add_argument('--max-distance', type=int, default=MAX_DISTANCE)
+
+    snap_parser = sub.add_parser('snap', help="Correct the Item Numbers of an extracted CSV")
+    snap_parser.add_argument('--input', default='output_modified.csv')
+    snap_parser.add_argument('--output', default='output_snapped.csv')
+    snap_parser.add_argument('--audit', default='item_corrections.csv')
+    args = parser.parse_args()
+
+    if args.command == 'import':
+        store = ItemMasterStore(args.db)
+        try:
+            count = store.import_file(args.path, args.column, args.replace)
+            print(f"Imported {count} items from {args.path}; {store.count()} items in {args.db}")
+        finally:
+            store.close()
+        return
+
+    index = load_index(args.db)
+    print(f"Loaded {len(index)} items from {args.db}")
+    if args.command == 'lookup':
+        for item in args.items:
+            status, match, distance, found = index.resolve(item, args.max_distance)
+            candidates = ', '.join(f"{candidate} ({d})" for candidate, d in found)
+            print(f"{item}: {status}" + (f" -> {match}" if match and status != EXACT else "")
+                  + (f" [{candidates}]" if candidates else ""))
+    elif args.command == 'snap':
+        df = pd.read_csv(args.input, dtype=str, keep_default_na=False)
+        df, audit = snap_item_numbers(df, index)
+        df.to_csv(args.output, index=False)
+        audit.to_csv(args.audit, index=False)
+        print(format_summary(audit))
+        print(f"Snapped rows saved to '{args.output}', audit to '{args.audit}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import argparse
+import json
+
+import pandas as pd
+
+ITEM_COLUMN = 'Item Number'
+
+# Applied in order to the whole Item Number column. Each rule is either a
+# built-in string operation ('strip', 'upper') or a regex replacement.
+DEFAULT_RULES = [
+    {'name': 'stray_whitespace', 'op': 'regex', 'pattern': r'\s+', 'repl': ' '},
+    {'name': 'trim', 'op': 'strip'},
+    {'name': 'upper_case', 'op': 'upper'},
+    # OCR confusions, only where the letter sits between digits
+    {'name': 'ocr_O_to_0', 'op': 'regex', 'pattern': r'(?<=\d)O(?=\d)', 'repl': '0'},
+    {'name': 'ocr_I_to_1', 'op': 'regex', 'pattern': r'(?<=\d)I(?=\d)', 'repl': '1'},
+    # Items starting with 'OC' need a space at the 6th position (index 5)
+    {'name': 'oc_prefix_space', 'op': 'regex', 'pattern': r'^(OC.{3})(?=[^ ])', 'repl': r'\1 '},
+]
+
+
+def load_rules(rules_path: str = None) -> list:
+    """Load a JSON rule table, or return the default rules"""
+    if not rules_path:
+        return DEFAULT_RULES
+    with open(rules_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _apply_rule(values: pd.Series, rule: dict) -> pd.Series:
+    op = rule.get('op', 'regex')
+    if op == 'strip':
+        return values.str.strip()
+    if op == 'upper':
+        return values.str.upper()
+    if op == 'lower':
+        return values.str.lower()
+    if op == 'regex':
+        return values.str.replace(rule['pattern'], rule.get('repl', ''), regex=True)
+    raise ValueError(f"Unknown normalization op '{op}' in rule '{rule.get('name')}'")
+
+
+def normalize_item_numbers(df: pd.DataFrame, rules: list = None, column: str = ITEM_COLUMN) -> tuple:
+    """Apply the rule table to the item column with vectorized string operations
+
+    Returns (normalized DataFrame, {rule name: rows changed}).
+    """
+    rules = DEFAULT_RULES if rules is None else rules
+    df = df.copy()
+    values = df[column].astype('string')
+    counts = {}
+    for rule in rules:
+        if not rule.get('enabled', True):
+            continue
+        updated = _apply_rule(values, rule)
+        counts[rule['name']] = int(updated.ne(values).fillna(False).sum())
+        values = updated
+    df[column] = values
+    return df, counts
+
+
+def format_counts(counts: dict) -> str:
+    lines = ["Item number normalization:"]
+    lines += [f"  {name}: {changed} rows changed" for name, changed in counts.items()]
+    return "\n".join(lines)
+
+
+def merge_counts(total: dict, counts: dict) -> dict:
+    for name, changed in counts.items():
+        total[name] = total.get(name, 0) + changed
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Normalize the Item Number column of an extracted CSV")
+    parser.add_argument('--input', default='output.csv')
+    parser.add_argument('--output', default='output_modified.csv')
+    parser.add_argument('--rules', default=None, help="JSON rule table (defaults to the built-in rules)")
+    args = parser.parse_args()
+
+    try:
+        df = pd.read_csv(args.input, dtype={ITEM_COLUMN: str})
+        print(f"Successfully loaded '{args.input}'.")
+        df, counts = normalize_item_numbers(df, load_rules(args.rules))
+        df.to_csv(args.output, index=False)
+        print(format_counts(counts))
+        print(f"The modified data has been saved to '{args.output}'.")
+    except FileNotFoundError:
+        print(f"Error: The file '{args.input}' was not found. Please ensure it is in the same directory.")
+    except Exception as e:
+        print(f"An error occurred: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+import argparse
+import hashlib
+import io
+import os
+import re
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+from text_layer import parse_page_text
+
+TEXT, IMAGE, SKIP = 'text', 'image', 'skip'
+ROUTES = [TEXT, IMAGE, SKIP]
+DEFAULT_MIN_TEXT_SCORE = 0.6
+DEFAULT_DPI = 150
+# Claude downsizes images whose long edge is above ~1568 px, so rendering larger only costs upload time
+MAX_SIDE = 1568
+# Share of dark pixels below which a rendered page counts as blank (scanner noise stays well under it)
+DEFAULT_BLANK_INK = 0.002
+MIN_TEXT_CHARS = 150
+WORD = re.compile(r"^[A-Za-z0-9][A-Za-z0-9.,:;\-/#&()'%=_+]*$")
+# Wording that marks a page as a cover sheet rather than a form; only such pages are skipped for their text
+COVER_SHEET = re.compile(r'\b(?:cover\s*(?:sheet|page|letter)|contents|transmittal|fax)\b', re.IGNORECASE)
+
+
+@dataclass
+class PageRoute:
+    """How a page is sent to the LLM: as text, as an image, or not at all"""
+    route: str
+    score: float
+    reasons: list = field(default_factory=list)
+
+
+@dataclass
+class PageImage:
+    """Rendered page sent instead of (or alongside) its weak text layer"""
+    text: str
+    data: bytes
+    media_type: str = 'image/png'
+
+    @property
+    def digest(self) -> str:
+        return hashlib.sha256(self.data).hexdigest()
+
+
+@dataclass
+class SkippedPage:
+    """Page routed around the LLM (cover sheet, blank page); yields no rows"""
+    text: str
+    reason: str
+
+
+def score_text_layer(text: str) -> float:
+    """0-1 score of how usable a page's text layer is
+
+    The weakest of: amount of text (MIN_TEXT_CHARS non-space characters
+    count as enough), share of readable characters, and share of tokens that
+    look like words or numbers. Scans have next to no text; broken font
+    encodings and OCR noise lower the other two.
+    """
+    chars = [c for c in text or '' if not c.isspace()]
+    if not chars:
+        return 0.0
+    tokens = text.split()
+    length = min(1.0, len(chars) / MIN_TEXT_CHARS)
+    readable = sum(1 for c in chars if c.isalnum() or c in ".,:;-/#&()'%=_+") / len(chars)
+    wordlike = sum(1 for token in tokens if WORD.match(token)) / len(tokens)
+    return min(length, readable, wordlike)
+
+
+def route_text(text: str, min_score: float = DEFAULT_MIN_TEXT_SCORE) -> PageRoute:
+    """Route a page from its text layer alone
+
+    A page the text-layer parser reads completely goes as TEXT. Otherwise a
+    weak text layer goes to IMAGE (and is checked for blankness once
+    rendered). A good one with cover sheet wording and no project, work order
+    or Material Information table is skipped; without that wording it goes as
+    TEXT, since the parser may just not know its labels. Form pages whose
+    work order or quantities are missing from the text layer were probably
+    filled in by hand, so they go as images too; the rest go as text.
+    """
+    score = score_text_layer(text)
+    parsed = parse_page_text(text)
+    if parsed.confidence >= 1.0:
+        # Short but complete digital forms read fine however little text they have
+        return PageRoute(TEXT, score)
+    if score < min_score:
+        return PageRoute(IMAGE, score, [f"weak text layer (score {score:.2f})"])
+    if not parsed.scores['work_order'] and not parsed.scores['table']:
+        if COVER_SHEET.search(text) and not parsed.scores['project']:
+            return PageRoute(SKIP, score, ["cover sheet (no project, work order or Material Information table)"])
+        return PageRoute(TEXT, score, ["no work order or Material Information table recognised"])
+    if parsed.scores['table'] and parsed.rows.empty:
+        return PageRoute(IMAGE, score, ["table rows missing from the text layer (handwritten?)"])
+    if not parsed.scores['work_order']:
+        return PageRoute(IMAGE, score, ["work order missing from the text layer (handwritten?)"])
+    blank_qty = int((parsed.rows['Issued Qty'] == '').sum())
+    if blank_qty:
+        return PageRoute(IMAGE, score, [f"{blank_qty} quantities missing from the text layer (handwritten?)"])
+    return PageRoute(TEXT, score)
+
+
+def render_page(input_path: str, page_number: int, dpi: int = DEFAULT_DPI, max_side: int = MAX_SIDE) -> bytes:
+    """Grayscale PNG of a 1-based page (runs in a worker process)
+
+    Renders with PyMuPDF when it is installed. Without it, the page's
+    largest embedded image is used, which for scanned forms is the scan
+    itself; pages with no embedded image raise ValueError.
+    """
+    from PIL import Image
+
+    try:
+        import fitz
+    except ImportError:
+        fitz = None
+
+    if fitz is not None:
+        with fitz.open(input_path) as doc:
+            pixmap = doc[page_number - 1].get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+            image = Image.frombytes('L', (pixmap.width, pixmap.height), pixmap.samples)
+    else:
+        from pypdf import PdfReader
+
+        images = list(PdfReader(input_path).pages[page_number - 1].images)
+        if not images:
+            raise ValueError("no embedded page image (install PyMuPDF to render vector pages)")
+        image = max((embedded.image for embedded in images), key=lambda im: im.width * im.height).convert('L')
+
+    image.thumbnail((max_side, max_side))
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG', optimize=True)
+    return buffer.getvalue()
+
+
+def ink_coverage(data: bytes) -> float:
+    """Share of dark pixels in a rendered page"""
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as image:
+        histogram = image.convert('L').histogram()
+    return sum(histogram[:128]) / max(sum(histogram), 1)
+
+
+def _render_safe(args: tuple):
+    """render_page for the process pool; returns (PNG bytes, None) or (None, error)"""
+    try:
+        return render_page(*args), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+class RenderCache:
+    """On-disk cache of rendered pages keyed by PDF content, page and render settings"""
+
+    def __init__(self, cache_dir: str, enabled: bool = True):
+        self.cache_dir = cache_dir
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._file_digests = {}
+        if self.enabled:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    def make_key(self, input_path: str, page_number: int, dpi: int, max_side: int) -> str:
+        stat = os.stat(input_path)
+        stamp = (input_path, stat.st_size, stat.st_mtime_ns)
+        if stamp not in self._file_digests:
+            digest = hashlib.sha256()
+            with open(input_path, 'rb') as f:
+                for block in iter(lambda: f.read(1024 * 1024), b''):
+                    digest.update(block)
+            self._file_digests[stamp] = digest.hexdigest()
+        return hashlib.sha256(f"{self._file_digests[stamp]}:{page_number}:{dpi}:{max_side}".encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key + '.png')
+
+    def get(self, key: str):
+        if not self.enabled:
+            return None
+        try:
+            with open(self._path(key), 'rb') as f:
+                data = f.read()
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return data
+
+    def put(self, key: str, data: bytes):
+        if not self.enabled:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+
+class PageRouter:
+    """Route each page to text, image or skip, rendering image pages ahead of the API calls
+
+    route_jobs() takes the (filename, page, page count, text) jobs from
+    page_source.iter_pages and yields them in the same order with the text
+    replaced by a PageImage or SkippedPage where the page is not sent as
+    text. Renders run in a process pool (render_workers) a few pages ahead
+    of the consumer and are cached on disk by PDF content and page.
+    """
+
+    def __init__(self, cache: RenderCache = None, min_text_score: float = DEFAULT_MIN_TEXT_SCORE,
+                 dpi: int = DEFAULT_DPI, max_side: int = MAX_SIDE, blank_ink: float = DEFAULT_BLANK_INK,
+                 render_workers: int = None):
+        self.cache = cache or RenderCache('', enabled=False)
+        self.min_text_score = min_text_score
+        self.dpi = dpi
+        self.max_side = max_side
+        self.blank_ink = blank_ink
+        self.render_workers = render_workers or os.cpu_count() or 1
+        self.stats = {route: 0 for route in ROUTES}
+
+    def route_jobs(self, jobs, input_dir: str):
+        self.stats = {route: 0 for route in ROUTES}
+        pending = deque()
+        window = self.render_workers * 2
+        with ProcessPoolExecutor(max_workers=self.render_workers) as executor:
+            for job in jobs:
+                pending.append(self._start(executor, job, input_dir))
+                while pending and (len(pending) > window or pending[0][4] is None or pending[0][4].done()):
+                    yield self._finish(*pending.popleft())
+            while pending:
+                yield self._finish(*pending.popleft())
+
+    def _start(self, executor, job: tuple, input_dir: str) -> tuple:
+        """Decide from the text layer; returns (job, decision, cache key, cached PNG, render future)"""
+        filename, page_number, _, text = job
+        decision = route_text(text, self.min_text_score)
+        if decision.route != IMAGE:
+            return job, decision, None, None, None
+        input_path = os.path.join(input_dir, filename)
+        key = self.cache.make_key(input_path, page_number, self.dpi, self.max_side) if self.cache.enabled else None
+        data = self.cache.get(key)
+        if data is not None:
+            return job, decision, key, data, None
+        return job, decision, key, None, executor.submit(_render_safe, (input_path, page_number, self.dpi, self.max_side))
+
+    def _finish(self, job: tuple, decision: PageRoute, key, data, future) -> tuple:
+        filename, page_number, total, text = job
+        if decision.route == IMAGE:
+            error = None
+            if future is not None:
+                data, error = future.result()
+                if data is not None:
+                    self.cache.put(key, data)
+            if data is None:
+                # Nothing to look at but the text layer; the LLM still gets that
+                print(f"Could not render {filename} page {page_number} ({error}), sending its text")
+                decision = PageRoute(TEXT, decision.score, decision.reasons + [f"render failed: {error}"])
+            elif decision.score < self.min_text_score and ink_coverage(data) < self.blank_ink:
+                decision = PageRoute(SKIP, decision.score, decision.reasons + ["blank page"])
+            else:
+                text = PageImage(text=text, data=data)
+        self.stats[decision.route] += 1
+        if decision.route == SKIP:
+            text = SkippedPage(text=text, reason='; '.join(decision.reasons))
+            print(f"Skipping {filename} page {page_number} of {total} ({text.reason})")
+        return filename, page_number, total, text
+
+    def summary(self) -> str:
+        stats = self.stats
+        pages = sum(stats.get(route, 0) for route in ROUTES)
+        if not pages:
+            return "Routing: no pages routed"
+        cache = (f", render cache hits: {self.cache.hits}, misses: {self.cache.misses}"
+                 if self.cache.enabled else "")
+        return (f"Routing: {stats[TEXT]} of {pages} pages sent as text, {stats[IMAGE]} as images, "
+                f"{stats[SKIP]} skipped{cache}")
+
+
+def main():
+    from pypdf import PdfReader
+
+    parser = argparse.ArgumentParser(description="Show how each PDF page would be routed (text, image or skip)")
+    parser.add_argument('pdfs', nargs='+')
+    parser.add_argument('--min-text-score', type=float, default=DEFAULT_MIN_TEXT_SCORE)
+    parser.add_argument('--render', action='store_true', help="Render image pages to check for blank ones")
+    parser.add_argument('--dpi', type=int, default=DEFAULT_DPI)
+    parser.add_argument('--blank-ink', type=float, default=DEFAULT_BLANK_INK)
+    args = parser.parse_args()
+
+    counts = {route: 0 for route in ROUTES}
+    for path in args.pdfs:
+        for page_number, page in enumerate(PdfReader(path).pages, 1):
+            decision = route_text(page.extract_text(), args.min_text_score)
+            if decision.route == IMAGE and args.render:
+                data, error = _render_safe((path, page_number, args.dpi, MAX_SIDE))
+                if data is None:
+                    decision.reasons.append(f"render failed: {error}")
+                elif ink_coverage(data) < args.blank_ink:
+                    decision = PageRoute(SKIP, decision.score, decision.reasons + ["blank page"])
+                else:
+                    decision.reasons.append(f"{len(data) // 1024} KB PNG")
+            counts[decision.route] += 1
+            detail = '; '.join(decision.reasons)
+            print(f"{path} p{page_number}: text score {decision.score:.2f} -> {decision.route}"
+                  + (f" ({detail})" if detail else ""))
+    print("\n" + ", ".join(f"{count} {route}" for route, count in counts.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from pypdf import PdfReader
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from timing import span
+
+
+def extract_page_texts(input_path: str, page_numbers: list) -> list:
+    """Extract the text of the given 1-based pages of one PDF (runs in a worker process)"""
+    reader = PdfReader(input_path)
+    return [reader.pages[page_num - 1].extract_text() for page_num in page_numbers]
+
+
+def bounded_ordered_map(executor, fn, items, window: int):
+    """Like executor.map, but pulls items lazily and keeps at most `window` calls in flight.
+
+    Yields (item, result) pairs in input order, so memory stays bounded even
+    when `items` is a long generator.
+    """
+    pending = deque()
+    for item in items:
+        pending.append((item, executor.submit(fn, item)))
+        if len(pending) >= window:
+            item, future = pending.popleft()
+            yield item, future.result()
+    while pending:
+        item, future = pending.popleft()
+        yield item, future.result()
+
+
+def _page_chunks(pdf_paths: list, chunk_size: int, skip):
+    """Yield (filename, path, page count, [page numbers]) work units in document order"""
+    for input_path in pdf_paths:
+        filename = os.path.basename(input_path)
+        try:
+            total = len(PdfReader(input_path).pages)
+        except Exception as e:
+            print(f"Error reading {filename}: {str(e)}")
+            continue
+        print(f"\nReading {filename} ({total} pages)...")
+        wanted = [i for i in range(1, total + 1) if not (skip and skip(filename, i))]
+        for start in range(0, len(wanted), chunk_size):
+            yield filename, input_path, total, wanted[start:start + chunk_size]
+
+
+def _extract_chunk(chunk: tuple) -> list:
+    filename, input_path, _, page_numbers = chunk
+    with span('pdf_read', f"{filename} p{page_numbers[0]}-{page_numbers[-1]}",
+              pdf=filename, pages=len(page_numbers)) as s:
+        try:
+            texts = extract_page_texts(input_path, page_numbers)
+            s.set(chars=sum(len(text) for text in texts))
+            return texts
+        except Exception as e:
+            print(f"Error extracting {filename} pages {page_numbers[0]}-{page_numbers[-1]}: {str(e)}")
+            s.set(error=type(e).__name__)
+            return None
+
+
+def iter_pages(pdf_paths: list, max_workers: int = None, chunk_size: int = 4, skip=None):
+    """Lazily yield (filename, page number, page count, text) for every page, in order.
+
+    Text extraction runs in a process pool across cores; only a few chunks per
+    worker are extracted ahead of the consumer, so a several-hundred-page
+    scan never sits in memory all at once. Pages for which skip(filename, page)
+    is true are not extracted at all.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    chunks = _page_chunks(pdf_paths, chunk_size, skip)
+
+    if max_workers == 1:
+        results = ((chunk, _extract_chunk(chunk)) for chunk in chunks)
+        yield from _flatten(results)
+        return
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = bounded_ordered_map(executor, _extract_chunk, chunks, window=max_workers * 2)
+        yield from _flatten(results)
+
+
+def _flatten(results):
+    for (filename, input_path, total, page_numbers), texts in results:
+        if texts is None:
+            continue
+        for page_num, text in zip(page_numbers, texts):
+            yield filename, page_num, total, text
@@ -0,0 +1,158 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
+from pypdf import PdfReader, PdfWriter
+
+from batching import estimate_tokens
+
+MANIFEST_NAME = '.split_manifest.json'
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def plan_chunks(reader: PdfReader, pages_per_split: int = None, max_tokens: int = None) -> list:
+    """Return a list of (start, end) page ranges, end exclusive"""
+    total = len(reader.pages)
+    if max_tokens:
+        chunks = []
+        start = 0
+        used = 0
+        for page_num in range(total):
+            cost = estimate_tokens(reader.pages[page_num].extract_text())
+            if page_num > start and used + cost > max_tokens:
+                chunks.append((start, page_num))
+                start = page_num
+                used = 0
+            used += cost
+        if total:
+            chunks.append((start, total))
+        return chunks
+    return [(i, min(i + pages_per_split, total)) for i in range(0, total, pages_per_split)]
+
+
+def split_file(source_path: str, target_dir: str, pages_per_split: int = None, max_tokens: int = None) -> dict:
+    """Split one PDF into target_dir and return a manifest record (runs in a worker process)"""
+    file = os.path.basename(source_path)
+    stem = os.path.splitext(file)[0]
+    reader = PdfReader(source_path)
+    chunks = plan_chunks(reader, pages_per_split, max_tokens)
+
+    outputs = []
+    if len(chunks) <= 1:
+        # Nothing to split: copy the original bytes instead of re-serializing the PDF
+        shutil.copy2(source_path, os.path.join(target_dir, file))
+        outputs.append(file)
+        print(f"Copied '{file}' directly (total pages: {len(reader.pages)})")
+    else:
+        print(f"Splitting '{file}' (total pages: {len(reader.pages)}) into {len(chunks)} parts...")
+        for part, (start, end) in enumerate(chunks, 1):
+            pdf_writer = PdfWriter()
+            for page_num in range(start, end):
+                pdf_writer.add_page(reader.pages[page_num])
+
+            split_filename = f"{stem}_part{part}.pdf"
+            with open(os.path.join(target_dir, split_filename), 'wb') as output_file:
+                pdf_writer.write(output_file)
+            outputs.append(split_filename)
+            print(f"  - Created '{split_filename}' (pages {start + 1}-{end})")
+
+    stat = os.stat(source_path)
+    return {'mtime': stat.st_mtime, 'size': stat.st_size, 'sha256': file_sha256(source_path),
+            'pages_per_split': pages_per_split, 'max_tokens': max_tokens, 'outputs': outputs}
+
+
+def is_up_to_date(source_path: str, target_dir: str, record: dict, pages_per_split: int, max_tokens: int) -> bool:
+    """True if the outputs recorded for source_path exist and the source is unchanged"""
+    if not record or record.get('pages_per_split') != pages_per_split or record.get('max_tokens') != max_tokens:
+        return False
+    if not all(os.path.exists(os.path.join(target_dir, name)) for name in record['outputs']):
+        return False
+    stat = os.stat(source_path)
+    if stat.st_mtime == record['mtime'] and stat.st_size == record['size']:
+        return True
+    # Touched but possibly identical (e.g. re-copied): fall back to the content hash
+    if stat.st_size == record['size'] and file_sha256(source_path) == record['sha256']:
+        record['mtime'] = stat.st_mtime
+        return True
+    return False
+
+
+def split_directory(source_dir: str, target_dir: str, pages_per_split: int = None,
+                    max_tokens: int = None, max_workers: int = None, force: bool = False) -> dict:
+    """Split every PDF in source_dir into target_dir, in parallel, skipping up-to-date ones"""
+    os.makedirs(target_dir, exist_ok=True)
+    manifest_path = os.path.join(target_dir, MANIFEST_NAME)
+    manifest = {}
+    # Loaded even with force, so outputs of the earlier split are still cleaned up
+    if os.path.exists(manifest_path):
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    original = json.dumps(manifest, indent=2)
+
+    todo = []
+    skipped = 0
+    for file in sorted(os.listdir(source_dir)):
+        if not file.lower().endswith('.pdf'):
+            continue
+        source_path = os.path.join(source_dir, file)
+        if not force and is_up_to_date(source_path, target_dir, manifest.get(file), pages_per_split, max_tokens):
+            skipped += 1
+            continue
+        todo.append(file)
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {file: executor.submit(split_file, os.path.join(source_dir, file), target_dir,
+                                         pages_per_split, max_tokens)
+                   for file in todo}
+        for file, future in futures.items():
+            try:
+                record = future.result()
+            except Exception as e:
+                print(f"Error processing '{file}': {str(e)}")
+                continue
+            # Remove parts left over from an earlier split that produced more chunks
+            stale = set(manifest.get(file, {}).get('outputs', [])) - set(record['outputs'])
+            for name in stale:
+                stale_path = os.path.join(target_dir, name)
+                if os.path.exists(stale_path):
+                    os.remove(stale_path)
+            manifest[file] = record
+
+    # Rewriting an unchanged manifest would still touch target_dir, which the pipeline fingerprints
+    if json.dumps(manifest, indent=2) != original:
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+
+    print(f"\nPDF processing complete. Processed {len(todo)} files, {skipped} already up to date.")
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Split source PDFs into small chunks for extraction")
+    parser.add_argument('--source-dir', default=r"D:\auto\04 upload\pre")
+    parser.add_argument('--target-dir', default=r"D:\auto\00 preprocess\pdfs")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--pages', type=int, default=4, help="Pages per split document")
+    group.add_argument('--max-tokens', type=int, default=None,
+                       help="Split by estimated text tokens per document instead of page count")
+    parser.add_argument('--workers', type=int, default=None, help="Parallel processes (default: all cores)")
+    parser.add_argument('--force', action='store_true', help="Re-split even if outputs are up to date")
+    args = parser.parse_args()
+
+    split_directory(args.source_dir, args.target_dir,
+                    pages_per_split=None if args.max_tokens else args.pages,
+                    max_tokens=args.max_tokens, max_workers=args.workers, force=args.force)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,63 +1,86 @@
+import argparse
+import os
 import pandas as pd
+from system_wo_store import SystemWOStore, normalize_keys, read_system_wo_file
 
-def replace_work_orders(output_file, system_wo_file):
-    # Read the CSV file
-    output_df = pd.read_csv(output_file)
-    
-    # Read the system work order file with the correct structure
-    # Using proper tab separation and skipping the header row
-    system_wo_df = pd.DataFrame([line.strip().split() for line in open(system_wo_file).readlines()[1:]], 
-                               columns=['Work Order Number', 'Project Number', 'systemWO'])
-    
-    print("System WO DataFrame after cleaning:")
-    print(system_wo_df.head())
-    
-    # Convert columns to appropriate types
-    output_df['Project Number'] = output_df['Project Number'].astype(str)
-    output_df['Work Order Number'] = output_df['Work Order Number'].astype(str)
-    system_wo_df['Project Number'] = system_wo_df['Project Number'].astype(str)
-    system_wo_df['Work Order Number'] = system_wo_df['Work Order Number'].astype(str)
-    
-    # Create mapping dictionary
-    wo_mapping = {}
-    for _, row in system_wo_df.iterrows():
-        key = (row['Project Number'], row['Work Order Number'])
-        wo_mapping[key] = row['systemWO']
-    
-    # Function to get system WO number
-    def get_system_wo(row):
-        key = (str(row['Project Number']), str(row['Work Order Number']))
-        return wo_mapping.get(key, 'Not Found')
-    
-    # Create a new column with the system work order number
-    output_df['System_Work_Order'] = output_df.apply(get_system_wo, axis=1)
-    
-    # Drop the original Project Number and Work Order Number columns
-    output_df = output_df.drop(['Project Number', 'Work Order Number'], axis=1)
-    
+def map_system_work_orders(output_df, mapping_df):
+    """Join extracted rows to system work orders on (Project Number, Work Order Number)
+
+    Returns (matched, unmatched): matched rows carry System_Work_Order and the
+    unmatched rows keep their original project/WO columns for the report.
+    """
+    output_df = normalize_keys(output_df)
+    mapping_df = normalize_keys(mapping_df).drop_duplicates(subset=['Project Number', 'Work Order Number'],
+                                                            keep='last')
+
+    merged = output_df.merge(mapping_df, on=['Project Number', 'Work Order Number'],
+                             how='left', validate='many_to_one')
+    found = merged['systemWO'].notna()
+
+    matched = merged.loc[found].rename(columns={'systemWO': 'System_Work_Order'})
     # Reorder columns to put System Work Order first
-    cols = ['System_Work_Order', 'Item Number', 'Issued Qty']
-    output_df = output_df[cols]
-    
-    return output_df
+    matched = matched[['System_Work_Order', 'Item Number', 'Issued Qty']].reset_index(drop=True)
+    unmatched = merged.loc[~found].drop(columns='systemWO').reset_index(drop=True)
+    return matched, unmatched
+
+def replace_work_orders(output_file, system_wo_file=None, db_path=None):
+    """Map output.csv to system work orders from systemwo.txt and/or the SQLite store"""
+    # Read the CSV file, keeping the join keys as text
+    output_df = pd.read_csv(output_file, dtype={'Project Number': str, 'Work Order Number': str})
+
+    if db_path:
+        store = SystemWOStore(db_path)
+        try:
+            if system_wo_file and os.path.exists(system_wo_file):
+                imported = store.import_file(system_wo_file)
+                print(f"Imported {imported} rows from {system_wo_file} into {db_path}")
+            mapping_df = store.mapping()
+            print(f"System WO store holds {store.count()} mappings")
+        finally:
+            store.close()
+    else:
+        mapping_df = read_system_wo_file(system_wo_file)
+
+    print("System WO mapping:")
+    print(mapping_df.head())
+
+    return map_system_work_orders(output_df, mapping_df)
 
 def main():
+    parser = argparse.ArgumentParser(description="Replace project/WO numbers with system work orders")
+    parser.add_argument('--input', default='output.csv')
+    parser.add_argument('--system-wo', default='systemwo.txt',
+                        help="Optional systemwo.txt export to append to the store before mapping")
+    parser.add_argument('--db', default='system_wo.db', help="SQLite mapping store")
+    parser.add_argument('--output', default='updated_output.csv')
+    parser.add_argument('--unmatched', default='unmatched_work_orders.csv')
+    args = parser.parse_args()
+
     try:
         # Process the files
-        result_df = replace_work_orders('output.csv', 'systemwo.txt')
-        
+        result_df, unmatched_df = replace_work_orders(args.input, args.system_wo, args.db)
+
         # Save the result to a new CSV file
-        result_df.to_csv('updated_output.csv', index=False)
-        print("\nProcessing complete. Results saved to 'updated_output.csv'")
-        
+        result_df.to_csv(args.output, index=False)
+        print(f"\nProcessing complete. Results saved to '{args.output}'")
+
+        if not unmatched_df.empty:
+            unmatched_df.to_csv(args.unmatched, index=False)
+            keys = unmatched_df[['Project Number', 'Work Order Number']].drop_duplicates()
+            print(f"\nWarning: {len(unmatched_df)} rows ({len(keys)} project/WO keys) had no system WO. "
+                  f"See '{args.unmatched}'")
+            print(keys.to_string(index=False))
+        elif os.path.exists(args.unmatched):
+            os.remove(args.unmatched)
+
         # Display the first few rows of the result
         print("\nFirst few rows of the processed data:")
         print(result_df.head())
-        
+
     except Exception as e:
         print(f"An error occurred: {str(e)}")
         import traceback
         print(traceback.format_exc())
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
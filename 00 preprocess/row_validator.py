@@ -0,0 +1,123 @@
+import argparse
+import os
+
+import pandas as pd
+
+from item_master import load_index, snap_item_numbers, item_masks, format_summary as format_item_summary
+from system_wo_store import normalize_keys
+
+REASON_COLUMN = 'Reason'
+
+# Formats seen in real data: WOs like 10483 or 2026-606, items like GNA_F_00868666 or HHS/M10X25+HXN/M10
+PROJECT_PATTERN = r'7\d{4}'
+WO_PATTERN = r'\d+(?:-\d+)*'
+ITEM_PATTERN = r'[A-Za-z0-9][A-Za-z0-9 .\-/=_+]*'
+
+# Reason codes, checked against the whole frame at once (see prompt.txt for the field rules)
+REASONS = {
+    'PROJECT_FORMAT': "Project Number is not a 5-digit number starting with 7",
+    'WO_MISSING': "Work Order Number is blank",
+    'WO_FORMAT': "Work Order Number is not digits (optionally hyphenated, e.g. 2026-606)",
+    'ITEM_MISSING': "Item Number is blank",
+    'ITEM_FORMAT': "Item Number has characters other than letters, digits, spaces or - . / = _ +",
+    'OC_SPACING': "OC Item Number has no space at the 6th position",
+    'QTY_MISSING': "Issued Qty is blank",
+    'QTY_NOT_NUMERIC': "Issued Qty is not a number",
+    'QTY_NOT_POSITIVE': "Issued Qty is zero or negative",
+    'DUPLICATE_ROW': "Same project, WO, item and quantity as an earlier row",
+    # Only checked when an item master is given (see item_master.item_masks)
+    'ITEM_AMBIGUOUS': "Item Number is not in the item master; several near matches, or only distant ones",
+    'ITEM_NOT_IN_MASTER': "Item Number is not in the item master and has no near match",
+}
+# Repeated lines, with the same quantity or not, are summed by consolidate_parts.py before dragon3 entry
+DEFAULT_SKIP = ('DUPLICATE_ROW',)
+
+
+def rule_masks(df: pd.DataFrame) -> dict:
+    """Boolean Series per reason code, True where the row breaks the rule"""
+    project = df['Project Number'].fillna('')
+    work_order = df['Work Order Number'].fillna('')
+    item = df['Item Number'].astype('string').fillna('').str.strip()
+    qty_text = df['Issued Qty'].astype('string').fillna('').str.strip()
+    qty = pd.to_numeric(qty_text.str.replace(',', '', regex=False), errors='coerce')
+
+    return {
+        'PROJECT_FORMAT': ~project.str.fullmatch(PROJECT_PATTERN).fillna(False),
+        'WO_MISSING': work_order.eq(''),
+        'WO_FORMAT': work_order.ne('') & ~work_order.str.fullmatch(WO_PATTERN).fillna(False),
+        'ITEM_MISSING': item.eq(''),
+        'ITEM_FORMAT': item.ne('') & ~item.str.fullmatch(ITEM_PATTERN).fillna(False),
+        'OC_SPACING': item.str.upper().str.startswith('OC') & item.str.len().ge(6) & item.str[5].ne(' '),
+        'QTY_MISSING': qty_text.eq(''),
+        'QTY_NOT_NUMERIC': qty_text.ne('') & qty.isna(),
+        'QTY_NOT_POSITIVE': qty.le(0).fillna(False),
+        'DUPLICATE_ROW': pd.concat([project, work_order, item, qty.astype('string').fillna(qty_text)],
+                                   axis=1).duplicated(keep='first'),
+    }
+
+
+def validate_rows(df: pd.DataFrame, skip: tuple = (), extra_masks: dict = None) -> tuple:
+    """Split extracted rows into (clean, quarantined)
+
+    Quarantined rows keep their original values plus a Reason column listing
+    every broken rule as ';'-separated reason codes. Rules named in skip are
+    not applied. extra_masks adds checks computed elsewhere (reason code ->
+    boolean Series in the order of df's rows), e.g. item_master.item_masks.
+    """
+    df = normalize_keys(df).reset_index(drop=True)
+    masks = dict(rule_masks(df))
+    masks.update({code: mask.reset_index(drop=True) for code, mask in (extra_masks or {}).items()})
+    masks = {code: mask.fillna(False).astype(bool) for code, mask in masks.items() if code not in skip}
+
+    reasons = pd.Series('', index=df.index, dtype='string')
+    for code, mask in masks.items():
+        reasons = reasons.mask(mask, reasons + code + ';')
+    bad = reasons.ne('')
+
+    clean = df.loc[~bad].reset_index(drop=True)
+    quarantined = df.loc[bad].assign(**{REASON_COLUMN: reasons[bad].str.rstrip(';')}).reset_index(drop=True)
+    return clean, quarantined
+
+
+def reason_counts(quarantined: pd.DataFrame) -> pd.Series:
+    """Rows affected per reason code"""
+    if quarantined.empty:
+        return pd.Series(dtype=int)
+    return quarantined[REASON_COLUMN].str.split(';').explode().value_counts()
+
+
+def format_summary(clean: pd.DataFrame, quarantined: pd.DataFrame) -> str:
+    lines = [f"Validation: {len(clean)} clean rows, {len(quarantined)} quarantined"]
+    lines += [f"  {code}: {count} rows ({REASONS.get(code, '')})" for code, count in reason_counts(quarantined).items()]
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Quarantine extracted rows that would fail in JDE")
+    parser.add_argument('--input', default='output_modified.csv')
+    parser.add_argument('--output', default='validated_output.csv', help="Rows that passed every check")
+    parser.add_argument('--quarantine', default='quarantined_rows.csv', help="Failed rows with reason codes")
+    parser.add_argument('--skip', nargs='*', default=list(DEFAULT_SKIP), metavar='CODE', choices=list(REASONS),
+                        help="Reason codes to ignore (default: DUPLICATE_ROW; --skip alone applies every rule)")
+    parser.add_argument('--item-master', default='item_master.db',
+                        help="Item master index (see item_master.py import); skipped if the file is missing")
+    parser.add_argument('--item-audit', default='item_corrections.csv',
+                        help="Corrected, ambiguous and unknown Item Numbers")
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.input, dtype=str, keep_default_na=False)
+    extra_masks = None
+    if os.path.exists(args.item_master):
+        df, audit = snap_item_numbers(df, load_index(args.item_master))
+        audit.to_csv(args.item_audit, index=False)
+        print(format_item_summary(audit))
+        extra_masks = item_masks(df, audit)
+    clean, quarantined = validate_rows(df, skip=tuple(args.skip), extra_masks=extra_masks)
+    clean.to_csv(args.output, index=False)
+    quarantined.to_csv(args.quarantine, index=False)
+    print(format_summary(clean, quarantined))
+    print(f"Clean rows saved to '{args.output}', quarantined rows to '{args.quarantine}'")
+
+
+if __name__ == "__main__":
+    main()
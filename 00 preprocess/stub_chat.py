@@ -0,0 +1,98 @@
+import hashlib
+import time
+
+from langchain_core.messages import AIMessage
+
+from batching import MARKER_PATTERN, PAGE_MARKER, estimate_tokens
+
+HEADER = "Project Number,Work Order Number,Item Number,Issued Qty"
+# The API bills an image at about width * height / 750 tokens; a page scaled to the
+# 1568 px long edge it resizes to comes to roughly this much
+IMAGE_TOKENS = 1600
+
+
+def _text_blocks(content):
+    """Yield (text, cache_control) for a message's string or content-block list"""
+    if isinstance(content, str):
+        yield content, None
+        return
+    for block in content:
+        if isinstance(block, dict) and block.get('type') == 'text':
+            yield block.get('text', ''), block.get('cache_control')
+
+
+def _image_count(content) -> int:
+    if isinstance(content, str):
+        return 0
+    return sum(1 for block in content if isinstance(block, dict) and block.get('type') in ('image', 'image_url'))
+
+
+def header_only(prompt: str) -> str:
+    """Default responder: an empty CSV per page (one section per page marker)"""
+    pages = MARKER_PATTERN.findall(prompt)
+    if not pages:
+        return HEADER
+    return "\n".join(f"{PAGE_MARKER.format(page_id=page)}\n{HEADER}" for page in pages)
+
+
+class StubChat:
+    """Offline stand-in for ChatAnthropic with the same invoke() interface
+
+    Responses come from responder(user prompt) (header-only CSVs by default)
+    after `latency` seconds. Prompt caching is simulated the way the API bills
+    it: the prefix up to the last cache_control block is written to the cache
+    on first use and read back on later calls within ttl seconds, provided it
+    has at least min_cache_tokens estimated tokens. usage_metadata follows
+    langchain-anthropic, so input_tokens includes cache reads and writes.
+    Image blocks (pages routed as images) add IMAGE_TOKENS each and are
+    counted in image_calls; the responder only sees the text blocks.
+    """
+
+    def __init__(self, responder=header_only, latency: float = 0.0, min_cache_tokens: int = 0,
+                 ttl: float = 300, model: str = 'stub'):
+        self.responder = responder
+        self.latency = latency
+        self.min_cache_tokens = min_cache_tokens
+        self.ttl = ttl
+        self.model = model
+        self._cache = {}
+        self.calls = 0
+        self.image_calls = 0
+
+    def invoke(self, messages):
+        self.calls += 1
+        cached_prefix = []
+        prefix = []
+        for message in messages:
+            for text, cache_control in _text_blocks(message.content):
+                prefix.append(text)
+                if cache_control:
+                    cached_prefix = list(prefix)
+        images = sum(_image_count(message.content) for message in messages)
+        self.image_calls += bool(images)
+        total = sum(estimate_tokens(text) for text in prefix) + images * IMAGE_TOKENS
+        prefix_tokens = sum(estimate_tokens(text) for text in cached_prefix)
+
+        cache_read = cache_write = 0
+        if cached_prefix and prefix_tokens >= self.min_cache_tokens:
+            key = hashlib.sha256("\x00".join(cached_prefix).encode('utf-8')).hexdigest()
+            now = time.monotonic()
+            if now - self._cache.get(key, float('-inf')) <= self.ttl:
+                cache_read = prefix_tokens
+            else:
+                cache_write = prefix_tokens
+            self._cache[key] = now
+
+        if self.latency:
+            # Cached prefixes skip most of the prompt processing time
+            time.sleep(self.latency * (1 - 0.5 * cache_read / max(total, 1)))
+
+        user_text = "".join(text for text, _ in _text_blocks(messages[-1].content))
+        content = self.responder(user_text)
+        output_tokens = estimate_tokens(content)
+        return AIMessage(content=content, usage_metadata={
+            'input_tokens': total,
+            'output_tokens': output_tokens,
+            'total_tokens': total + output_tokens,
+            'input_token_details': {'cache_read': cache_read, 'cache_creation': cache_write},
+        })
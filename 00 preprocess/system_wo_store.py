@@ -0,0 +1,69 @@
+import sqlite3
+
+import pandas as pd
+
+KEY_COLUMNS = ['Project Number', 'Work Order Number']
+
+
+def normalize_keys(df: pd.DataFrame) -> pd.DataFrame:
+    """Cast the join keys to trimmed strings so 70033, 70033.0 and ' 70033' all match"""
+    df = df.copy()
+    for col in KEY_COLUMNS:
+        df[col] = (df[col].astype('string')
+                          .str.strip()
+                          .str.replace(r'\.0$', '', regex=True))
+    return df
+
+
+def read_system_wo_file(system_wo_file: str) -> pd.DataFrame:
+    """Read a pasted systemwo.txt (WO, project, system WO per line; header row skipped)"""
+    df = pd.read_csv(system_wo_file, sep=r'\s+', skiprows=1, header=None, dtype=str,
+                     names=['Work Order Number', 'Project Number', 'systemWO'], usecols=[0, 1, 2])
+    return normalize_keys(df.dropna())
+
+
+class SystemWOStore:
+    """Persistent (project, work order) -> system WO mapping backed by SQLite.
+
+    New systemwo.txt exports are appended with ``import_file``; later rows for
+    an existing key replace the earlier system WO.
+    """
+
+    def __init__(self, db_path: str):
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS system_wo (
+                project_number TEXT NOT NULL,
+                work_order_number TEXT NOT NULL,
+                system_wo TEXT NOT NULL,
+                updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (project_number, work_order_number)
+            )""")
+        self.conn.commit()
+
+    def upsert(self, df: pd.DataFrame) -> int:
+        """Insert or update rows with Project Number, Work Order Number and systemWO columns"""
+        df = normalize_keys(df)
+        rows = list(zip(df['Project Number'], df['Work Order Number'], df['systemWO'].astype(str).str.strip()))
+        with self.conn:
+            self.conn.executemany("""
+                INSERT INTO system_wo (project_number, work_order_number, system_wo)
+                VALUES (?, ?, ?)
+                ON CONFLICT (project_number, work_order_number)
+                DO UPDATE SET system_wo = excluded.system_wo, updated_at = CURRENT_TIMESTAMP
+                """, rows)
+        return len(rows)
+
+    def import_file(self, system_wo_file: str) -> int:
+        return self.upsert(read_system_wo_file(system_wo_file))
+
+    def mapping(self) -> pd.DataFrame:
+        return pd.read_sql_query(
+            'SELECT project_number AS "Project Number", work_order_number AS "Work Order Number", '
+            'system_wo AS "systemWO" FROM system_wo', self.conn, dtype='string')
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM system_wo").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
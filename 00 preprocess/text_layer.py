@@ -0,0 +1,172 @@
+import argparse
+import re
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+COLUMNS = ['Project Number', 'Work Order Number', 'Item Number', 'Issued Qty']
+DEFAULT_THRESHOLD = 1.0
+
+PROJECT_LINE = re.compile(r'\bproject\b', re.IGNORECASE)
+PROJECT_NUMBER = re.compile(r'(?<!\d)7\d{4}(?!\d)')
+# 'Work Order #', 'Work Order No.', 'WO#', 'W.O. No', 'W/O' ... followed by the number on the same line, after any
+# dotted underline. Numbers may be hyphenated or slashed (2026-606, 10483/1). An empty handwritten field must
+# not pick up the next line (a date). The form title 'Work Order Form F-805-01-01' has none of these markers.
+WORK_ORDER = re.compile(r'(?:\bwork\s*order\s*(?:#|no\b\.?|number\b)|\bw[./]?[ \t]?o\b\.?[ \t]*(?:#|no\b\.?)?)'
+                        r'[ \t]*[:\-]?[. \t]*(\d[\d.]*(?:[-/]\d[\d.]*)*)', re.IGNORECASE)
+TABLE_TITLE = re.compile(r'material\s+information', re.IGNORECASE)
+TABLE_HEADER = re.compile(r'item.*\b(?:qty|quantity)\b', re.IGNORECASE)
+TABLE_END = re.compile(r'^\s*(?:total|remarks?|notes?|issued\s+by|received\s+by|requested\s+by|approved|'
+                       r'prepared|signature|store\s*keeper)\b', re.IGNORECASE)
+SERIAL = re.compile(r'^\d{1,3}[.)]?$')
+ITEM = re.compile(r'^[A-Za-z0-9][A-Za-z0-9.\-/=_]*$')
+QUANTITY = re.compile(r'^\d{1,3}(?:,\d{3})*(?:\.\d+)?$|^\d+(?:\.\d+)?$')
+
+
+@dataclass
+class ParsedPage:
+    """Rows read from a page's text layer and how far they can be trusted
+
+    confidence is the weakest of the component scores (project, work_order,
+    table, rows), each between 0 and 1; reasons explains any shortfall.
+    """
+    rows: pd.DataFrame
+    confidence: float
+    scores: dict = field(default_factory=dict)
+    reasons: list = field(default_factory=list)
+
+
+def _unique(values: list):
+    distinct = list(dict.fromkeys(values))
+    return distinct[0] if len(distinct) == 1 else None, distinct
+
+
+def find_project(lines: list) -> tuple:
+    """5-digit 7xxxx number on (or right after) a line mentioning 'Project'"""
+    found = []
+    for index, line in enumerate(lines):
+        if PROJECT_LINE.search(line):
+            numbers = PROJECT_NUMBER.findall(line)
+            if not numbers and index + 1 < len(lines):
+                numbers = PROJECT_NUMBER.findall(lines[index + 1])
+            found.extend(numbers)
+    return _unique(found)
+
+
+def find_work_order(text: str) -> tuple:
+    """Work order after a 'Work Order #' style label; dotted numbers such as dates are not work orders
+
+    >>> find_work_order("Work Order # 2026-606")
+    ('2026-606', ['2026-606'])
+    >>> find_work_order("W/O 10483/1")
+    ('10483/1', ['10483/1'])
+    >>> find_work_order("WO# ........ 614507.")
+    ('614507', ['614507'])
+    >>> find_work_order("Work Order # ........\\n24.11.2024")
+    (None, [])
+    """
+    found = [match.rstrip('.') for match in WORK_ORDER.findall(text)]
+    return _unique([value for value in found if '.' not in value])
+
+
+def find_table(lines: list) -> tuple:
+    """Return (header index, row lines) of the Material Information table, or (None, [])"""
+    start = 0
+    for index, line in enumerate(lines):
+        if TABLE_TITLE.search(line):
+            start = index
+            break
+    for index in range(start, len(lines)):
+        if TABLE_HEADER.search(lines[index]):
+            body = []
+            for line in lines[index + 1:]:
+                if TABLE_END.match(line):
+                    break
+                if line.strip():
+                    body.append(line)
+            return index, body
+    return None, []
+
+
+def parse_row(line: str):
+    """Return (item, quantity, clean) for a table line, or None if it can't be split
+
+    Only lines of [serial] item quantity are taken as clean; a line without a
+    quantity may hold a handwritten value the text layer can't see.
+    """
+    tokens = line.split()
+    if len(tokens) >= 2 and SERIAL.match(tokens[0]) and (len(tokens) >= 3 or not QUANTITY.match(tokens[1])):
+        tokens = tokens[1:]
+    if len(tokens) == 2 and ITEM.match(tokens[0]) and QUANTITY.match(tokens[1]):
+        return tokens[0], tokens[1].replace(',', ''), True
+    if len(tokens) == 1 and ITEM.match(tokens[0]) and not QUANTITY.match(tokens[0]):
+        return tokens[0], '', False
+    return None
+
+
+def parse_page_text(text: str) -> ParsedPage:
+    """Extract rows from a digital form's text layer and score the result"""
+    lines = (text or '').splitlines()
+    reasons = []
+
+    project, projects = find_project(lines)
+    work_order, work_orders = find_work_order(text or '')
+    header, body = find_table(lines)
+
+    parsed = [parse_row(line) for line in body]
+    clean = sum(1 for row in parsed if row and row[2])
+    blank_qty = sum(1 for row in parsed if row and not row[2])
+    unparsed = sum(1 for row in parsed if row is None)
+
+    scores = {
+        'project': 1.0 if project else 0.0,
+        'work_order': 1.0 if work_order else 0.0,
+        'table': 1.0 if header is not None else 0.0,
+        'rows': (clean + 0.5 * blank_qty) / len(body) if body else 0.0,
+    }
+    if not project:
+        reasons.append(f"project number {'ambiguous: ' + ', '.join(projects) if projects else 'not found'}")
+    if not work_order:
+        reasons.append(f"work order {'ambiguous: ' + ', '.join(work_orders) if work_orders else 'not found'}")
+    if header is None:
+        reasons.append("no Material Information table header")
+    elif not body:
+        reasons.append("table has no rows")
+    if blank_qty:
+        reasons.append(f"{blank_qty} rows without a quantity")
+    if unparsed:
+        reasons.append(f"{unparsed} rows could not be split into item and quantity")
+
+    rows = pd.DataFrame(
+        [[project or '', work_order or '', row[0], row[1]] for row in parsed if row],
+        columns=COLUMNS)
+    return ParsedPage(rows=rows, confidence=min(scores.values()), scores=scores, reasons=reasons)
+
+
+def main():
+    from pypdf import PdfReader
+
+    parser = argparse.ArgumentParser(description="Show what the text-layer fast path reads from each PDF page")
+    parser.add_argument('pdfs', nargs='+')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument('--rows', action='store_true', help="Print the parsed rows too")
+    args = parser.parse_args()
+
+    total = fast = 0
+    for path in args.pdfs:
+        for page_number, page in enumerate(PdfReader(path).pages, 1):
+            result = parse_page_text(page.extract_text())
+            total += 1
+            accepted = result.confidence >= args.threshold
+            fast += accepted
+            status = 'fast path' if accepted else 'LLM'
+            detail = '; '.join(result.reasons) or f"{len(result.rows)} rows"
+            print(f"{path} p{page_number}: confidence {result.confidence:.2f} -> {status} ({detail})")
+            if args.rows and len(result.rows):
+                print(result.rows.to_string(index=False))
+    if total:
+        print(f"\nFast path would take {fast} of {total} pages ({fast / total:.0%})")
+
+
+if __name__ == "__main__":
+    main()
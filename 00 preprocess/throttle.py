@@ -0,0 +1,84 @@
+import random
+import threading
+import time
+
+
+class TokenBucket:
+    """Thread-safe token bucket that paces API calls to a target rate.
+
+    The rate adapts to the API: ``penalize()`` halves it after a 429/overload
+    response and ``reward()`` creeps it back towards the configured ceiling
+    after each successful call.
+    """
+
+    def __init__(self, requests_per_minute: float, burst: int = 1):
+        self.max_rate = requests_per_minute / 60.0
+        self.min_rate = self.max_rate / 16
+        self.rate = self.max_rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        """Block until a token is available, then consume it"""
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait_for = (1 - self.tokens) / self.rate
+            time.sleep(wait_for)
+
+    def penalize(self):
+        """Halve the request rate after the API pushed back"""
+        with self.lock:
+            self._refill()
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = min(self.tokens, 0.0)
+
+    def reward(self):
+        """Recover a little of the request rate after a successful call"""
+        with self.lock:
+            self._refill()
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+
+def is_retryable(error: Exception) -> bool:
+    """True for rate-limit (429) and overload (529/503) responses"""
+    status = getattr(error, 'status_code', None)
+    if status is None:
+        status = getattr(getattr(error, 'response', None), 'status_code', None)
+    if status in (429, 503, 529):
+        return True
+    message = str(error).lower()
+    return any(marker in message for marker in ('429', 'rate limit', 'rate_limit', 'overloaded', '529'))
+
+
+def call_with_backoff(func, bucket: TokenBucket = None, max_retries: int = 6,
+                      base_delay: float = 2.0, max_delay: float = 60.0):
+    """Call ``func()``, retrying with exponential backoff and jitter on 429/overload errors"""
+    for attempt in range(max_retries + 1):
+        if bucket is not None:
+            bucket.acquire()
+        try:
+            result = func()
+        except Exception as e:
+            if attempt == max_retries or not is_retryable(e):
+                raise
+            if bucket is not None:
+                bucket.penalize()
+            delay = min(max_delay, base_delay * 2 ** attempt) * random.uniform(0.5, 1.0)
+            print(f"API busy ({e.__class__.__name__}), retrying in {delay:.1f}s "
+                  f"(attempt {attempt + 1} of {max_retries})...")
+            time.sleep(delay)
+            continue
+        if bucket is not None:
+            bucket.reward()
+        return result
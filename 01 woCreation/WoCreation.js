@@ -106,70 +106,95 @@ const triggerAdd = async () => {
     throw new Error('Could not find any way to trigger Add action');
 };
 
-// Queue to store work orders to be processed
-const workOrderQueue = [
-    { branch: '70033', wo: '10503', isFirstRun: true },
-    { branch: '70040', wo: '10500', isFirstRun: false },
-    { branch: '70040', wo: '10502', isFirstRun: false },
-    { branch: '70052', wo: '10492', isFirstRun: false },
-    { branch: '70052', wo: '10493', isFirstRun: false },
-    { branch: '70052', wo: '10507', isFirstRun: false },
-    { branch: '70028', wo: '422', isFirstRun: false },
-    { branch: '70033', wo: '10368', isFirstRun: false },
-    { branch: '70040', wo: '10471', isFirstRun: false },
-    { branch: '70043', wo: '10434', isFirstRun: false },
-    { branch: '70049', wo: '10466', isFirstRun: false },
-    { branch: '70049', wo: '10449', isFirstRun: false },
-    { branch: '70052', wo: '10429', isFirstRun: false },
-    { branch: '70052', wo: '10436', isFirstRun: false },
-    { branch: '70052', wo: '10438', isFirstRun: false },
-    { branch: '70052', wo: '10442', isFirstRun: false },
-    { branch: '70052', wo: '10477', isFirstRun: false },
-    { branch: '70052', wo: '10504', isFirstRun: false },
-    { branch: '70052', wo: '10468', isFirstRun: false },
-    { branch: '70033', wo: '10518', isFirstRun: false },
-    { branch: '70043', wo: '10375', isFirstRun: false },
-    { branch: '70052', wo: '10478', isFirstRun: false },
-    { branch: '70052', wo: '10475', isFirstRun: false },
-    { branch: '70052', wo: '10479', isFirstRun: false },
-    { branch: '70033', wo: '10098', isFirstRun: false },
-    { branch: '70033', wo: '10483', isFirstRun: false },
-    { branch: '70033', wo: '10487', isFirstRun: false },
-    { branch: '70033', wo: '10499', isFirstRun: false },
-    { branch: '70033', wo: '10501', isFirstRun: false },
-    { branch: '70033', wo: '10510', isFirstRun: false },
-    { branch: '70040', wo: '10482', isFirstRun: false },
-    { branch: '70040', wo: '10484', isFirstRun: false },
-    { branch: '70040', wo: '10495', isFirstRun: false },
-    { branch: '70040', wo: '10497', isFirstRun: false },
-    { branch: '70040', wo: '10506', isFirstRun: false },
-    { branch: '70043', wo: '10485', isFirstRun: false },
-    { branch: '70043', wo: '10490', isFirstRun: false },
-    { branch: '70043', wo: '10505', isFirstRun: false },
-    { branch: '70049', wo: '10491', isFirstRun: false },
-    { branch: '70052', wo: '10476', isFirstRun: false },
-    { branch: '70052', wo: '10494', isFirstRun: false },
-    { branch: '70052', wo: '10496', isFirstRun: false },
-    { branch: '70052', wo: '10498', isFirstRun: false },
-    { branch: '70063', wo: '10508', isFirstRun: false },
-    { branch: '70032', wo: '2026-606', isFirstRun: false },
-    { branch: '70032', wo: '2026-607', isFirstRun: false },
-    { branch: '70032', wo: '2026-608', isFirstRun: false },
-    { branch: '70032', wo: '2026-609', isFirstRun: false },
-    { branch: '70032', wo: '2026-610', isFirstRun: false },
-    { branch: '70032', wo: '2026-611', isFirstRun: false },
-    { branch: '70032', wo: '2026-612', isFirstRun: false },
-    { branch: '70032', wo: '2026-613', isFirstRun: false },
-    { branch: '70032', wo: '2026-614', isFirstRun: false },
-    { branch: '70032', wo: '2026-615', isFirstRun: false },
-    { branch: '70032', wo: '2026-616', isFirstRun: false },
-    { branch: '70032', wo: '2026-617', isFirstRun: false },
-    { branch: '70032', wo: '2026-618', isFirstRun: false },
-    { branch: '70032', wo: '2026-619', isFirstRun: false },
-    { branch: '70032', wo: '2026-620', isFirstRun: false },
-    { branch: '70032', wo: '2026-621', isFirstRun: false },
-    { branch: '70032', wo: '2026-622', isFirstRun: false }
-];
+// --- QUEUE PAYLOAD ---
+// Queue data is written by the Python stage scripts to a JSON payload
+// (schema 'jde-automation-queue', version 1) and loaded here at run time.
+const PAYLOAD_SCHEMA = 'jde-automation-queue';
+const PAYLOAD_VERSION = 1;
+
+const validatePayload = (payload, stage, requiredFields) => {
+    if (!payload || payload.schema !== PAYLOAD_SCHEMA || payload.version !== PAYLOAD_VERSION) {
+        throw new Error(`Not a ${PAYLOAD_SCHEMA} v${PAYLOAD_VERSION} payload`);
+    }
+    if (payload.stage !== stage) {
+        throw new Error(`Payload holds '${payload.stage}' data, expected '${stage}'`);
+    }
+    if (!Array.isArray(payload.items)) throw new Error('Payload has no items array');
+    payload.items.forEach((item, index) => {
+        requiredFields.forEach(field => {
+            if (!(field in item)) throw new Error(`Payload item ${index} is missing '${field}'`);
+        });
+    });
+    console.log(`Loaded ${payload.items.length} ${stage} items (generated ${payload.generated_at})`);
+    return payload.items;
+};
+
+// Load a payload from a URL, or let the user pick the file when no URL is given
+const loadPayload = async (stage, requiredFields, url = null) => {
+    if (url) {
+        const response = await fetch(url);
+        if (!response.ok) throw new Error(`Failed to fetch ${url}: ${response.status}`);
+        return validatePayload(await response.json(), stage, requiredFields);
+    }
+    const text = await new Promise((resolve, reject) => {
+        const overlay = document.createElement('div');
+        overlay.style = 'position: fixed; top: 10px; left: 50%; transform: translateX(-50%); z-index: 10000; padding: 15px; background: #fff; border: 4px solid #0066cc; box-shadow: 0 4px 15px rgba(0,0,0,0.5); text-align: center; font-family: sans-serif;';
+        overlay.innerHTML = `
+            <div style="margin-bottom: 10px; font-weight: bold; font-size: 16px;">Select the ${stage} payload file</div>
+            <input type="file" accept=".json,application/json">
+            <button style="margin-left: 8px; padding: 4px 12px; cursor: pointer;">Cancel</button>
+        `;
+        document.body.appendChild(overlay);
+        overlay.querySelector('button').onclick = () => {
+            overlay.remove();
+            reject(new Error('Payload selection cancelled'));
+        };
+        overlay.querySelector('input').onchange = (event) => {
+            const file = event.target.files[0];
+            overlay.remove();
+            if (!file) return reject(new Error('No payload file selected'));
+            file.text().then(resolve, reject);
+        };
+    });
+    return validatePayload(JSON.parse(text), stage, requiredFields);
+};
+
+// --- RESULTS FILE ---
+// Per-WO outcomes downloaded as <stage>.results.json for the status ledger:
+//   python wo_ledger.py import <stage> <stage>.results.json
+const RESULTS_SCHEMA = 'jde-automation-results';
+
+const saveResults = (stage, items) => {
+    if (window.jdeSaveResults === false) return;  // e.g. benchmark runs against mock_jde
+    const results = {
+        schema: RESULTS_SCHEMA,
+        version: 1,
+        stage,
+        generated_at: new Date().toISOString(),
+        count: items.length,
+        items
+    };
+    const link = document.createElement('a');
+    link.href = URL.createObjectURL(new Blob([JSON.stringify(results)], { type: 'application/json' }));
+    link.download = `${stage}.results.json`;
+    document.body.appendChild(link);
+    link.click();
+    link.remove();
+    setTimeout(() => URL.revokeObjectURL(link.href), 1000);
+    console.log(`Saved ${items.length} ${stage} results to ${stage}.results.json (import with wo_ledger.py)`);
+};
+
+// Queue to store work orders to be processed (filled from WoCreation.payload.json, see wo.py)
+const workOrderQueue = [];
+
+// Function to load the queue from the payload written by wo.py
+async function loadWorkOrderPayload(url = null) {
+    const items = await loadPayload('wo_creation', ['branch', 'wo', 'isFirstRun', 'branchChanged'], url);
+    workOrderQueue.length = 0;
+    workOrderQueue.push(...items);
+    console.log(`Work order queue loaded. Current queue length: ${workOrderQueue.length}`);
+    return workOrderQueue.length;
+}
 
 // Helper function to click Cancel button
 const clickCancelButton = async () => {
@@ -197,8 +222,22 @@ const clickCancelButton = async () => {
     }
 };
 
+// Type the branch into a field, unless the queue stays on the same branch and the
+// form kept it from the previous work order (wo.py groups the queue by branch)
+const enterBranch = async (selector, branchNumber, branchChanged, step) => {
+    const input = await waitForElementInIframe(selector);
+    if (!branchChanged && input.value.trim() === branchNumber) {
+        console.log(`✓ Step ${step}: Branch ${branchNumber} already entered, keeping it`);
+        return;
+    }
+    input.value = branchNumber;
+    input.dispatchEvent(new Event('change', { bubbles: true }));
+    input.dispatchEvent(new Event('blur'));
+    console.log(`✓ Step ${step}: Successfully inserted branch number:`, branchNumber);
+};
+
 // Main automation function
-async function automateWorkOrder(branchNumber, woNumber, isFirstRun = true) {
+async function automateWorkOrder(branchNumber, woNumber, isFirstRun = true, branchChanged = true) {
     try {
         const DELAY = 1500;
 
@@ -312,11 +351,7 @@ async function automateWorkOrder(branchNumber, woNumber, isFirstRun = true) {
         // Step 7: Insert branch number
         console.log('Step 7: Looking for branch number input...');
         await wait(DELAY);
-        const branchInput = await waitForElementInIframe('input[name="0_43"]');
-        branchInput.value = branchNumber;
-        branchInput.dispatchEvent(new Event('change', { bubbles: true }));
-        branchInput.dispatchEvent(new Event('blur'));
-        console.log('✓ Step 7: Successfully inserted branch number:', branchNumber);
+        await enterBranch('input[name="0_43"]', branchNumber, branchChanged, 7);
 
         // Step 8: Insert WO number
         console.log('Step 8: Looking for WO number input...');
@@ -353,11 +388,7 @@ async function automateWorkOrder(branchNumber, woNumber, isFirstRun = true) {
         // Step 12: Insert branch number again
         console.log('Step 12: Looking for second branch number input...');
         await wait(DELAY);
-        const branchInput2 = await waitForElementInIframe('input[name="0_199"]');
-        branchInput2.value = branchNumber;
-        branchInput2.dispatchEvent(new Event('change', { bubbles: true }));
-        branchInput2.dispatchEvent(new Event('blur'));
-        console.log('✓ Step 12: Successfully inserted branch number again:', branchNumber);
+        await enterBranch('input[name="0_199"]', branchNumber, branchChanged, 12);
 
         // Step 13-14: Click OK twice
         for (let i = 0; i < 2; i++) {
@@ -418,7 +449,7 @@ async function processWorkOrders() {
         console.log(`Processing work order ${i + 1}/${workOrderQueue.length}:`, workOrder);
         
         try {
-            const systemWO = await automateWorkOrder(workOrder.branch, workOrder.wo, workOrder.isFirstRun);
+            const systemWO = await automateWorkOrder(workOrder.branch, workOrder.wo, workOrder.isFirstRun, workOrder.branchChanged);
             
             if (!systemWO) {
                 throw new Error('SystemWO value not obtained');
@@ -487,6 +518,12 @@ async function processWorkOrders() {
     console.log(`Successful: ${successCount}`);
     console.log(`Failed: ${failureCount}`);
     console.log(`Success Rate: ${((successCount / workOrderQueue.length) * 100).toFixed(2)}%`);
+
+    saveResults('created', results.map(r => ({
+        wo: r.wo,
+        status: r.status === 'success' ? 'done' : 'failed',
+        detail: r.status === 'success' ? r.systemWO : r.error
+    })));
     
     return results;
 }
@@ -521,6 +558,9 @@ function clearWorkOrderQueue() {
 async function runAutomation(branch, wo, isFirstRun) {
     if (arguments.length === 0) {
         // Batch processing
+        if (workOrderQueue.length === 0) {
+            await loadWorkOrderPayload();
+        }
         if (workOrderQueue.length === 0) {
             console.log('No work orders in queue to process.');
             return;
@@ -548,6 +588,7 @@ window.workOrderAutomation = {
     addWorkOrders,
     clearWorkOrderQueue,
     runAutomation,
+    loadPayload: loadWorkOrderPayload,
     getQueueLength: () => workOrderQueue.length,
     getQueue: () => [...workOrderQueue]
 };
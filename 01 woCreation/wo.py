@@ -1,32 +1,70 @@
-import re
+import argparse
+import os
+import sys
 
-def update_work_order_queue(wo_data_path, js_path):
-    # Read work orders from WoData.txt
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from queue_payload import write_payload
+from wo_ledger import DEFAULT_DB, skip_completed
+
+# WoCreation.js types the branch into two fields (0_43 header, 0_199 accounting tab) per
+# work order, each a change/blur round trip plus its 1.5 s step delay; on a repeat of the
+# same branch the fields already hold it and are left alone
+BRANCH_FIELDS = 2
+SECONDS_PER_BRANCH_FIELD = 1.5
+
+def read_work_orders(wo_data_path):
+    """Read (wo, branch) pairs from WoData.txt"""
     work_orders = []
     with open(wo_data_path, 'r', encoding='utf-8') as f:
         for line in f:
-            wo_num, branch_num = line.strip().split()
-            work_orders.append((wo_num, branch_num))
-    
-    # Generate new queue content
-    queue_items = []
-    for i, (wo_num, branch_num) in enumerate(work_orders):
-        is_first = "true" if i == 0 else "false"
-        queue_items.append(f"    {{ branch: '{branch_num}', wo: '{wo_num}', isFirstRun: {is_first} }}")
-    
-    new_queue = "const workOrderQueue = [\n" + ",\n".join(queue_items) + "\n];"
-    
-    # Read the entire JS file with UTF-8 encoding
-    with open(js_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # Replace the workOrderQueue initialization while preserving the rest of the file
-    pattern = r"const workOrderQueue = \[[\s\S]*?\];"
-    updated_content = re.sub(pattern, new_queue, content)
-    
-    # Write the modified content back to the file with UTF-8 encoding
-    with open(js_path, 'w', encoding='utf-8', newline='\n') as f:
-        f.write(updated_content)
+            if line.strip():
+                wo_num, branch_num = line.strip().split()
+                work_orders.append((wo_num, branch_num))
+    return work_orders
+
+def group_by_branch(work_orders):
+    """Order (wo, branch) pairs by branch, keeping the file order within a branch"""
+    return sorted(work_orders, key=lambda row: (row[1].zfill(12), row[1]))
+
+def count_branch_switches(work_orders):
+    """Number of times the branch changes along the queue, counting the first entry"""
+    return sum(1 for i, (_, branch) in enumerate(work_orders) if i == 0 or branch != work_orders[i - 1][1])
+
+def format_switch_report(file_order, queue_order):
+    """Branch switches of the queue against WoData.txt order and the branch entries it saves"""
+    before = count_branch_switches(file_order)
+    after = count_branch_switches(queue_order)
+    saved = before - after
+    return (f"Branch switches: {before} in file order, {after} in queue order "
+            f"({saved} fewer; about {saved * BRANCH_FIELDS} branch field entries and "
+            f"{saved * BRANCH_FIELDS * SECONDS_PER_BRANCH_FIELD:.0f} s saved)")
+
+def update_work_order_queue(wo_data_path, payload_path, ledger_path=DEFAULT_DB, group_branches=True):
+    """Write the WoCreation.js queue payload from WoData.txt
+
+    Work orders the ledger already records as created are left out
+    (ledger_path=None queues everything). The rest are grouped by branch
+    (group_branches=False keeps the file order); isFirstRun marks the entry
+    that navigates to Work Order Entry and branchChanged the entries whose
+    branch differs from the one before.
+    """
+    work_orders = skip_completed('created', read_work_orders(wo_data_path), key=lambda row: row[0],
+                                 db_path=ledger_path)
+    queue_order = group_by_branch(work_orders) if group_branches else work_orders
+    print(format_switch_report(work_orders, queue_order))
+
+    queue_items = [
+        {'branch': branch_num, 'wo': wo_num, 'isFirstRun': i == 0,
+         'branchChanged': i == 0 or branch_num != queue_order[i - 1][1]}
+        for i, (wo_num, branch_num) in enumerate(queue_order)
+    ]
+    return write_payload(payload_path, 'wo_creation', queue_items)
 
 # Usage
-update_work_order_queue('WoData.txt', 'WoCreation.js')
\ No newline at end of file
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write the WoCreation.js queue payload from WoData.txt")
+    parser.add_argument('--input', default='WoData.txt')
+    parser.add_argument('--output', default='WoCreation.payload.json')
+    parser.add_argument('--keep-file-order', action='store_true', help="Don't group work orders by branch")
+    args = parser.parse_args()
+    update_work_order_queue(args.input, args.output, group_branches=not args.keep_file_order)
@@ -0,0 +1,118 @@
+import argparse
+
+import pandas as pd
+
+COLUMNS = ['System_Work_Order', 'Item Number', 'Issued Qty']
+AUDIT_COLUMNS = ['System_Work_Order', 'Item Number', 'Action', 'Source Lines', 'Quantities', 'Result Qty']
+# dragon3.js spends this long per line at its default DELAYS: item entry (focus, commit,
+# entry gap) plus quantity entry (focus, Enter, key up, commit, entry gap)
+SECONDS_PER_LINE = (0.1 + 0.5 + 1.0) + (0.1 + 0.1 + 0.05 + 0.5 + 1.0)
+
+
+def read_parts_csv(path_or_buffer) -> pd.DataFrame:
+    """Read updated_output.csv (system WO, item, quantity in the first three columns) with source line numbers"""
+    df = pd.read_csv(path_or_buffer, dtype=str, keep_default_na=False)
+    df = df.iloc[:, :3].set_axis(COLUMNS, axis=1)
+    return df.assign(Line=df.index + 2)
+
+
+def _format_qty(value):
+    return int(value) if float(value).is_integer() else value
+
+
+def consolidate_lines(df: pd.DataFrame) -> tuple:
+    """Merge duplicate (system WO, item) lines and drop the ones dragon3 should not enter
+
+    Every repeat of a WO and item is summed, including repeats with the same
+    quantity (row_validator leaves those to this step). Returns (lines, audit,
+    stats). lines has one row per WO and item with the summed quantity, sorted
+    by WO then item; audit has one row per merge or dropped line, with
+    merges of identical lines marked merged_identical so they can be checked
+    for double extraction; stats counts what changed.
+    """
+    df = df.copy()
+    if 'Line' not in df.columns:
+        df['Line'] = df.index + 2
+    df['System_Work_Order'] = df['System_Work_Order'].astype('string').str.strip().str.replace(r'\.0$', '', regex=True)
+    df['Item Number'] = df['Item Number'].astype('string').str.strip()
+    df['Qty'] = pd.to_numeric(df['Issued Qty'].astype('string').str.replace(',', '', regex=False), errors='coerce')
+
+    non_numeric = df[df['Qty'].isna()]
+    zero = df[df['Qty'].eq(0)]
+    valid = df[df['Qty'].notna() & df['Qty'].ne(0)]
+
+    grouped = valid.groupby(['System_Work_Order', 'Item Number'], sort=False).agg(
+        qty=('Qty', 'sum'), count=('Qty', 'size'), distinct=('Qty', 'nunique'),
+        lines=('Line', lambda s: ';'.join(map(str, s))),
+        quantities=('Qty', lambda s: '+'.join(str(_format_qty(q)) for q in s))).reset_index()
+    non_positive = grouped[grouped['qty'] <= 0]
+    kept = grouped[grouped['qty'] > 0]
+    merged = kept[kept['count'] > 1]
+
+    def audit_rows(frame, action, lines, quantities, result):
+        return pd.DataFrame({'System_Work_Order': frame['System_Work_Order'], 'Item Number': frame['Item Number'],
+                             'Action': action, 'Source Lines': lines, 'Quantities': quantities,
+                             'Result Qty': result})
+
+    audit = pd.concat([
+        audit_rows(merged, merged['distinct'].eq(1).map({True: 'merged_identical', False: 'merged'}),
+                   merged['lines'], merged['quantities'], merged['qty'].map(_format_qty)),
+        audit_rows(zero, 'dropped_zero', zero['Line'].astype(str), zero['Issued Qty'], ''),
+        audit_rows(non_numeric, 'dropped_non_numeric', non_numeric['Line'].astype(str), non_numeric['Issued Qty'], ''),
+        audit_rows(non_positive, 'dropped_non_positive_total', non_positive['lines'], non_positive['quantities'],
+                   non_positive['qty'].map(_format_qty)),
+    ], ignore_index=True)[AUDIT_COLUMNS]
+
+    lines = (kept.rename(columns={'qty': 'Issued Qty'})[COLUMNS]
+                 .sort_values(['System_Work_Order', 'Item Number'],
+                              key=lambda s: s.str.zfill(12) if s.name == 'System_Work_Order' else s.str.upper())
+                 .reset_index(drop=True))
+    lines['Issued Qty'] = lines['Issued Qty'].map(_format_qty)
+
+    # Non-numeric lines were never entered, so they don't count towards the saving
+    entered_before = len(df) - len(non_numeric)
+    stats = {
+        'input_lines': len(df),
+        'output_lines': len(lines),
+        'work_orders': lines['System_Work_Order'].nunique(),
+        'merged_groups': len(merged),
+        'merged_lines': int(merged['count'].sum() - len(merged)),
+        'dropped_zero': len(zero),
+        'dropped_non_numeric': len(non_numeric),
+        'dropped_non_positive_total': int(non_positive['count'].sum()),
+        'lines_saved': entered_before - len(lines),
+    }
+    return lines, audit, stats
+
+
+def format_report(stats: dict) -> str:
+    """Summary of the consolidation and the dragon3 grid entries it saves"""
+    saved = stats['lines_saved']
+    lines = [
+        f"Consolidated {stats['input_lines']} parts lines into {stats['output_lines']} "
+        f"across {stats['work_orders']} work orders",
+        f"  Merged {stats['merged_lines']} duplicate lines into {stats['merged_groups']} lines",
+        f"  Dropped {stats['dropped_zero']} zero-quantity lines, {stats['dropped_non_numeric']} non-numeric "
+        f"and {stats['dropped_non_positive_total']} whose total was not positive",
+        f"  UI interactions saved: {2 * saved} (item and quantity entries for {saved} lines, "
+        f"about {saved * SECONDS_PER_LINE / 60:.1f} minutes at the default delays)",
+    ]
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge duplicate parts lines per work order before dragon3 entry")
+    parser.add_argument('--input', default="D:\\auto\\00 preprocess\\updated_output.csv")
+    parser.add_argument('--output', default='consolidated_parts.csv', help="One line per work order and item")
+    parser.add_argument('--audit', default='consolidation_audit.csv', help="Merged and dropped lines")
+    args = parser.parse_args()
+
+    lines, audit, stats = consolidate_lines(read_parts_csv(args.input))
+    lines.to_csv(args.output, index=False)
+    audit.to_csv(args.audit, index=False)
+    print(format_report(stats))
+    print(f"Consolidated lines saved to '{args.output}', audit trail to '{args.audit}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,42 @@
 // Helper function to wait for specified milliseconds
 const wait = (ms) => new Promise(resolve => setTimeout(resolve, ms));
 
+// Fixed waits in ms. To tune them, set window.jdeDelays before loading the script,
+// e.g. { scale: 0.5, afterOk: 1200 }: named values replace the default, scale multiplies
+// the rest (measure with mock_jde/bench.py before changing the defaults)
+const DELAYS = {
+    poll: 100,              // element polling interval
+    step: 1500,             // before each step of opening a work order
+    beforeCancel: 1500,
+    afterCancel: 1500,
+    beforeOk: 1500,
+    afterOk: 2000,
+    menuOpen: 500,          // after clicking the Row menu, and before retrying the menu exit
+    screenLoad: 4500,       // after selecting Parts Detail
+    openSettle: 3000,       // after opening Parts Detail for a new work order
+    fieldFocus: 100,        // after focusing a grid cell, and before pressing Enter
+    keyUp: 50,
+    fieldCommit: 500,       // after Enter in an item or quantity cell
+    entryGap: 1000,         // between grid entries
+    phasePoll: 1000,        // while waiting for an entry phase to finish
+    afterItemsOk: 3000,
+    reselectRetry: 1000,
+    afterReselect: 3000,    // before the quantities phase
+    afterQtyOk: 2000,
+    betweenWorkOrders: 3000
+};
+const delayOverrides = window.jdeDelays || {};
+Object.keys(DELAYS).forEach(key => {
+    DELAYS[key] = key in delayOverrides ? delayOverrides[key] : Math.round(DELAYS[key] * (delayOverrides.scale || 1));
+});
+
 // Helper function to wait for element to be available
 const waitForElement = async (selector, timeout = 10000) => {
     const startTime = Date.now();
     while (Date.now() - startTime < timeout) {
         const element = document.querySelector(selector);
         if (element) return element;
-        await wait(100);
+        await wait(DELAYS.poll);
     }
     throw new Error(`Element ${selector} not found after ${timeout}ms`);
 };
@@ -25,7 +54,7 @@ const waitForElementInIframe = async (selector, timeout = 10000) => {
         } catch (e) {
             console.log('Iframe access error:', e);
         }
-        await wait(100);
+        await wait(DELAYS.poll);
     }
     throw new Error(`Element ${selector} not found in iframe after ${timeout}ms`);
 };
@@ -34,7 +63,7 @@ const waitForElementInIframe = async (selector, timeout = 10000) => {
 const clickCancelButton = async () => {
     try {
         console.log('Attempting to click Cancel button...');
-        await wait(1500);
+        await wait(DELAYS.beforeCancel);
         const closeButton = await waitForElementInIframe('img[name="hc_Cancel"]');
         
         try {
@@ -49,7 +78,7 @@ const clickCancelButton = async () => {
             closeButton.click(); // Fallback to direct click
         }
         console.log('Successfully clicked Cancel button');
-        await wait(1500);
+        await wait(DELAYS.afterCancel);
     } catch (error) {
         console.error('Failed to click Cancel button:', error);
         throw error;
@@ -60,7 +89,7 @@ const clickCancelButton = async () => {
 async function clickOkButton() {
     try {
         console.log('Attempting to click OK button...');
-        await wait(1500);
+        await wait(DELAYS.beforeOk);
         
         const iframe = document.getElementById('e1menuAppIframe');
         if (!iframe) throw new Error('Iframe not found');
@@ -85,7 +114,7 @@ async function clickOkButton() {
             console.log('Successfully clicked OK button directly');
         }
 
-        await wait(2000); // Wait for OK action to complete
+        await wait(DELAYS.afterOk); // Wait for OK action to complete
         return true;
     } catch (error) {
         console.error('Failed to click OK button:', error);
@@ -97,8 +126,7 @@ async function clickOkButton() {
 async function selectPartsDetail() {
     try {
         console.log('Selecting Parts Detail from menu...');
-        const DELAY = 1500;
-        await wait(DELAY);
+        await wait(DELAYS.step);
 
         const iframe = document.getElementById('e1menuAppIframe');
         if (!iframe) throw new Error('Iframe not found');
@@ -111,7 +139,7 @@ async function selectPartsDetail() {
             console.log('Attempting menu selection...');
             // Click the menu to ensure it's active
             rowMenu.click();
-            await wait(500);
+            await wait(DELAYS.menuOpen);
             
             // Find Parts Detail option
             const partsDetailOption = Array.from(rowMenu.options).find(option => 
@@ -155,7 +183,7 @@ async function selectPartsDetail() {
             // Second attempt: Direct JDEDTAFactory call
             console.log('Attempting direct factory call...');
             try {
-                await wait(500); // Small wait before retry
+                await wait(DELAYS.menuOpen); // Small wait before retry
                 iframe.contentWindow.JDEDTAFactory.getInstance('').post('0_192');
             } catch (factoryError) {
                 console.error('Both menu selection methods failed');
@@ -164,7 +192,7 @@ async function selectPartsDetail() {
         }
 
         // Wait longer after selection to ensure screen loads
-        await wait(DELAY * 3);
+        await wait(DELAYS.screenLoad);
         console.log('Successfully selected Parts Detail');
         return true;
 
@@ -174,243 +202,104 @@ async function selectPartsDetail() {
     }
 }
 
-// Initialize work order items map
-const workOrderItems = new Map();
+// --- QUEUE PAYLOAD ---
+// Queue data is written by the Python stage scripts to a JSON payload
+// (schema 'jde-automation-queue', version 1) and loaded here at run time.
+const PAYLOAD_SCHEMA = 'jde-automation-queue';
+const PAYLOAD_VERSION = 1;
 
-// Parse CSV data and organize by work order
-const csvData = `615197,004E8J-EG115EYL,4985
-615197,004T8J-EG111EAQ,8058
-615197,BELDEN 4000UE,40
-615200,SPH-01P,66
-615200,CCHEP-1111BB,66
-615200,03-1605-00038,560
-615200,95-050-99-X,280
-615201,CCH-04U,10
-615201,CCHE-CP24-04,68
-615201,03-1605-00038,1632
-615201,CCHE-CP24-E4,34
-615201,95-050-99-X,816
-615199,GNA_F_00868666,10
-615199,GNA_F_00868940,10
-615199,OC-13 -013-026-0005,500
-615199,OC-40 -040-005-0001,100
-615206,CCAAGB-G1002-A040-C0,5
-615206,CCAAGB-G1002-A050-C0,5
-615204,CCXEDR-D0047-C003-L7,12
-615205,E0075,338
-615205,GNA_F_00868663,30
-615203,CCXEDR-D0047-C003-L7,10
-615202,CCXEDR-D0047-C003-L7,10
-615207,SSABS/2,7
-615207,23-0105-00028,500
-615207,OC-40 -040-001-0115,507
-615208,OC-40 -040-001-0115,338
-615208,23-0105-00028,300
-615209,BE-8723NH-1050,2100
-615210,4000UE,34
-615210,8762NH,24
-615214,USC075,2000
-615214,LP-FXN-BLT-CRG-GL06020,10000
-615211,IFBLWD8H41H,200
-615212,IFBLWD8H41H,200
-615213,IFBLWD8H41H,250
-615215,OC-13 -013-026-0004,100
-615196,09-2205-00001,1
-615198,CCH-04U,2
-615198,CCHE-CP24-04,8
-615198,03-1605-00038,250
-615198,CCHE-CP24-E4,8
-615198,95-050-99-X,250
-615191,RQC801A45H,6
-615192,01-0103-00221,20
-615192,DPS-M-BK,20
-615193,4098-9714,50
-615193,4098-9733,30
-615193,4090-9001,80
-615193,4090-9116,30
-615194,4009-9301,5
-615195,4090-9002,80
-615178,01-0101-00082,1
-615179,VS-S2T-10G,2
-615180,TSZ1058072,45
-615181,01-0103-00149,1
-615181,01-0103-00213,2
-615181,01-0103-00129,1
-615181,01-0103-00214,1
-615181,01-0103-00215,1
-615182,LC1-UM24E8,2
-615182,MXW2X/BETA58=-Z11,1
-615182,MXWAPXD2UK=-Z11,1
-615182,SLP14/T-WH,27
-615182,CONTROL 24CT MICRO,67
-615182,C9410R,4
-615182,C9400-PWR-3200AC,8
-615182,C9400X-SUP-2XL,4
-615182,C9400-LC-48S,30
-615182,C9400-LC-48T,2
-615183,571302,5
-615183,572284,5
-615188,4090-9116,200
-615188,4090-9001,300
-615188,4098-9714,500
-615188,4098-9764,200
-615187,4098-9764,50
-615186,4009-9301,6
-615186,4098-9714,70
-615186,4098-9764,30
-615186,4098-9733,20
-615186,4090-9001,50
-615186,4009-9808,50
-615186,4906-9127,50
-615185,4098-9714,23
-615185,4090-9116,12
-615185,4090-9001,82
-615185,4906-9154,52
-615185,4902-9721,24
-615185,4098-9764,55
-615184,4098-9764,700
-615184,4009-9301,4
-615190,23-0305-00006,1521
-615189,4902-9721,100
-615172,50119,1000
-615172,OC-13 -013-026-0005,300
-615172,52-C-1,500
-615172,OC-13 -013-028-0006,5000
-615174,7979814,20
-615174,03-1605-00062,1000
-615174,13-3301-00011,100
-615174,CCAAGB-G1002-A020-C0,500
-615173,6501665,1
-615177,13-0390-00008,2
-615177,13-0390-00007,8
-615175,VEP-A00-1P,2
-615175,VEP-A00-P,2
-615175,VPS-100US-220,4
-615175,VP-CLIP,149
-615175,VP-COUP,34
-615175,VP-EC,1
-615175,VP-ELB-90,23
-615175,VP-P-200,4
-615175,VP-TEE,2
-615176,23-0305-00006,676
-615176,STC-52C1,3000
-615176,58-C1,2000
-615176,461DC,3000
-615176,451DC,3000
-615216,TO-48300,10
-615216,PMD-HT-0087,4
-615217,49-2006-00004,1
-615218,GNA_F_00868665,6
-615218,SC42_F_00298609,4
-615218,LP-FXN-NUT-SPG-GLM06,50
-615218,FX-0145-C-OMDIA08,100
-615218,21-5190-00002,7
-615218,21-5101-00001,7
-615218,03-1504-00002,7
-615218,PMD-HT-0087,10
-615218,21-3601-00001,10
-615218,21-3605-00003,3
-615219,21-3601-00001,5
-615219,OC-13 -013-007-0171,200
-615219,PMD-HT-0087,8
-615219,FX-0145-C-OMDIA08,100
-615219,TO-48300,10
-615219,GNA_F_00868665,2
-615219,SC44_F_00396371,1
-615219,LP-FXN-NUT-SPG-GLM06,20
-615219,LP-FXN-ANC-THB-HD10100,20
-615219,GNA_F_00868657,1
-615219,LP-FXN-WSR-FLT-HD10,25
-615219,HHS/M10X25+HXN/M10+FLW/M1,25
-615220,TO-48300,3
-615220,PMD-HT-0087,4
-615221,49-2006-00004,1
-615222,TO-48300,5
-615222,ZINC SPRAY,1
-615223,TO-48300,10
-615223,03-5290-00077,1
-615223,21-3601-00001,5
-615223,PMD-HT-0087,4
-615223,49-2006-00004,4
-615223,09-2223-00004,1
-615223,OC-13 -013-007-0171,100
-615223,21-3102-00055,100
-615224,C-R00075,35
-615224,R-CCN075,35
-615224,TH-0047-C-GTR103000,2
-615224,PMD-HT-0087,7
-615224,SC44_F_00396371,5
-615224,TH-2242-C-HHN10,50
-615224,LP-FXN-WSR-FLT-HD10,50
-615224,GNA_F_00797453,1
-615224,21-3601-00001,8
-615224,09-2290-00052,3
-615224,07-1001-00051,1
-615224,RFO100/150,8
-615224,RFORO100/150,8
-615224,LP-FXN-NUT-SPG-GLM06,150
-615224,FX-0150-C-OMDIA10,150
-615224,LP-FXN-ANC-THB-HD10100,100
-615225,LP-FXN-BLT-HEX-GL08025,50
-615225,LP-FXN-NUT-SPG-GLM06,50
-615225,LP-FXN-BLT-HEX-GL08100,50
-615225,PMD-HT-0124,1
-615226,09-2223-00013,4
-615226,21-3601-00001,12
-615226,PMD-HT-0087,3
-615226,21-3605-00003,3
-615226,SIGA-CR,4
-615226,OC-13 -013-007-0171,100
-615226,OC-13 -013-007-0020,100
-615227,49-1702-00005,5
-615227,PMD-HT-0087,4
-615227,21-3601-00001,6
-615227,21-3605-00003,1
-615227,TP426,4
-615227,OC-13 -013-007-0171,100
-615227,21-3102-00055,100
-615227,E0075,6
-615227,201,20
-615228,09-2223-00013,4
-615228,TO-48300,7
-615228,09-2223-00004,1
-615228,21-3601-00001,5
-615228,LP-FXN-BLT-HEX-GL08025,200
-615228,OC-13 -013-007-0059,2
-615228,FX-0145-C-OMDIA08,200
-615228,03-1605-00001,4
-615228,03-0104-00038,2
-615228,03-0104-00040,2
-615228,03-0104-00079,2
-615228,21-2401-00022,100
-615228,LP-FXN-NUT-SPG-GLM06,100
-615228,LP-FXN-BLT-HEX-GL08025,100
-615229,23-0203-00012,800
-615229,OC-13 -013-039-0001,300
-615229,59361,10
-615229,13-3390-00022,10
-615230,09-2223-00004,1
-615230,13-0590-00117,2
-615230,13-0590-00118,2
-615230,PMD-HT-0087,2
-615231,53-3703-00008,1
-615231,21-2401-00022,200
-615231,TO-48300,2
-615231,21-3601-00001,2
-615232,PMD-HT-0265,500
-615232,21-3102-00055,500`.split('\n').forEach(line => {
-    const [workOrder, itemNumber, quantity] = line.split(',');
-    if (!workOrderItems.has(workOrder)) {
-        workOrderItems.set(workOrder, []);
+const validatePayload = (payload, stage, requiredFields) => {
+    if (!payload || payload.schema !== PAYLOAD_SCHEMA || payload.version !== PAYLOAD_VERSION) {
+        throw new Error(`Not a ${PAYLOAD_SCHEMA} v${PAYLOAD_VERSION} payload`);
+    }
+    if (payload.stage !== stage) {
+        throw new Error(`Payload holds '${payload.stage}' data, expected '${stage}'`);
     }
-    workOrderItems.get(workOrder).push({
-        itemNumber,
-        quantity: parseInt(quantity, 10)
+    if (!Array.isArray(payload.items)) throw new Error('Payload has no items array');
+    payload.items.forEach((item, index) => {
+        requiredFields.forEach(field => {
+            if (!(field in item)) throw new Error(`Payload item ${index} is missing '${field}'`);
+        });
     });
-});
+    console.log(`Loaded ${payload.items.length} ${stage} items (generated ${payload.generated_at})`);
+    return payload.items;
+};
+
+// Load a payload from a URL, or let the user pick the file when no URL is given
+const loadPayload = async (stage, requiredFields, url = null) => {
+    if (url) {
+        const response = await fetch(url);
+        if (!response.ok) throw new Error(`Failed to fetch ${url}: ${response.status}`);
+        return validatePayload(await response.json(), stage, requiredFields);
+    }
+    const text = await new Promise((resolve, reject) => {
+        const overlay = document.createElement('div');
+        overlay.style = 'position: fixed; top: 10px; left: 50%; transform: translateX(-50%); z-index: 10000; padding: 15px; background: #fff; border: 4px solid #0066cc; box-shadow: 0 4px 15px rgba(0,0,0,0.5); text-align: center; font-family: sans-serif;';
+        overlay.innerHTML = `
+            <div style="margin-bottom: 10px; font-weight: bold; font-size: 16px;">Select the ${stage} payload file</div>
+            <input type="file" accept=".json,application/json">
+            <button style="margin-left: 8px; padding: 4px 12px; cursor: pointer;">Cancel</button>
+        `;
+        document.body.appendChild(overlay);
+        overlay.querySelector('button').onclick = () => {
+            overlay.remove();
+            reject(new Error('Payload selection cancelled'));
+        };
+        overlay.querySelector('input').onchange = (event) => {
+            const file = event.target.files[0];
+            overlay.remove();
+            if (!file) return reject(new Error('No payload file selected'));
+            file.text().then(resolve, reject);
+        };
+    });
+    return validatePayload(JSON.parse(text), stage, requiredFields);
+};
+
+// --- RESULTS FILE ---
+// Per-WO outcomes downloaded as <stage>.results.json for the status ledger:
+//   python wo_ledger.py import <stage> <stage>.results.json
+const RESULTS_SCHEMA = 'jde-automation-results';
+
+const saveResults = (stage, items) => {
+    if (window.jdeSaveResults === false) return;  // e.g. benchmark runs against mock_jde
+    const results = {
+        schema: RESULTS_SCHEMA,
+        version: 1,
+        stage,
+        generated_at: new Date().toISOString(),
+        count: items.length,
+        items
+    };
+    const link = document.createElement('a');
+    link.href = URL.createObjectURL(new Blob([JSON.stringify(results)], { type: 'application/json' }));
+    link.download = `${stage}.results.json`;
+    document.body.appendChild(link);
+    link.click();
+    link.remove();
+    setTimeout(() => URL.revokeObjectURL(link.href), 1000);
+    console.log(`Saved ${items.length} ${stage} results to ${stage}.results.json (import with wo_ledger.py)`);
+};
+
+// Initialize work order items map
+const workOrderItems = new Map();
 
-// Initialize the work order queue from CSV data
-let workOrderQueue = Array.from(workOrderItems.keys()).map(wo => ({ wo }));
+// Work order queue, built from the dragon3 payload (see update_csv.py)
+let workOrderQueue = [];
+
+// Payload items arrive grouped per work order with duplicate lines already merged
+// (see consolidate_parts.py), so they are used as-is
+function applyPartsPayload(items) {
+    workOrderItems.clear();
+    items.forEach(({ wo, lines }) => workOrderItems.set(wo, lines));
+    workOrderQueue = items.map(({ wo }) => ({ wo }));
+}
+
+// Load the parts payload written by update_csv.py
+async function loadPartsPayload(url = null) {
+    applyPartsPayload(await loadPayload('dragon3', ['wo', 'lines'], url));
+    console.log(`Loaded ${workOrderItems.size} work orders with ${Array.from(workOrderItems.values()).reduce((sum, items) => sum + items.length, 0)} items`);
+    return workOrderQueue.length;
+}
 
 // Queue management functions
 function addWorkOrders(workOrders) {
@@ -448,7 +337,7 @@ async function enterItemNumber(itemNumber) {
 
         input.click();
         input.focus();
-        await wait(100);
+        await wait(DELAYS.fieldFocus);
 
         input.value = itemNumber;
         input.dispatchEvent(new Event('change', { bubbles: true }));
@@ -462,7 +351,7 @@ async function enterItemNumber(itemNumber) {
         });
         input.dispatchEvent(enterEvent);
         
-        await wait(500);
+        await wait(DELAYS.fieldCommit);
         return true;
     } catch (e) {
         console.warn('Enter item number error:', e);
@@ -479,12 +368,12 @@ async function enterQuantity(quantity) {
         if (!input) throw new Error('No quantity input field found with value "1"');
 
         input.click();
-        await wait(100);
+        await wait(DELAYS.fieldFocus);
 
         input.value = quantity;
         input.dispatchEvent(new Event('change', { bubbles: true }));
         
-        await wait(100);
+        await wait(DELAYS.fieldFocus);
 
         input.dispatchEvent(new KeyboardEvent('keydown', {
             key: 'Enter',
@@ -495,7 +384,7 @@ async function enterQuantity(quantity) {
             cancelable: true
         }));
         
-        await wait(50);
+        await wait(DELAYS.keyUp);
         
         input.dispatchEvent(new KeyboardEvent('keyup', {
             key: 'Enter',
@@ -508,7 +397,7 @@ async function enterQuantity(quantity) {
 
         input.blur();
         
-        await wait(500);
+        await wait(DELAYS.fieldCommit);
         return true;
     } catch (e) {
         console.warn('Enter quantity error:', e);
@@ -553,7 +442,7 @@ async function startAutomation() {
                 if (!success) throw new Error('Failed to enter quantity');
             }
 
-            await wait(1000);
+            await wait(DELAYS.entryGap);
             config.currentIndex++;
             
         } catch (error) {
@@ -562,7 +451,7 @@ async function startAutomation() {
                 pauseAutomation();
                 break;
             }
-            await wait(1000);
+            await wait(DELAYS.entryGap);
             config.currentIndex++;
         }
     }
@@ -600,10 +489,9 @@ function startQuantities() {
 // Main automation function for parts detail
 async function automatePartsDetail(woNumber) {
     try {
-        const DELAY = 1500;
 
         console.log('Step 1: Looking for WO number QBE field...');
-        await wait(DELAY);
+        await wait(DELAYS.step);
         const qbeInput = await waitForElementInIframe('input[name="qbe0_1.0"]');
         qbeInput.value = woNumber;
         qbeInput.dispatchEvent(new Event('change', { bubbles: true }));
@@ -626,15 +514,15 @@ async function automatePartsDetail(woNumber) {
         }));
 
         console.log('Step 2: Looking for work order checkbox...');
-        await wait(DELAY);
+        await wait(DELAYS.step);
         const checkbox = await waitForElementInIframe('input[name="grs0_1"]');
         checkbox.click();
 
         console.log('Step 3: Looking for Row menu...');
-        await wait(DELAY);
+        await wait(DELAYS.step);
         await selectPartsDetail();
 
-        await wait(DELAY * 2);
+        await wait(DELAYS.openSettle);
         return true;
 
     } catch (error) {
@@ -675,11 +563,11 @@ async function executeItemAndQtyScript(workOrderNumber) {
         
         // Wait for items phase to complete
         while (window.automationConfig.isRunning) {
-            await wait(1000);
+            await wait(DELAYS.phasePoll);
         }
 
         // Wait after first OK button click
-        await wait(3000);
+        await wait(DELAYS.afterItemsOk);
         
         // Reselect Parts Detail before starting quantities phase
         console.log('Reselecting Parts Detail from Row menu...');
@@ -693,7 +581,7 @@ async function executeItemAndQtyScript(workOrderNumber) {
                 console.log('Successfully selected Parts Detail');
             } catch (e) {
                 console.warn(`Parts Detail selection attempt ${attempt} failed, attempt ${attempt}/3`);
-                await wait(1000);
+                await wait(DELAYS.reselectRetry);
             }
         }
         
@@ -702,7 +590,7 @@ async function executeItemAndQtyScript(workOrderNumber) {
         }
         
         // Additional wait after selecting Parts Detail
-        await wait(3000);
+        await wait(DELAYS.afterReselect);
         
         // Start quantities phase
         console.log(`Starting quantities phase for WO ${workOrderNumber}...`);
@@ -712,11 +600,11 @@ async function executeItemAndQtyScript(workOrderNumber) {
         
         // Wait for quantities phase to complete
         while (window.automationConfig.isRunning) {
-            await wait(1000);
+            await wait(DELAYS.phasePoll);
         }
 
         // Wait after final OK button click
-        await wait(2000);
+        await wait(DELAYS.afterQtyOk);
 
         console.log(`Completed processing WO ${workOrderNumber}`);
         return true;
@@ -729,6 +617,9 @@ async function executeItemAndQtyScript(workOrderNumber) {
 // Main process function
 async function processWorkOrders() {
     console.log('Starting batch processing of work orders...');
+    if (workOrderQueue.length === 0) {
+        await loadPartsPayload();
+    }
     const results = [];
     
     for (let i = 0; i < workOrderQueue.length; i++) {
@@ -769,13 +660,19 @@ async function processWorkOrders() {
         // Wait between work orders
         if (i < workOrderQueue.length - 1) {
             console.log('Waiting before processing next work order...');
-            await wait(3000);
+            await wait(DELAYS.betweenWorkOrders);
         }
     }
     
     // Print summary
     console.log('\nProcessing Summary:');
     console.table(results);
+
+    saveResults('parts_entered', results.map(r => ({
+        wo: r.wo,
+        status: r.status === 'success' ? 'done' : 'failed',
+        detail: r.status === 'success' ? `${r.itemCount} items` : r.error
+    })));
     
     return results;
 }
@@ -785,12 +682,13 @@ window.partsDetailAutomation = {
     addWorkOrders,
     clearWorkOrderQueue,
     processWorkOrders,
+    loadPayload: loadPartsPayload,
     automatePartsDetail,
     executeItemAndQtyScript,
     getQueueLength: () => workOrderQueue.length,
     getQueue: () => [...workOrderQueue],
     getItemsForWorkOrder: (wo) => workOrderItems.get(wo) || [],
-    workOrderItems: new Map(workOrderItems),
+    get workOrderItems() { return new Map(workOrderItems); },
     debug: {
         getCurrentConfig: () => ({ ...window.automationConfig }),
         getWorkOrderCount: () => workOrderItems.size,
@@ -813,7 +711,8 @@ Total Work Orders: ${workOrderItems.size}
 Total Items: ${Array.from(workOrderItems.values()).reduce((sum, items) => sum + items.length, 0)}
 
 Available Commands:
-- Start Processing: partsDetailAutomation.processWorkOrders()
+- Load Payload: partsDetailAutomation.loadPayload()  (or loadPayload('http://.../dragon3.payload.json'))
+- Start Processing: partsDetailAutomation.processWorkOrders()  (prompts for the payload if none is loaded)
 - Add Work Orders: partsDetailAutomation.addWorkOrders([{wo: '123456'}, ...])
 - Clear Queue: partsDetailAutomation.clearWorkOrderQueue()
 - Get Items for WO: partsDetailAutomation.getItemsForWorkOrder('123456')
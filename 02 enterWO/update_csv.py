@@ -1,87 +1,81 @@
-import re
+import io
 import os
+import sys
 
-def process_csv_content(csv_content):
-    # Split the content into lines and remove header
-    lines = csv_content.strip().split('\n')[1:]
-    # Format each line into the required structure
-    formatted_lines = []
-    for line in lines:
-        work_order, item_number, quantity = line.strip().split(',')
-        formatted_lines.append(f'{work_order},{item_number.strip()},{quantity.strip()}')
-    return '\n'.join(formatted_lines)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from queue_payload import write_payload
+from wo_ledger import DEFAULT_DB, skip_completed
+from consolidate_parts import consolidate_lines, format_report, read_parts_csv
 
-def update_dragon_js(js_file_path, csv_file_path):
+def parse_quantity(value):
+    """Return the quantity as an int (or float if fractional), or None if it is not numeric"""
+    try:
+        quantity = float(value)
+    except (TypeError, ValueError):
+        return None
+    return int(quantity) if quantity.is_integer() else quantity
+
+def build_batches(lines):
+    """Turn consolidated lines (see consolidate_parts.py) into dragon3 payload items, one per work order"""
+    batches = []
+    for wo, group in lines.groupby('System_Work_Order', sort=False):
+        batches.append({'wo': str(wo), 'lines': [
+            {'itemNumber': str(item), 'quantity': parse_quantity(qty)}
+            for item, qty in zip(group['Item Number'], group['Issued Qty'])]})
+    return batches
+
+def write_batches(payload_path, lines, ledger_path=DEFAULT_DB):
+    """Write consolidated lines as the dragon3 payload
+
+    Work orders whose parts the ledger records as entered are left out.
+    Returns the number of work orders written.
+    """
+    batches = skip_completed('parts_entered', build_batches(lines), db_path=ledger_path)
+    print("First batch:")
+    print(batches[:1])
+    return write_payload(payload_path, 'dragon3', batches)
+
+def update_dragon_js(payload_path, csv_file_path, audit_path='consolidation_audit.csv'):
     try:
         # Read the CSV file
         print(f"Reading CSV file from: {csv_file_path}")
-        with open(csv_file_path, 'r') as csv_file:
+        with open(csv_file_path, 'r', encoding='utf-8') as csv_file:
             csv_content = csv_file.read()
             print(f"CSV content length: {len(csv_content)} characters")
-            
-        # Format the CSV content
-        formatted_csv = process_csv_content(csv_content)
-        print(f"Formatted CSV length: {len(formatted_csv)} characters")
-        print("First few lines of formatted CSV:")
-        print(formatted_csv.split('\n')[:3])
-        
-        # Read the JavaScript file
-        print(f"\nReading JS file from: {js_file_path}")
-        with open(js_file_path, 'r', encoding='utf-8') as js_file:
-            js_content = js_file.read()
-        print(f"JS file length: {len(js_content)} characters")
-        
-        # Find the csvData string using a more precise regex
-        pattern = r'const\s+csvData\s*=\s*`[^`]*`'
-        
-        # Check if pattern is found
-        match = re.search(pattern, js_content)
-        if not match:
-            print("Error: Could not find csvData pattern in JS file")
-            return
-            
-        print(f"Found csvData at position: {match.start()}-{match.end()}")
-        
-        # Create the replacement string
-        replacement = f'const csvData = `{formatted_csv}`'
-        
-        # Replace the old csvData with the new one
-        updated_js = re.sub(pattern, replacement, js_content)
-        
-        # Verify the replacement
-        if updated_js == js_content:
-            print("Warning: No changes were made to the file content")
-            return
-            
-        # Write the updated content back to the file
-        print("\nWriting updated content back to JS file...")
-        with open(js_file_path, 'w', encoding='utf-8') as js_file:
-            js_file.write(updated_js)
-            
-        print("Successfully updated csvData in dragon3.js")
-        
-        # Verify the file was actually written
-        with open(js_file_path, 'r', encoding='utf-8') as js_file:
-            verification = js_file.read()
-            if verification == updated_js:
-                print("Verification: File was successfully written")
-            else:
-                print("Warning: File content verification failed")
-        
     except FileNotFoundError as e:
         print(f"Error: File not found - {e.filename}")
+        return False
+
+    return write_csv_data(payload_path, csv_content, audit_path=audit_path)
+
+def write_csv_data(payload_path, csv_content, ledger_path=DEFAULT_DB, audit_path=None):
+    """Consolidate CSV content (with header row) and write it as the dragon3 payload
+
+    Duplicate items on a work order are merged and zero or non-numeric
+    quantities dropped; audit_path, if given, receives the audit trail.
+    Returns True when the payload was written, False on failure.
+    """
+    try:
+        lines, audit, stats = consolidate_lines(read_parts_csv(io.StringIO(csv_content.strip())))
+        print(format_report(stats))
+        if audit_path:
+            audit.to_csv(audit_path, index=False)
+            print(f"Audit trail saved to '{audit_path}'")
+        write_batches(payload_path, lines, ledger_path)
+        return True
     except Exception as e:
         print(f"Error: {str(e)}")
         import traceback
         print(traceback.format_exc())
+    return False
 
 # File paths
-js_file = "dragon3.js"
+payload_file = "dragon3.payload.json"
 csv_file = "D:\\auto\\00 preprocess\\updated_output.csv"
 
 # Execute the update
 if __name__ == "__main__":
     print("Starting script execution...")
     print(f"Working directory: {os.getcwd()}")
-    update_dragon_js(js_file, csv_file)
-    input("Press Enter to exit...")
\ No newline at end of file
+    update_dragon_js(payload_file, csv_file)
+    input("Press Enter to exit...")
@@ -1,5 +1,29 @@
 const wait = (ms) => new Promise(resolve => setTimeout(resolve, ms));
 
+// Fixed waits in ms. To tune them, set window.jdeDelays before loading the script,
+// e.g. { scale: 0.5, okClick: 1500 }: named values replace the default, scale multiplies
+// the rest (measure with mock_jde/bench.py before changing the defaults)
+const DELAYS = {
+    poll: 100,              // element polling interval
+    search: 2000,           // after the QBE search
+    rowSelect: 1500,        // after ticking the work order row
+    beforeMenu: 2000,
+    menuOpen: 500,
+    screenLoad: 2500,       // after choosing Inventory Issues
+    dateBlur: 800,
+    beforeCell: 600,
+    cellEdit: 300,          // after clicking a quantity cell
+    cellCommit: 600,        // after Enter in a quantity cell
+    okClick: 2500,          // after each of the three OK clicks
+    afterCancel: 1500,
+    betweenWorkOrders: 4000,
+    nextCycle: 6000         // before re-running work orders with more than 10 lines
+};
+const delayOverrides = window.jdeDelays || {};
+Object.keys(DELAYS).forEach(key => {
+    DELAYS[key] = key in delayOverrides ? delayOverrides[key] : Math.round(DELAYS[key] * (delayOverrides.scale || 1));
+});
+
 let reprocessingQueue = [];
 let woProgressTracker = {}; 
 
@@ -15,7 +39,7 @@ const waitForElementInIframe = async (selector, timeout = 10000) => {
         } catch (e) {
             console.log('[DEBUG] Iframe access error:', e);
         }
-        await wait(100);
+        await wait(DELAYS.poll);
     }
     throw new Error(`Element ${selector} not found`);
 };
@@ -69,7 +93,7 @@ const clickCancelButton = async () => {
             const btn = iframe.contentDocument.querySelector('img[name="hc_Cancel"][id="hc_Cancel"]');
             if (btn) btn.click();
         }
-        await wait(1500);
+        await wait(DELAYS.afterCancel);
     } catch (error) { console.error('[ERROR] Close failed', error); }
 };
 
@@ -86,7 +110,7 @@ async function clickOkButton(originalWorkOrderInput, itemsJustProcessed) {
                 const btn = iframe.contentDocument.querySelector('img[name="hc_OK"][id="hc_OK"]');
                 if (btn) btn.click();
             }
-            await wait(2500); 
+            await wait(DELAYS.okClick); 
         }
 
         const dateField = iframe.contentDocument.querySelector('[id="C0_90"], [name="0_90"]');
@@ -94,7 +118,7 @@ async function clickOkButton(originalWorkOrderInput, itemsJustProcessed) {
         // Error Detection
         const errorMsg = iframe.contentDocument.querySelector('.ErrorText, [id*="err"]');
         if (errorMsg && errorMsg.textContent.trim() !== "") {
-            console.error(`[SYSTEM ERROR] ${errorMsg.textContent.trim()}`);
+            console.error(`[SYSTEM ERROR] WO ${originalWorkOrderInput.trim().split(/\s+/)[0]}: ${errorMsg.textContent.trim()}`);
             await clickCancelButton();
             return { status: 'error', message: errorMsg.textContent };
         }
@@ -117,7 +141,7 @@ async function clickOkButton(originalWorkOrderInput, itemsJustProcessed) {
 }
 
 async function selectInventoryIssues() {
-    await wait(2000);
+    await wait(DELAYS.beforeMenu);
     const iframe = document.getElementById('e1menuAppIframe');
     const allMenus = iframe.contentDocument.querySelectorAll('select[name="menu1"]');
     let rowMenu = null;
@@ -128,20 +152,20 @@ async function selectInventoryIssues() {
     }
     if (!rowMenu) throw new Error('Row menu not found');
     rowMenu.click();
-    await wait(500);
+    await wait(DELAYS.menuOpen);
     const opt = Array.from(rowMenu.options).find(o => o.text.includes('Inventory Issues'));
     rowMenu.value = opt.value;
     try { iframe.contentWindow.JDEDTAFactory.getInstance('').post('0_144'); } 
     catch (e) { rowMenu.dispatchEvent(new Event('change', { bubbles: true })); }
-    await wait(2500);
+    await wait(DELAYS.screenLoad);
 }
 
 async function enterIssueQuantity(rowIndex, quantity) {
     const iframe = document.getElementById('e1menuAppIframe');
-    await wait(600);
+    await wait(DELAYS.beforeCell);
     const cell = iframe.contentDocument.querySelector(`td[headers="GHEAD0_1.5"][gridid="0_1"][realrow="${rowIndex}"]`);
     if (!cell) return false;
-    cell.click(); await wait(300);
+    cell.click(); await wait(DELAYS.cellEdit);
     const input = iframe.contentDocument.querySelector(`input[name="gce0_1.${rowIndex}.5"], input[id="gce0_1.${rowIndex}.5"]`);
     if (!input) return false;
     input.value = quantity;
@@ -149,7 +173,7 @@ async function enterIssueQuantity(rowIndex, quantity) {
     const ev = { key: 'Enter', code: 'Enter', keyCode: 13, which: 13, bubbles: true };
     input.dispatchEvent(new KeyboardEvent('keydown', ev));
     input.dispatchEvent(new KeyboardEvent('keyup', ev));
-    input.blur(); await wait(600);
+    input.blur(); await wait(DELAYS.cellCommit);
     return true;
 }
 
@@ -167,10 +191,10 @@ async function processWorkOrderIssues(workOrderInput) {
         const ev = { key: 'Enter', code: 'Enter', keyCode: 13, which: 13, bubbles: true };
         qbeInput.dispatchEvent(new KeyboardEvent('keydown', ev));
         qbeInput.dispatchEvent(new KeyboardEvent('keyup', ev));
-        await wait(2000);
+        await wait(DELAYS.search);
         
         const checkbox = await waitForElementInIframe('input[name="grs0_1"]');
-        checkbox.click(); await wait(1500);
+        checkbox.click(); await wait(DELAYS.rowSelect);
         await selectInventoryIssues(); 
 
         // Progress Tracking / Infinite Loop Protection
@@ -188,7 +212,7 @@ async function processWorkOrderIssues(workOrderInput) {
             if (dateInput) {
                 dateInput.value = extractedDate;
                 dateInput.dispatchEvent(new Event('blur', { bubbles: true }));
-                await wait(800);
+                await wait(DELAYS.dateBlur);
             }
         }
 
@@ -243,7 +267,7 @@ async function processAllIssues(workOrders) {
             const res = await processWorkOrderIssues(currentBatch[i]);
             finalResults.push(res);
             if (res.items) batchProgressCount += res.items;
-            if (i < currentBatch.length - 1) await wait(4000);
+            if (i < currentBatch.length - 1) await wait(DELAYS.betweenWorkOrders);
         }
 
         console.log(`[BATCH DONE] Total items issued: ${batchProgressCount}`);
@@ -256,201 +280,111 @@ async function processAllIssues(workOrders) {
             }
             currentBatch = [...new Set(reprocessingQueue)];
             console.log(`[NEXT CYCLE] Rerunning ${currentBatch.length} orders for verification.`);
-            await wait(6000);
+            await wait(DELAYS.nextCycle);
         } else {
             currentBatch = [];
         }
     }
     console.table(finalResults);
+
+    // 'empty' means nothing was left to issue; 'reprocess' is superseded by the verification pass
+    saveResults('issued', finalResults.map(r => ({
+        wo: String(r.workOrder).trim().split(/\s+/)[0],
+        status: ['success', 'empty'].includes(r.status) ? 'done' : 'failed',
+        detail: r.error || r.message || `${r.status}, ${r.items || 0} items`
+    })));
 }
 
+// --- QUEUE PAYLOAD ---
+// Queue data is written by the Python stage scripts to a JSON payload
+// (schema 'jde-automation-queue', version 1) and loaded here at run time.
+const PAYLOAD_SCHEMA = 'jde-automation-queue';
+const PAYLOAD_VERSION = 1;
+
+const validatePayload = (payload, stage, requiredFields) => {
+    if (!payload || payload.schema !== PAYLOAD_SCHEMA || payload.version !== PAYLOAD_VERSION) {
+        throw new Error(`Not a ${PAYLOAD_SCHEMA} v${PAYLOAD_VERSION} payload`);
+    }
+    if (payload.stage !== stage) {
+        throw new Error(`Payload holds '${payload.stage}' data, expected '${stage}'`);
+    }
+    if (!Array.isArray(payload.items)) throw new Error('Payload has no items array');
+    payload.items.forEach((item, index) => {
+        requiredFields.forEach(field => {
+            if (!(field in item)) throw new Error(`Payload item ${index} is missing '${field}'`);
+        });
+    });
+    console.log(`Loaded ${payload.items.length} ${stage} items (generated ${payload.generated_at})`);
+    return payload.items;
+};
+
+// Load a payload from a URL, or let the user pick the file when no URL is given
+const loadPayload = async (stage, requiredFields, url = null) => {
+    if (url) {
+        const response = await fetch(url);
+        if (!response.ok) throw new Error(`Failed to fetch ${url}: ${response.status}`);
+        return validatePayload(await response.json(), stage, requiredFields);
+    }
+    const text = await new Promise((resolve, reject) => {
+        const overlay = document.createElement('div');
+        overlay.style = 'position: fixed; top: 10px; left: 50%; transform: translateX(-50%); z-index: 10000; padding: 15px; background: #fff; border: 4px solid #0066cc; box-shadow: 0 4px 15px rgba(0,0,0,0.5); text-align: center; font-family: sans-serif;';
+        overlay.innerHTML = `
+            <div style="margin-bottom: 10px; font-weight: bold; font-size: 16px;">Select the ${stage} payload file</div>
+            <input type="file" accept=".json,application/json">
+            <button style="margin-left: 8px; padding: 4px 12px; cursor: pointer;">Cancel</button>
+        `;
+        document.body.appendChild(overlay);
+        overlay.querySelector('button').onclick = () => {
+            overlay.remove();
+            reject(new Error('Payload selection cancelled'));
+        };
+        overlay.querySelector('input').onchange = (event) => {
+            const file = event.target.files[0];
+            overlay.remove();
+            if (!file) return reject(new Error('No payload file selected'));
+            file.text().then(resolve, reject);
+        };
+    });
+    return validatePayload(JSON.parse(text), stage, requiredFields);
+};
+
+// --- RESULTS FILE ---
+// Per-WO outcomes downloaded as <stage>.results.json for the status ledger:
+//   python wo_ledger.py import <stage> <stage>.results.json
+const RESULTS_SCHEMA = 'jde-automation-results';
+
+const saveResults = (stage, items) => {
+    if (window.jdeSaveResults === false) return;  // e.g. benchmark runs against mock_jde
+    const results = {
+        schema: RESULTS_SCHEMA,
+        version: 1,
+        stage,
+        generated_at: new Date().toISOString(),
+        count: items.length,
+        items
+    };
+    const link = document.createElement('a');
+    link.href = URL.createObjectURL(new Blob([JSON.stringify(results)], { type: 'application/json' }));
+    link.download = `${stage}.results.json`;
+    document.body.appendChild(link);
+    link.click();
+    link.remove();
+    setTimeout(() => URL.revokeObjectURL(link.href), 1000);
+    console.log(`Saved ${items.length} ${stage} results to ${stage}.results.json (import with wo_ledger.py)`);
+};
+
 // --- INITIALIZATION ---
 window.issuesAutomation = {
     processAllIssues,
-    workOrders: [
-        '615053	04/07/2026',
-        '615054	04/07/2026',
-        '615055	04/07/2026',
-        '615056	04/07/2026',
-        '615057	04/07/2026',
-        '615058	04/07/2026',
-        '615059	04/07/2026',
-        '615060	04/07/2026',
-        '615061	04/08/2026',
-        '615062	04/08/2026',
-        '615063	04/08/2026',
-        '615064	04/08/2026',
-        '615065	04/08/2026',
-        '615066	04/08/2026',
-        '615067	04/08/2026',
-        '615068	04/11/2026',
-        '615069	04/11/2026',
-        '615070	04/11/2026',
-        '615071	04/11/2026',
-        '615072	04/11/2026',
-        '615073	04/11/2026',
-        '615074	04/11/2026',
-        '615075	04/11/2026',
-        '615076	04/11/2026',
-        '615077	04/11/2026',
-        '615078	04/11/2026',
-        '615079	04/11/2026',
-        '615080	04/13/2026',
-        '615081	04/13/2026',
-        '615082	04/13/2026',
-        '615083	04/13/2026',
-        '615084	04/13/2026',
-        '615085	04/13/2026',
-        '615086	04/13/2026',
-        '615087	04/13/2026',
-        '615088	04/13/2026',
-        '615089	04/13/2026',
-        '615090	04/13/2026',
-        '615091	04/13/2026',
-        '615092	05/05/2026',
-        '615093	05/05/2026',
-        '615094	05/05/2026',
-        '615095	05/05/2026',
-        '615096	05/05/2026',
-        '615097	05/05/2026',
-        '615098	04/13/2026',
-        '615099	04/13/2026',
-        '615100	04/13/2026',
-        '615101	04/13/2026',
-        '615102	04/13/2026',
-        '615103	04/13/2026',
-        '615104	04/13/2026',
-        '615105	04/13/2026',
-        '615106	04/13/2026',
-        '615107	04/13/2026',
-        '615108	04/13/2026',
-        '615109	04/13/2026',
-        '615110	04/13/2026',
-        '615111	04/16/2026',
-        '615112	04/16/2026',
-        '615113	04/16/2026',
-        '615114	04/16/2026',
-        '615115	04/16/2026',
-        '615116	04/16/2026',
-        '615117	04/16/2026',
-        '615118	04/16/2026',
-        '615119	04/16/2026',
-        '615120	04/16/2026',
-        '615121	04/16/2026',
-        '615122	04/16/2026',
-        '615123	04/16/2026',
-        '615124	04/16/2026',
-        '615125	04/16/2026',
-        '615126	04/16/2026',
-        '615127	04/16/2026',
-        '615128	04/16/2026',
-        '615129	04/21/2026',
-        '615130	04/21/2026',
-        '615131	04/21/2026',
-        '615132	04/21/2026',
-        '615133	04/21/2026',
-        '615134	04/21/2026',
-        '615135	04/21/2026',
-        '615136	04/23/2026',
-        '615137	04/23/2026',
-        '615138	04/23/2026',
-        '615139	04/23/2026',
-        '615140	04/25/2026',
-        '615141	04/25/2026',
-        '615142	04/25/2026',
-        '615143	04/25/2026',
-        '615144	04/25/2026',
-        '615145	04/25/2026',
-        '615146	04/25/2026',
-        '615147	04/25/2026',
-        '615148	04/25/2026',
-        '615149	04/26/2026',
-        '615150	04/26/2026',
-        '615151	04/26/2026',
-        '615152	04/26/2026',
-        '615153	04/26/2026',
-        '615154	04/26/2026',
-        '615155	04/26/2026',
-        '615156	04/26/2026',
-        '615157	04/26/2026',
-        '615158	04/27/2026',
-        '615159	04/27/2026',
-        '615160	04/27/2026',
-        '615161	04/27/2026',
-        '615162	04/27/2026',
-        '615163	04/27/2026',
-        '615164	04/27/2026',
-        '615165	04/27/2026',
-        '615166	04/27/2026',
-        '615167	04/27/2026',
-        '615168	04/28/2026',
-        '615169	04/28/2026',
-        '615170	04/28/2026',
-        '615171	04/28/2026',
-        '615172	04/30/2026',
-        '615173	04/30/2026',
-        '615174	04/30/2026',
-        '615175	04/30/2026',
-        '615176	04/30/2026',
-        '615177	04/30/2026',
-        '615178	05/03/2026',
-        '615179	05/03/2026',
-        '615180	05/03/2026',
-        '615181	05/03/2026',
-        '615182	05/03/2026',
-        '615183	05/03/2026',
-        '615184	05/03/2026',
-        '615185	05/03/2026',
-        '615186	05/03/2026',
-        '615187	05/03/2026',
-        '615188	05/03/2026',
-        '615189	05/03/2026',
-        '615190	05/03/2026',
-        '615191	05/06/2026',
-        '615192	05/06/2026',
-        '615193	05/06/2026',
-        '615194	05/06/2026',
-        '615195	05/06/2026',
-        '615196	05/02/2026',
-        '615197	05/02/2026',
-        '615198	05/02/2026',
-        '615199	05/02/2026',
-        '615200	05/02/2026',
-        '615201	05/02/2026',
-        '615202	05/02/2026',
-        '615203	05/02/2026',
-        '615204	05/02/2026',
-        '615205	05/02/2026',
-        '615206	05/02/2026',
-        '615207	05/02/2026',
-        '615208	05/02/2026',
-        '615209	05/02/2026',
-        '615210	05/02/2026',
-        '615211	05/02/2026',
-        '615212	05/02/2026',
-        '615213	05/02/2026',
-        '615214	05/02/2026',
-        '615215	05/02/2026',
-        '615216	05/05/2026',
-        '615217	05/05/2026',
-        '615218	05/05/2026',
-        '615219	05/05/2026',
-        '615220	05/05/2026',
-        '615221	05/05/2026',
-        '615222	05/05/2026',
-        '615223	05/05/2026',
-        '615224	05/05/2026',
-        '615225	05/05/2026',
-        '615226	05/05/2026',
-        '615227	05/05/2026',
-        '615228	05/05/2026',
-        '615229	05/05/2026',
-        '615230	05/05/2026',
-        '615231	05/05/2026',
-        '615232	05/05/2026',
-        '615233	05/06/2026'
-    ],
-    start: function() { 
+    workOrders: [],
+    // Load 'WO<tab>date' entries from the issues4 payload written by updatearray.py
+    loadPayload: async function(url = null) {
+        const items = await loadPayload('issues4', ['wo', 'date'], url);
+        this.workOrders = items.map(item => item.date ? `${item.wo}\t${item.date}` : item.wo);
+        return this.workOrders.length;
+    },
+    start: async function() { 
+        if (this.workOrders.length === 0) await this.loadPayload();
         return this.processAllIssues(this.workOrders); 
     }
 };
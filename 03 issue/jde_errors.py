@@ -0,0 +1,181 @@
+import argparse
+import csv
+import os
+import re
+import shutil
+
+from updatearray import read_issue_entries
+
+# Lines that tell us which work order the following output belongs to (issues4.js console output)
+WO_MARKERS = [
+    re.compile(r'---\s*STARTING WO:\s*(\S+)\s*---'),
+    re.compile(r'\[(?:SYSTEM ERROR|CRITICAL ERROR|STUCK)\]\s*WO\s+([^\s:]+)'),
+    re.compile(r'^\s*(?:WO[#:\s]+)?(\d{5,8})(?:\s+\d{2}/\d{2}/\d{4})?\s*$'),
+]
+# One-line failures logged by issues4.js: [CRITICAL ERROR] WO x: message / [STUCK] WO x ...
+INLINE_ERROR = re.compile(r'\[(CRITICAL ERROR|STUCK)\]\s*WO\s+[^\s:]+(?:\s+\d{2}/\d{2}/\d{4})?:?\s*(.*)')
+SYSTEM_ERROR = re.compile(r'\[SYSTEM ERROR\](?:\s*WO\s+[^\s:]+(?:\s+\d{2}/\d{2}/\d{4})?:?)?\s*(.*)')
+
+# JDE error dump layout: message line, then 'ER Details:' / 'BSFN Details:' sections of 'Key <tab> value'
+SECTION = re.compile(r'^\s*(ER|BSFN) Details:\s*$')
+DETAIL = re.compile(r'^\s{2,}(Form|Control Id|Control Title|Event|Line No|Source File|Source Line|Error ID)\s+(.*?)\s*$')
+
+# (category, pattern, retryable) - first match wins; a rerun only helps with transient failures
+CATEGORIES = [
+    ('aai_setup', re.compile(r'\bAAI\b', re.IGNORECASE), False),
+    ('insufficient_stock', re.compile(r'insufficient|not enough|exceeds .*(?:available|on hand)|'
+                                      r'quantity .*(?:available|on hand)', re.IGNORECASE), False),
+    ('invalid_data', re.compile(r'\binvalid\b|does not exist|not (?:valid|authorized)', re.IGNORECASE), False),
+    ('record_locked', re.compile(r'locked|in use|currently being', re.IGNORECASE), True),
+    ('ui_timeout', re.compile(r'not found|time(?:d)?\s*out|not responding|iframe|session', re.IGNORECASE), True),
+    ('stuck', re.compile(r'unchanged|aborted', re.IGNORECASE), True),
+]
+
+FIELDS = ['wo', 'category', 'retryable', 'message', 'error_id', 'form', 'control_id', 'control_title',
+          'event', 'line_no', 'source_file', 'source_line']
+
+
+def classify(record: dict) -> tuple:
+    """Return (category, retryable) for a failure record"""
+    text = ' '.join(str(record.get(key) or '') for key in ('message', 'control_title'))
+    for category, pattern, retryable in CATEGORIES:
+        if pattern.search(text):
+            return category, retryable
+    return 'unknown', False
+
+
+def _finish(record: dict, failures: list):
+    if record and (record.get('message') or record.get('error_id')):
+        record['category'], record['retryable'] = classify(record)
+        failures.append(record)
+
+
+def parse_errors(text: str) -> list:
+    """Turn JDE error dumps and issues4.js console output into failure records
+
+    Each record is a dict with the FIELDS keys. The work order comes from the
+    most recent WO marker before the error; dumps pasted without one keep
+    wo=None.
+    """
+    failures = []
+    current_wo = None
+    record = None
+    pending_message = None  # Last plain text line; it heads a dump if an ER/BSFN section follows
+    for line in text.splitlines():
+        marker = next((match for match in (m.search(line) for m in WO_MARKERS) if match), None)
+        if marker:
+            current_wo = marker.group(1)
+
+        inline = INLINE_ERROR.search(line)
+        if inline:
+            _finish(record, failures)
+            record = None
+            _finish({'wo': current_wo, 'message': inline.group(2).strip() or inline.group(1)}, failures)
+            continue
+
+        system = SYSTEM_ERROR.search(line)
+        if system:
+            _finish(record, failures)
+            record = {'wo': current_wo, 'message': system.group(1).strip()}
+            continue
+
+        if SECTION.match(line):
+            if record is None:
+                record = {'wo': current_wo, 'message': pending_message}
+            pending_message = None
+            continue
+
+        detail = DETAIL.match(line)
+        if detail and record is not None:
+            key = detail.group(1).lower().replace(' ', '_')
+            record[key] = detail.group(2)
+            if key == 'error_id':
+                _finish(record, failures)
+                record = None
+            continue
+
+        if line.strip() and not marker:
+            # A new message after a dump's details starts the next dump
+            if record is not None and (record.get('form') or record.get('source_file')):
+                _finish(record, failures)
+                record = None
+            if record is not None and not record.get('message'):
+                record['message'] = line.strip()
+            else:
+                pending_message = line.strip()
+    _finish(record, failures)
+
+    for failure in failures:
+        for field in FIELDS:
+            failure.setdefault(field, None)
+    return failures
+
+
+def retry_work_orders(failures: list) -> list:
+    """Work orders whose every failure is retryable, in first-failure order"""
+    verdict = {}
+    for failure in failures:
+        if failure['wo'] is None:
+            continue
+        verdict[failure['wo']] = verdict.get(failure['wo'], True) and failure['retryable']
+    return [wo for wo, retryable in verdict.items() if retryable]
+
+
+def write_failures(failures: list, csv_path: str):
+    with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(failures)
+
+
+def write_retry_issue_file(work_orders: list, original_issue_file: str, output_path: str) -> int:
+    """Write 'WO<tab>date' lines for the retry list, keeping each WO's date from the original issue.txt"""
+    dates = {}
+    if os.path.exists(original_issue_file):
+        dates = {entry['wo']: entry['date'] for entry in read_issue_entries(original_issue_file)}
+    with open(output_path, 'w', encoding='utf-8') as f:
+        for wo in work_orders:
+            f.write(f"{wo}\t{dates[wo]}\n" if dates.get(wo) else f"{wo}\n")
+    return len(work_orders)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse JDE error dumps and requeue only retryable failures")
+    parser.add_argument('--errors', default='error.txt', help="JDE error dumps / issues4.js console output")
+    parser.add_argument('--issue-file', default='issue.txt', help="Issue list the failed run used")
+    parser.add_argument('--output', default='issue.txt',
+                        help="Retry issue list to write (an existing file is backed up to .backup first)")
+    parser.add_argument('--failures', default='failures.csv', help="Structured failure records")
+    args = parser.parse_args()
+
+    with open(args.errors, 'r', encoding='utf-8', errors='replace') as f:
+        failures = parse_errors(f.read())
+    write_failures(failures, args.failures)
+    print(f"Parsed {len(failures)} failures into {args.failures}")
+
+    by_category = {}
+    for failure in failures:
+        by_category[failure['category']] = by_category.get(failure['category'], 0) + 1
+    for category, count in sorted(by_category.items(), key=lambda item: -item[1]):
+        print(f"  {category}: {count}")
+    unkeyed = sum(1 for failure in failures if failure['wo'] is None)
+    if unkeyed:
+        print(f"Warning: {unkeyed} failures have no work order (paste the issues4.js console output "
+              f"with the '--- STARTING WO' lines to key them)")
+
+    work_orders = retry_work_orders(failures)
+    if not work_orders:
+        print("No retryable work orders; issue list left unchanged")
+        return
+    original = args.issue_file
+    if os.path.exists(args.output):
+        shutil.copy2(args.output, args.output + '.backup')
+        print(f"Backup created: {args.output}.backup")
+        if os.path.abspath(args.output) == os.path.abspath(args.issue_file):
+            original = args.output + '.backup'
+    count = write_retry_issue_file(work_orders, original, args.output)
+    print(f"Wrote {count} retryable work orders to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
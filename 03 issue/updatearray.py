@@ -1,57 +1,38 @@
-import re
+import os
+import sys
 
-def update_work_orders(js_file_path, txt_file_path):
-    # Read the work orders from the text file
-    with open(txt_file_path, 'r') as f:
-        # Keep the full line (WO + Date) but strip the trailing newline
-        new_work_orders = [line.strip('\n').strip('\r') for line in f.readlines() if line.strip()]
-    
-    print(f"Read {len(new_work_orders)} entries from {txt_file_path}")
-    print("First few entries:", new_work_orders[:3])
-
-    # Format the work orders array as a string for the JS file
-    # We use repr() or careful escaping to ensure tabs (\t) are handled correctly
-    formatted_work_orders = "[\n        '" + "',\n        '".join(new_work_orders) + "'\n    ]"
-    
-    print("\nFormatted array (preview):")
-    print(formatted_work_orders[:200] + "...")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from queue_payload import write_payload
+from wo_ledger import DEFAULT_DB, skip_completed
 
-    # Read the JavaScript file
-    with open(js_file_path, 'r', encoding='utf-8') as f:
-        js_content = f.read()
-    
-    # Define the pattern to match the workOrders array in the legacy JS
-    pattern = r'(workOrders:\s*\[)[^\]]*(\])'
-    
-    if not re.search(pattern, js_content):
-        print("\nERROR: Could not find workOrders array in the JavaScript file!")
-        return 0
+def read_issue_entries(txt_file_path):
+    """Read issue.txt lines of 'WO<tab>date' (date optional) into payload items"""
+    entries = []
+    with open(txt_file_path, 'r') as f:
+        for line in f:
+            parts = line.split()
+            if parts:
+                entries.append({'wo': parts[0], 'date': parts[1] if len(parts) > 1 else None})
+    return entries
 
-    # Replace the workOrders array with the new values
-    # We use a lambda or escaped string to avoid issues with backslashes in the date/tab content
-    updated_js = re.sub(pattern, lambda m: m.group(1) + formatted_work_orders[1:-1] + m.group(2), js_content)
+def update_work_orders(payload_path, txt_file_path, ledger_path=DEFAULT_DB):
+    # Read the work orders from the text file, leaving out those the ledger records as issued
+    new_work_orders = skip_completed('issued', read_issue_entries(txt_file_path), db_path=ledger_path)
 
-    # Verify the change
-    if js_content == updated_js:
-        print("\nERROR: No changes were made to the file! Content might already be identical.")
-        return 0
+    print(f"Read {len(new_work_orders)} entries from {txt_file_path}")
+    print("First few entries:", new_work_orders[:3])
 
-    # Write the updated content back to the file
-    with open(js_file_path, 'w', encoding='utf-8') as f:
-        f.write(updated_js)
-    
-    print("\nSuccessfully wrote updated content with dates to file")
-    return len(new_work_orders)
+    return write_payload(payload_path, 'issues4', new_work_orders)
 
 if __name__ == "__main__":
     try:
-        count = update_work_orders('issues4.js', 'issue.txt')
+        count = update_work_orders('issues4.payload.json', 'issue.txt')
         if count > 0:
-            print(f"\nSuccessfully updated workOrders array with {count} new entries.")
+            print(f"\nSuccessfully wrote {count} work orders to the issues4 payload.")
         else:
-            print("\nFailed to update workOrders array. Please check the errors above.")
+            print("\nNo work orders found in issue.txt.")
     except Exception as e:
         print(f"\nError: {str(e)}")
         import traceback
         print("\nDetailed error information:")
-        print(traceback.format_exc())
\ No newline at end of file
+        print(traceback.format_exc())
@@ -1,48 +1,166 @@
+import argparse
 import csv
 from datetime import datetime
+import hashlib
+import json
 import os
+import re
 import time
 
-def process_log_file(log_path, csv_path):
+CSV_HEADER = ['Timestamp', 'Date', 'Time', 'Filename', 'Full Path']
+# upload_log.txt plus its rotated daily copies, e.g. "upload_log 24Nov2024.txt"
+# (shard logs from update_vbs.py are merged into upload_log.txt separately)
+LOG_NAME_PATTERN = re.compile(r'^upload_log( \d{1,2}[A-Za-z]{3}\d{4})?\.txt$')
+
+def parse_log_line(line):
+    """
+    Turn one upload log entry into a CSV row, raising ValueError if malformed
+    """
+    timestamp_str, sep, file_info = line.strip().partition(' - ')
+    if not sep or not file_info.startswith('File uploaded: '):
+        raise ValueError("not an upload entry")
+    file_path = file_info.replace('File uploaded: ', '', 1).strip()
+    filename = os.path.basename(file_path.replace('\\', '/'))
+
+    # Convert timestamp to date and time
+    timestamp = datetime.strptime(timestamp_str, '%Y/%m/%d %H:%M:%S')
+    return [
+        timestamp_str,
+        timestamp.strftime('%Y-%m-%d'),
+        timestamp.strftime('%H:%M:%S'),
+        filename,
+        file_path
+    ]
+
+def reject_line(reject_path, source, line):
+    """Append a malformed log line to the reject file"""
+    with open(reject_path, 'a', encoding='utf-8') as reject_file:
+        reject_file.write(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\t{os.path.basename(source)}\t{line.rstrip()}\n")
+
+def process_log_file(log_path, csv_path, reject_path=None):
     """
     Read log file and convert to CSV format
     """
     with open(log_path, 'r') as log_file, open(csv_path, 'w', newline='') as csv_file:
         csv_writer = csv.writer(csv_file)
         # Write header
-        csv_writer.writerow(['Timestamp', 'Date', 'Time', 'Filename', 'Full Path'])
-        
+        csv_writer.writerow(CSV_HEADER)
+
         for line in log_file:
             if line.strip():
-                # Parse the log entry
-                timestamp_str, file_info = line.split(' - ')
-                file_path = file_info.replace('File uploaded: ', '').strip()
-                filename = os.path.basename(file_path)
-                
-                # Convert timestamp to date and time
-                timestamp = datetime.strptime(timestamp_str, '%Y/%m/%d %H:%M:%S')
-                date = timestamp.strftime('%Y-%m-%d')
-                time = timestamp.strftime('%H:%M:%S')
-                
-                # Write to CSV
-                csv_writer.writerow([
-                    timestamp_str,
-                    date,
-                    time,
-                    filename,
-                    file_path
-                ])
-
-def monitor_and_process(log_path, csv_path, interval=60):
-    """
-    Continuously monitor log file and update CSV
+                try:
+                    csv_writer.writerow(parse_log_line(line))
+                except ValueError:
+                    if reject_path:
+                        reject_line(reject_path, log_path, line)
+
+class LogTailer:
+    """
+    Follow upload_log.txt and its daily copies, appending only new entries to the CSV
+
+    Each log is identified by a hash of its first line rather than its name,
+    so a log renamed to its daily file keeps its byte offset, while a new or
+    truncated upload_log.txt starts from zero. Offsets are saved next to the
+    CSV so a restarted monitor carries on where it stopped.
     """
+
+    def __init__(self, log_dir, csv_path, state_path=None, reject_path=None):
+        self.log_dir = log_dir
+        self.csv_path = csv_path
+        self.state_path = state_path or csv_path + '.offsets.json'
+        self.reject_path = reject_path or os.path.join(os.path.dirname(csv_path) or '.', 'upload_log_rejects.txt')
+        self.offsets = self._load_state()
+
+    def _load_state(self):
+        if os.path.exists(self.state_path) and os.path.exists(self.csv_path):
+            with open(self.state_path, 'r') as f:
+                return json.load(f)
+        # No usable state: rebuild the CSV from the start of every log
+        with open(self.csv_path, 'w', newline='') as csv_file:
+            csv.writer(csv_file).writerow(CSV_HEADER)
+        return {}
+
+    def _save_state(self):
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.offsets, f, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    def log_files(self):
+        """Return (signature, path, first line) for each complete log, oldest first"""
+        logs = []
+        for name in os.listdir(self.log_dir):
+            if not LOG_NAME_PATTERN.match(name):
+                continue
+            path = os.path.join(self.log_dir, name)
+            with open(path, 'rb') as f:
+                first_line = f.readline()
+            if not first_line.endswith(b'\n'):
+                continue  # Empty, or the first entry is still being written
+            logs.append((hashlib.sha1(first_line).hexdigest(), path, first_line))
+        # Entries start with their timestamp, so this orders the logs by age
+        return sorted(logs, key=lambda log: (log[2], log[1]))
+
+    def poll(self):
+        """Append entries written since the last poll; return (rows added, lines rejected)"""
+        added = rejected = 0
+        seen = {}
+        with open(self.csv_path, 'a', newline='') as csv_file:
+            csv_writer = csv.writer(csv_file)
+            for signature, path, _ in self.log_files():
+                offset = self.offsets.get(signature, 0)
+                if os.path.getsize(path) < offset:
+                    print(f"{os.path.basename(path)} shrank below its saved offset, reading it again")
+                    offset = 0
+                with open(path, 'rb') as log_file:
+                    log_file.seek(offset)
+                    for raw in log_file:
+                        if not raw.endswith(b'\n'):
+                            break  # Partial line, pick it up next poll
+                        offset += len(raw)
+                        line = raw.decode('utf-8', errors='replace')
+                        if not line.strip():
+                            continue
+                        try:
+                            csv_writer.writerow(parse_log_line(line))
+                            added += 1
+                        except ValueError:
+                            reject_line(self.reject_path, path, line)
+                            rejected += 1
+                seen[signature] = offset
+            csv_file.flush()
+            os.fsync(csv_file.fileno())
+        # Rows are on disk before the offsets move past them
+        self.offsets = seen
+        self._save_state()
+        return added, rejected
+
+def monitor_and_process(log_dir, csv_path, interval=60, once=False):
+    """
+    Continuously follow the upload logs and append new entries to the CSV
+    """
+    tailer = LogTailer(log_dir, csv_path)
     while True:
-        process_log_file(log_path, csv_path)
-        print(f"CSV updated at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        added, rejected = tailer.poll()
+        message = f"CSV updated at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}: {added} new rows"
+        if rejected:
+            message += f", {rejected} lines sent to {tailer.reject_path}"
+        print(message)
+        if once:
+            return added, rejected
         time.sleep(interval)
 
 if __name__ == "__main__":
-    log_path = r"D:\auto\upload\Autoit\upload_log.txt"
-    csv_path = r"D:\auto\upload\Autoit\upload_log.csv"
-    monitor_and_process(log_path, csv_path)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Convert the AutoIt upload logs to CSV")
+    parser.add_argument('--log-dir', default=r"D:\auto\upload\Autoit",
+                        help="Folder holding upload_log.txt and its daily copies")
+    parser.add_argument('--csv', default=None, help="CSV to append to (default: upload_log.csv in --log-dir)")
+    parser.add_argument('--interval', type=int, default=60, help="Seconds between polls")
+    parser.add_argument('--once', action='store_true', help="Poll once and exit")
+    parser.add_argument('--rebuild', action='store_true', help="Discard saved offsets and rebuild the CSV")
+    args = parser.parse_args()
+
+    csv_path = args.csv or os.path.join(args.log_dir, 'upload_log.csv')
+    if args.rebuild and os.path.exists(csv_path + '.offsets.json'):
+        os.remove(csv_path + '.offsets.json')
+    monitor_and_process(args.log_dir, csv_path, args.interval, args.once)
@@ -0,0 +1,160 @@
+import argparse
+import glob
+import os
+import pandas as pd
+
+LOG_PATTERN = r'^(?P<timestamp>\d{4}/\d{2}/\d{2} \d{2}:\d{2}:\d{2}) - File uploaded: (?P<path>.+?)\s*$'
+PERCENTILES = [0.5, 0.9, 0.95, 0.99]
+
+def load_logs(log_paths):
+    """Read upload log entries from any number of files into one frame
+
+    Columns: timestamp, path, file (work order PDF name) and log (source file).
+    Lines that are not upload entries are ignored.
+    """
+    frames = []
+    for log_path in log_paths:
+        with open(log_path, 'r', encoding='utf-8', errors='replace') as f:
+            lines = pd.Series(f.read().splitlines(), dtype=str)
+        entries = lines.str.extract(LOG_PATTERN).dropna()
+        entries['log'] = os.path.basename(log_path)
+        frames.append(entries)
+    if not frames:
+        return pd.DataFrame(columns=['timestamp', 'path', 'file', 'log'])
+
+    df = pd.concat(frames, ignore_index=True)
+    df['timestamp'] = pd.to_datetime(df['timestamp'], format='%Y/%m/%d %H:%M:%S')
+    df['file'] = df['path'].str.replace('\\', '/', regex=False).str.rsplit('/', n=1).str[-1]
+    return df.drop_duplicates(subset=['timestamp', 'path']).sort_values('timestamp', kind='stable').reset_index(drop=True)
+
+def assign_runs(df, run_gap=600, by='session'):
+    """Label each upload with its run and the seconds since the previous upload in that run
+
+    by='session' starts a new run whenever the gap exceeds run_gap seconds;
+    by='log' treats each log file as one run (e.g. one per delay setting).
+    The first upload of a run and uploads after an idle gap have no latency,
+    so they are left as NaN.
+    """
+    df = df.copy()
+    if by == 'log':
+        df = df.sort_values(['log', 'timestamp'], kind='stable').reset_index(drop=True)
+        df['run'] = df['log']
+        new_run = df['log'].ne(df['log'].shift())
+    else:
+        gaps = df['timestamp'].diff().dt.total_seconds()
+        new_run = gaps.isna() | (gaps > run_gap)
+        run_number = new_run.cumsum()
+        df['run'] = df.groupby(run_number)['timestamp'].transform('min').dt.strftime('%Y-%m-%d %H:%M')
+    latency = df['timestamp'].diff().dt.total_seconds()
+    df['latency'] = latency.mask(new_run | (latency > run_gap))
+    return df
+
+def run_summary(df, stall_seconds=None):
+    """Per-run latency percentiles, throughput and stall counts
+
+    Throughput counts busy time only (idle gaps are excluded from latency).
+    A stall is an upload that took longer than stall_seconds, or three times
+    the run's median latency when no threshold is given.
+    """
+    rows = []
+    for run, group in df.groupby('run', sort=False):
+        latency = group['latency'].dropna()
+        busy = latency.sum()
+        threshold = stall_seconds if stall_seconds else (latency.median() * 3 if len(latency) else None)
+        stalls = latency[latency > threshold] if threshold else latency.iloc[0:0]
+        row = {
+            'run': run,
+            'start': group['timestamp'].min(),
+            'end': group['timestamp'].max(),
+            'files': len(group),
+            'mean_s': latency.mean(),
+        }
+        for q in PERCENTILES:
+            row[f'p{int(q * 100)}_s'] = latency.quantile(q) if len(latency) else float('nan')
+        row['max_s'] = latency.max()
+        row['files_per_hour'] = len(latency) / busy * 3600 if busy else float('nan')
+        row['stalls'] = len(stalls)
+        row['stall_time_s'] = (stalls - latency.median()).sum() if len(stalls) else 0.0
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+def idle_gaps(df, run_gap=600):
+    """Gaps longer than run_gap seconds between consecutive uploads (across all logs)"""
+    ordered = df.sort_values('timestamp', kind='stable')
+    gaps = ordered['timestamp'].diff().dt.total_seconds()
+    idle = ordered.loc[gaps > run_gap, ['timestamp']].copy()
+    idle['idle_s'] = gaps[gaps > run_gap]
+    idle['resumed_with'] = ordered.loc[gaps > run_gap, 'file']
+    return idle.rename(columns={'timestamp': 'resumed_at'}).reset_index(drop=True)
+
+def hourly_throughput(df):
+    """Uploads per clock hour"""
+    return df.set_index('timestamp').resample('h').size().rename('files').loc[lambda s: s > 0]
+
+def compare_runs(summary, baseline=0):
+    """Median and p90 latency of every run relative to the baseline run (index or name)"""
+    if isinstance(baseline, str) and baseline in summary['run'].values:
+        base = summary.loc[summary['run'] == baseline].iloc[0]
+    else:
+        base = summary.iloc[int(baseline)]
+    comparison = summary[['run', 'files', 'p50_s', 'p90_s', 'files_per_hour', 'stalls']].copy()
+    comparison['p50_change_%'] = (comparison['p50_s'] / base['p50_s'] - 1) * 100
+    comparison['p90_change_%'] = (comparison['p90_s'] / base['p90_s'] - 1) * 100
+    comparison['throughput_change_%'] = (comparison['files_per_hour'] / base['files_per_hour'] - 1) * 100
+    return comparison
+
+def rounded(df, decimals=1):
+    """Round the numeric columns for display"""
+    return df.round({col: decimals for col in df.select_dtypes('number').columns})
+
+def main():
+    parser = argparse.ArgumentParser(description="Upload latency, stall and throughput report from AutoIt upload logs")
+    parser.add_argument('logs', nargs='*', help="Log files (default: upload_log*.txt in --log-dir)")
+    parser.add_argument('--log-dir', default=r"D:\auto\upload\Autoit")
+    parser.add_argument('--by', choices=['session', 'log'], default='session',
+                        help="Split runs at idle gaps (session) or per log file (log)")
+    parser.add_argument('--run-gap', type=float, default=600,
+                        help="Seconds of inactivity that end a session")
+    parser.add_argument('--stall', type=float, default=None,
+                        help="Seconds above which an upload counts as stalled (default: 3x run median)")
+    parser.add_argument('--compare', nargs='?', const='0', default=None, metavar='BASELINE',
+                        help="Compare runs against a baseline run (name or index, default first)")
+    parser.add_argument('--hourly', action='store_true', help="Also print uploads per hour")
+    parser.add_argument('--csv', default=None, help="Write the per-file latencies to this CSV")
+    args = parser.parse_args()
+
+    log_paths = args.logs or sorted(glob.glob(os.path.join(args.log_dir, 'upload_log*.txt')))
+    df = load_logs(log_paths)
+    if df.empty:
+        print("No upload entries found")
+        return
+    print(f"Read {len(df)} uploads from {len(log_paths)} logs")
+
+    df = assign_runs(df, args.run_gap, args.by)
+    summary = run_summary(df, args.stall)
+
+    pd.set_option('display.width', 200)
+    pd.set_option('display.max_columns', None)
+    print("\nRuns:")
+    print(rounded(summary).to_string(index=False))
+
+    gaps = idle_gaps(df, args.run_gap)
+    if len(gaps):
+        print(f"\nIdle gaps over {args.run_gap:.0f}s: {len(gaps)}, total {gaps['idle_s'].sum() / 3600:.1f}h")
+        print(gaps.sort_values('idle_s', ascending=False).head(10).pipe(rounded, 0).to_string(index=False))
+
+    if args.compare is not None:
+        baseline = int(args.compare) if args.compare.lstrip('-').isdigit() else args.compare
+        print("\nComparison:")
+        print(rounded(compare_runs(summary, baseline)).to_string(index=False))
+
+    if args.hourly:
+        print("\nUploads per hour:")
+        print(hourly_throughput(df).to_string())
+
+    if args.csv:
+        df[['run', 'timestamp', 'file', 'latency', 'log']].to_csv(args.csv, index=False)
+        print(f"\nWrote per-file latencies to {args.csv}")
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,19 @@
+import argparse
+import ntpath
+import os
 import re
 import sys
+from datetime import datetime
 from pathlib import Path
 import shutil
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from wo_ledger import DEFAULT_DB, skip_completed
+
+VBS_LINE_LIMIT = 65535  # VBScript line length limit
+ARRAY_PATTERN = r'(workOrders\s*=\s*Array\()([^)]*?)(\))'
+LOG_LINE_PATTERN = re.compile(r'^(\d{4}/\d{2}/\d{2} \d{2}:\d{2}:\d{2}) - ')
+
 def validate_work_order(wo):
     """Validate individual work order format"""
     return bool(re.match(r'^\d{1,10}$', wo.strip()))
@@ -53,9 +64,44 @@ def backup_vbs_file(vbs_file):
         print(f"Error creating backup: {str(e)}")
         return False
 
-def update_vbs_array(vbs_file, work_orders):
-    """Update the work orders array in the VBS script"""
-    if not work_orders:
+def render_vbs(content, work_orders, constants=None):
+    """Return the VBS content with the workOrders array (and any Const values) replaced
+
+    Raises ValueError if the array is missing or the new line would exceed
+    the VBScript line length limit.
+    """
+    # Find the exact workOrders array definition
+    match = re.search(ARRAY_PATTERN, content)
+    if not match:
+        raise ValueError("Could not find workOrders array in VBS script")
+
+    # Preserve the exact spacing and format
+    prefix = match.group(1)  # Keeps 'workOrders = Array('
+    suffix = match.group(3)  # Keeps ')'
+
+    # Create the array string
+    new_array_content = ",".join(f'"{wo}"' for wo in work_orders)
+
+    # Verify the content length is within VBScript limits
+    estimated_line_length = len(prefix) + len(new_array_content) + len(suffix)
+    if estimated_line_length > VBS_LINE_LIMIT:
+        raise ValueError("Too many work orders to fit in a single VBScript line")
+
+    # Replace only the exact match
+    start, end = match.span()
+    content = content[:start] + f"{prefix}{new_array_content}{suffix}" + content[end:]
+
+    for name, value in (constants or {}).items():
+        literal = f'"{value}"' if isinstance(value, str) else str(value)
+        content, count = re.subn(rf'^(Const {name} = )("[^"]*"|\S+)',
+                                 lambda m: m.group(1) + literal, content, count=1, flags=re.M)
+        if not count:
+            raise ValueError(f"Could not find Const {name} in VBS script")
+    return content
+
+def update_vbs_array(vbs_file, work_orders, allow_empty=False):
+    """Update the work orders array in the VBS script (allow_empty clears it)"""
+    if not work_orders and not allow_empty:
         print("No valid work orders to process")
         return False
         
@@ -68,41 +114,20 @@ def update_vbs_array(vbs_file, work_orders):
         with open(vbs_file, 'r') as f:
             content = f.read()
 
-        # Find the exact workOrders array definition
-        pattern = r'(workOrders\s*=\s*Array\()([^)]*?)(\))'
-        match = re.search(pattern, content)
-        
-        if not match:
-            print("Could not find workOrders array in VBS script")
-            return False
-            
-        # Preserve the exact spacing and format
-        prefix = match.group(1)  # Keeps 'workOrders = Array('
-        suffix = match.group(3)  # Keeps ')'
-        
-        # Create the array string
-        new_array_content = ",".join(f'"{wo}"' for wo in work_orders)
-        
-        # Verify the content length is within VBScript limits
-        estimated_line_length = len(prefix) + len(new_array_content) + len(suffix)
-        if estimated_line_length > 65535:  # VBScript line length limit
-            print("Error: Too many work orders to fit in a single VBScript line")
-            print("Please reduce the number of work orders or modify the VBS script to handle multiple arrays")
+        try:
+            updated_content = render_vbs(content, work_orders)
+        except ValueError as e:
+            print(f"Error: {e}")
+            print(f"Please reduce the number of work orders or use --shards {min_shards(work_orders)}")
             return False
-            
-        # Create the new array line
-        new_line = f"{prefix}{new_array_content}{suffix}"
-        
-        # Replace only the exact match
-        start, end = match.span()
-        updated_content = content[:start] + new_line + content[end:]
         
         # Write the updated content back to the file
         with open(vbs_file, 'w', newline='') as f:  # Preserve line endings
             f.write(updated_content)
             
         print(f"\nSuccessfully updated VBS script with {len(work_orders)} work orders")
-        print(f"Work orders: {', '.join(work_orders)}")
+        if work_orders:
+            print(f"Work orders: {', '.join(work_orders)}")
         return True
     
     except Exception as e:
@@ -116,9 +141,139 @@ def update_vbs_array(vbs_file, work_orders):
             print(f"Error restoring backup: {str(be)}")
         return False
 
+def shard_work_orders(work_orders, shards):
+    """Split work orders into contiguous shards whose sizes differ by at most one"""
+    shards = max(1, min(shards, len(work_orders)))
+    size, extra = divmod(len(work_orders), shards)
+    result = []
+    start = 0
+    for i in range(shards):
+        end = start + size + (1 if i < extra else 0)
+        result.append(work_orders[start:end])
+        start = end
+    return result
+
+def min_shards(work_orders):
+    """Smallest shard count that keeps every workOrders line under the VBScript limit"""
+    overhead = len('    workOrders = Array()')
+    shards = 1
+    while any(overhead + sum(len(wo) + 3 for wo in shard) > VBS_LINE_LIMIT
+              for shard in shard_work_orders(work_orders, shards)):
+        shards += 1
+    return shards
+
+def shard_log_path(log_dir, index):
+    """Windows path of the upload log written by shard `index`"""
+    return ntpath.join(log_dir, f"upload_log_shard{index}.txt")
+
+def write_shard_scripts(vbs_file, work_orders, shards, log_dir):
+    """Write workorder_process_shard<N>.vbs for each shard of the work orders
+
+    Each script logs uploads to its own file and is meant for its own Windows
+    session, where it drives that session's (first) JDE window; in a shared
+    session the AutoIt file dialogs would collide. Returns the list of
+    (script path, work order count) written, or None on failure.
+    """
+    if not work_orders:
+        print("No valid work orders to process")
+        return None
+
+    with open(vbs_file, 'r') as f:
+        template = f.read()
+
+    vbs_path = Path(vbs_file)
+    written = []
+    for index, shard in enumerate(shard_work_orders(work_orders, shards), 1):
+        try:
+            content = render_vbs(template, shard, {
+                'UPLOAD_LOG_PATH': shard_log_path(log_dir, index),
+                # Shell.Application only lists the current session's windows
+                'WINDOW_INDEX': 1,
+            })
+        except ValueError as e:
+            print(f"Error in shard {index}: {e}")
+            print(f"Use at least --shards {min_shards(work_orders)}")
+            return None
+        shard_path = vbs_path.with_name(f"{vbs_path.stem}_shard{index}{vbs_path.suffix}")
+        with open(shard_path, 'w', newline='') as f:  # Preserve line endings
+            f.write(content)
+        written.append((shard_path, len(shard)))
+
+    # Remove scripts left over from an earlier run with more shards
+    for stale in vbs_path.parent.glob(f"{vbs_path.stem}_shard*{vbs_path.suffix}"):
+        if stale not in {path for path, _ in written}:
+            stale.unlink()
+
+    for shard_path, count in written:
+        print(f"Wrote {shard_path.name} with {count} work orders")
+    return written
+
+def merge_logs(log_paths, merged_path):
+    """Append the shard log entries missing from merged_path, in timestamp order
+
+    Existing entries are left where they are, since txtToCsv.py tails the
+    merged log by byte offset, so the merge can be re-run while shards are
+    still uploading. Lines a shard is still writing (no line end yet) wait for
+    the next merge. Returns the number of new entries added.
+    """
+    merged_path = Path(merged_path)
+    existing = []
+    if merged_path.exists():
+        with open(merged_path, 'r') as f:
+            existing = [line.rstrip('\r\n') for line in f if line.strip()]
+    seen = set(existing)
+
+    new_entries = []
+    for log_path in log_paths:
+        with open(log_path, 'r') as f:
+            for line in f:
+                if not line.endswith('\n'):
+                    break
+                line = line.rstrip('\r\n')
+                if not line.strip() or line in seen:
+                    continue
+                if not LOG_LINE_PATTERN.match(line):
+                    print(f"Warning: skipping unrecognised line in {log_path}: {line}")
+                    continue
+                seen.add(line)
+                new_entries.append(line)
+
+    def sort_key(line):
+        match = LOG_LINE_PATTERN.match(line)
+        return datetime.strptime(match.group(1), '%Y/%m/%d %H:%M:%S') if match else datetime.min
+
+    with open(merged_path, 'a', newline='') as f:
+        f.writelines(line + '\r\n' for line in sorted(new_entries, key=sort_key))
+    print(f"Merged {len(new_entries)} new entries from {len(log_paths)} logs into {merged_path}")
+    return len(new_entries)
+
 def main():
-    upload_file = "upload.txt"
-    vbs_file = "workorder_process.vbs"
+    parser = argparse.ArgumentParser(description="Load upload.txt work orders into workorder_process.vbs")
+    parser.add_argument('--upload-file', default="upload.txt", help="Work orders to upload, one per line")
+    parser.add_argument('--vbs-file', default="workorder_process.vbs", help="VBS script (template when sharding)")
+    parser.add_argument('--shards', type=int, default=1,
+                        help="Split the work orders into this many workorder_process_shard<N>.vbs scripts")
+    parser.add_argument('--log-dir', default=r"D:\auto\upload\Autoit",
+                        help="Folder for the per-shard upload logs")
+    parser.add_argument('--merge-logs', action='store_true',
+                        help="Merge the per-shard logs from --log-dir into --merged-log and exit")
+    parser.add_argument('--merged-log', default=None,
+                        help="Merged upload log (default: upload_log.txt in --log-dir)")
+    parser.add_argument('--ledger', default=DEFAULT_DB,
+                        help="Status ledger; work orders it records as uploaded are left out")
+    parser.add_argument('--no-ledger', action='store_true', help="Queue every work order in upload.txt")
+    args = parser.parse_args()
+
+    if args.merge_logs:
+        log_paths = sorted(Path(args.log_dir).glob("upload_log_shard*.txt"))
+        if not log_paths:
+            print(f"No shard logs found in {args.log_dir}")
+            return
+        merge_logs(log_paths, args.merged_log or Path(args.log_dir) / "upload_log.txt")
+        return
+
+    upload_file = args.upload_file
+    vbs_file = args.vbs_file
     
     # Validate files exist
     if not all(Path(f).exists() for f in [upload_file, vbs_file]):
@@ -132,17 +287,27 @@ def main():
     work_orders = read_work_orders(upload_file)
     if work_orders is None:
         return
-        
+    work_orders = skip_completed('uploaded', work_orders, key=lambda wo: wo,
+                                 db_path=None if args.no_ledger else args.ledger)
+
     if not work_orders:
-        print("No work orders found in file")
+        print("No work orders left to upload")
         return
         
     # Confirm before proceeding with large updates
-    if len(work_orders) > 1000:
+    if len(work_orders) > 1000 and args.shards == 1:
         print(f"\nWarning: Large number of work orders found ({len(work_orders)})")
         proceed = input("Do you want to continue? (y/n): ").lower()
         if proceed != 'y':
             return
+
+    if args.shards > 1:
+        print(f"\nWriting {args.shards} shard scripts...")
+        if write_shard_scripts(vbs_file, work_orders, args.shards, args.log_dir):
+            print("\nRun each shard against its own JDE window, then merge the logs with --merge-logs")
+        else:
+            print("\nUpdate failed")
+        return
     
     # Update the VBS script
     print("\nUpdating VBS script...")
@@ -152,4 +317,4 @@ def main():
         print("\nUpdate failed")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -462,10 +462,89 @@ async function processSingleWorkOrder(workOrderNumber) {
     return result;
 }
 
+// --- QUEUE PAYLOAD ---
+// Queue data is written by the Python stage scripts to a JSON payload
+// (schema 'jde-automation-queue', version 1) and loaded here at run time.
+const PAYLOAD_SCHEMA = 'jde-automation-queue';
+const PAYLOAD_VERSION = 1;
+
+const validatePayload = (payload, stage, requiredFields) => {
+    if (!payload || payload.schema !== PAYLOAD_SCHEMA || payload.version !== PAYLOAD_VERSION) {
+        throw new Error(`Not a ${PAYLOAD_SCHEMA} v${PAYLOAD_VERSION} payload`);
+    }
+    if (payload.stage !== stage) {
+        throw new Error(`Payload holds '${payload.stage}' data, expected '${stage}'`);
+    }
+    if (!Array.isArray(payload.items)) throw new Error('Payload has no items array');
+    payload.items.forEach((item, index) => {
+        requiredFields.forEach(field => {
+            if (!(field in item)) throw new Error(`Payload item ${index} is missing '${field}'`);
+        });
+    });
+    console.log(`Loaded ${payload.items.length} ${stage} items (generated ${payload.generated_at})`);
+    return payload.items;
+};
+
+// Load a payload from a URL, or let the user pick the file when no URL is given
+const loadPayload = async (stage, requiredFields, url = null) => {
+    if (url) {
+        const response = await fetch(url);
+        if (!response.ok) throw new Error(`Failed to fetch ${url}: ${response.status}`);
+        return validatePayload(await response.json(), stage, requiredFields);
+    }
+    const text = await new Promise((resolve, reject) => {
+        const overlay = document.createElement('div');
+        overlay.style = 'position: fixed; top: 10px; left: 50%; transform: translateX(-50%); z-index: 10000; padding: 15px; background: #fff; border: 4px solid #0066cc; box-shadow: 0 4px 15px rgba(0,0,0,0.5); text-align: center; font-family: sans-serif;';
+        overlay.innerHTML = `
+            <div style="margin-bottom: 10px; font-weight: bold; font-size: 16px;">Select the ${stage} payload file</div>
+            <input type="file" accept=".json,application/json">
+            <button style="margin-left: 8px; padding: 4px 12px; cursor: pointer;">Cancel</button>
+        `;
+        document.body.appendChild(overlay);
+        overlay.querySelector('button').onclick = () => {
+            overlay.remove();
+            reject(new Error('Payload selection cancelled'));
+        };
+        overlay.querySelector('input').onchange = (event) => {
+            const file = event.target.files[0];
+            overlay.remove();
+            if (!file) return reject(new Error('No payload file selected'));
+            file.text().then(resolve, reject);
+        };
+    });
+    return validatePayload(JSON.parse(text), stage, requiredFields);
+};
+
+// --- RESULTS FILE ---
+// Per-WO outcomes downloaded as <stage>.results.json for the status ledger:
+//   python wo_ledger.py import <stage> <stage>.results.json
+const RESULTS_SCHEMA = 'jde-automation-results';
+
+const saveResults = (stage, items) => {
+    if (window.jdeSaveResults === false) return;  // e.g. benchmark runs against mock_jde
+    const results = {
+        schema: RESULTS_SCHEMA,
+        version: 1,
+        stage,
+        generated_at: new Date().toISOString(),
+        count: items.length,
+        items
+    };
+    const link = document.createElement('a');
+    link.href = URL.createObjectURL(new Blob([JSON.stringify(results)], { type: 'application/json' }));
+    link.download = `${stage}.results.json`;
+    document.body.appendChild(link);
+    link.click();
+    link.remove();
+    setTimeout(() => URL.revokeObjectURL(link.href), 1000);
+    console.log(`Saved ${items.length} ${stage} results to ${stage}.results.json (import with wo_ledger.py)`);
+};
+
 // --- Automation System Setup ---
 
-// Array to hold the queue of work orders. This can be modified externally.
-const workOrderQueue = ["614922", "614923", "614924", "614925", "614926", "614927", "614928", "614929", "614930", "614931", "614932", "614933", "614934", "614935", "614936", "614937", "614938", "614939", "614940", "614941", "614942", "614943", "614944", "614945", "614946", "614947", "614948", "614949", "614950", "614951", "614952", "614953", "614954", "614955", "614956", "614957", "614958", "614959", "614960", "614961", "614962", "614963", "614964", "614965", "614966", "614967", "614968", "614969", "614970", "614971", "614972", "614973", "614974", "614975", "614976", "614977", "614978", "614979", "614980", "614981", "614982", "614983", "614984", "614985", "614986", "614987", "614988", "614989", "614990", "614991", "614992", "614993", "614994", "614995", "614996", "614997", "614998", "614999", "615000", "615001"];
+// Array to hold the queue of work orders. Filled from the payload written by update.py,
+// but it can also be modified externally.
+const workOrderQueue = [];
 const processedResults = []; // To store results of processed work orders
 
 /**
@@ -473,6 +552,9 @@ const processedResults = []; // To store results of processed work orders
  */
 async function processWorkOrders() {
     console.log("Starting batch processing of work orders from the pre-populated queue...");
+    if (window.partsDetailAutomation.workOrderQueue.length === 0) {
+        await window.partsDetailAutomation.loadPayload();
+    }
     
     // Take a copy of the queue for this run and then clear the original queue
     // to allow for new work orders to be added for subsequent runs.
@@ -534,6 +616,12 @@ async function processWorkOrders() {
         console.log("\nNo parts found with remaining 'Qty Aval Current - Project' in this batch. Current summary is OK.");
     }
 
+    saveResults('checked', processedResults.map(res => ({
+        wo: res["Work Order"],
+        status: res["Exists"] === "Yes" && res["All Items Issued"] === "Yes" && !res.error ? 'done' : 'failed',
+        detail: res.error || `Exists: ${res["Exists"]}, All Items Issued: ${res["All Items Issued"]}`
+    })));
+
     console.log("\nBatch Processing Finished.");
     return processedResults;
 }
@@ -547,6 +635,18 @@ window.partsDetailAutomation = {
      */
     workOrderQueue: workOrderQueue,
 
+    /**
+     * Loads the queue from the payload written by update.py.
+     * @param {string} [url] Optional URL of the payload; without it a file picker is shown.
+     * @returns {Promise<number>} The number of work orders queued.
+     */
+    loadPayload: async (url = null) => {
+        const items = await loadPayload('parts_check', ['wo'], url);
+        window.partsDetailAutomation.workOrderQueue.length = 0;
+        window.partsDetailAutomation.workOrderQueue.push(...items.map(item => item.wo));
+        return window.partsDetailAutomation.workOrderQueue.length;
+    },
+
     /**
      * Starts the processing of work orders currently in the `workOrderQueue`.
      * Once called, it processes all items in the queue and then clears it.
@@ -591,7 +691,11 @@ How to Use:
 **To run the automation:**
 
 * **1. Populate the work order queue:**
-    Assign an array of work order numbers (as strings) to 'partsDetailAutomation.workOrderQueue'.
+    Load the payload written by update.py (a file picker opens if no URL is given):
+    \`\`\`javascript
+    partsDetailAutomation.loadPayload();
+    \`\`\`
+    Or assign an array of work order numbers (as strings) to 'partsDetailAutomation.workOrderQueue'.
     This can be done from another script or directly in the console:
     \`\`\`javascript
     partsDetailAutomation.workOrderQueue = ["611900", "611901", "611950", "DUMMY123"];
@@ -0,0 +1,281 @@
+"""Benchmark the browser scripts' fixed delays against a local mock of JDE.
+
+Serves the mock JDE app (app.html) and a harness page (index.html) that runs
+dragon3.js or issues4.js once per trial, each trial with its own set of delay
+overrides (window.jdeDelays, see the DELAYS table at the top of each script).
+The mock answers every round trip after a random latency and drops input
+that arrives while it is busy, so delays that are too short show up as lost
+items and failed work orders instead of just faster runs.
+
+    python bench.py dragon3 --scale 1 0.75 0.5 --latency 800 --jitter 600
+    python bench.py issues4 --delays delay_sets.json --repeat 3 --error-rate 0.05
+    python bench.py --report bench_results.csv
+
+delay_sets.json is a list of {"name": ..., "scale": ..., "<delay>": ms, ...}.
+Results are appended to bench_results.csv, one row per trial, and summarised
+per delay set: items per minute, work order and item failure rates, and the
+input the mock dropped. Keep the benchmark tab in the foreground.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import webbrowser
+from collections import Counter
+from datetime import datetime
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, ROOT)
+from queue_payload import SCHEMA, VERSION, validate_items
+
+SCRIPTS = {
+    'dragon3': os.path.join(ROOT, '02 enterWO', 'dragon3.js'),
+    'issues4': os.path.join(ROOT, '03 issue', 'issues4.js'),
+}
+RESULT_COLUMNS = ['finished_at', 'script', 'delay_set', 'repeat', 'latency_ms', 'jitter_ms', 'error_rate',
+                  'elapsed_s', 'work_orders', 'work_orders_ok', 'items', 'items_ok', 'items_per_min',
+                  'wo_failure_rate', 'item_failure_rate', 'dropped', 'jde_errors', 'console_errors', 'error']
+
+
+def make_scenario(script: str, work_orders: int, items: int, seed: int) -> dict:
+    """Queue payload items and the matching mock JDE data for one repeat"""
+    rng = random.Random(seed)
+    wos = [str(900001 + i) for i in range(work_orders)]
+    if script == 'dragon3':
+        # Quantities start at 2: dragon3.js finds the next quantity cell by its default value of 1
+        payload = [{'wo': wo, 'lines': [{'itemNumber': f"BENCH-{rng.randrange(100000):05d}",
+                                         'quantity': rng.randint(2, 99)} for _ in range(items)]} for wo in wos]
+        return {'stage': 'dragon3', 'payload': payload, 'mock': {}}
+    issues = {wo: [{'item': f"BENCH-{rng.randrange(100000):05d}", 'um': 'EA', 'remaining': rng.randint(1, 50)}
+                   for _ in range(items)] for wo in wos}
+    payload = [{'wo': wo, 'date': datetime.now().strftime('%m/%d/%Y')} for wo in wos]
+    return {'stage': 'issues4', 'payload': payload, 'mock': {'issues': issues}}
+
+
+def score(script: str, scenario: dict, snapshot: dict) -> dict:
+    """Count work orders and lines that ended up in JDE exactly as queued"""
+    if script == 'dragon3':
+        expected = {}
+        for batch in scenario['payload']:
+            expected[batch['wo']] = Counter((line['itemNumber'], float(line['quantity'])) for line in batch['lines'])
+        items_ok = wo_ok = 0
+        for wo, lines in expected.items():
+            saved = Counter((row['item'], float(row['qty'])) for row in snapshot['parts'].get(wo, [])
+                            if row.get('qty') is not None)
+            items_ok += sum((lines & saved).values())
+            wo_ok += saved == lines
+        return {'work_orders': len(expected), 'work_orders_ok': wo_ok,
+                'items': sum(len(batch['lines']) for batch in scenario['payload']), 'items_ok': items_ok}
+    issues = snapshot['issues']
+    lines = [part for parts in issues.values() for part in parts]
+    return {'work_orders': len(issues),
+            'work_orders_ok': sum(all(part['remaining'] == 0 for part in parts) for parts in issues.values()),
+            'items': len(lines), 'items_ok': sum(part['remaining'] == 0 for part in lines)}
+
+
+def load_delay_sets(path: str, scales: list) -> list:
+    sets = [{'name': f"scale {scale:g}", 'scale': scale} for scale in scales or []]
+    if path:
+        with open(path, 'r', encoding='utf-8') as f:
+            for index, entry in enumerate(json.load(f)):
+                sets.append({'name': entry.get('name', f"set {index + 1}"), **entry})
+    return sets or [{'name': 'defaults'}]
+
+
+class Benchmark:
+    """Trial list and results shared by the HTTP handler threads"""
+
+    def __init__(self, args):
+        self.args = args
+        self.trials = []
+        for repeat in range(args.repeat):
+            # Every delay set sees the same data and latency sequence within a repeat
+            scenario = make_scenario(args.script, args.work_orders, args.items, args.seed + repeat)
+            for delay_set in load_delay_sets(args.delays, args.scale):
+                self.trials.append({'repeat': repeat, 'delay_set': delay_set, 'scenario': scenario})
+        self.received = 0
+        self.finished = threading.Event()
+        self.done_served = threading.Event()
+        self.lock = threading.Lock()
+
+    def spec(self, index: int) -> dict:
+        if index >= len(self.trials):
+            self.done_served.set()
+            return {'done': True, 'trials': len(self.trials), 'results': os.path.abspath(self.args.output)}
+        trial = self.trials[index]
+        delays = {key: value for key, value in trial['delay_set'].items() if key != 'name'}
+        return {
+            'trials': len(self.trials),
+            'script': self.args.script,
+            'script_url': f"/scripts/{self.args.script}.js",
+            'payload_url': f"/api/payload/{index}",
+            'delay_set': trial['delay_set']['name'],
+            'delays': delays,
+            'repeat': trial['repeat'],
+            'timeout_s': self.args.trial_timeout,
+            'mock': {'latency': self.args.latency, 'jitter': self.args.jitter, 'errorRate': self.args.error_rate,
+                     'seed': self.args.seed + trial['repeat'], **trial['scenario']['mock']},
+        }
+
+    def payload(self, index: int) -> dict:
+        scenario = self.trials[index]['scenario']
+        validate_items(scenario['stage'], scenario['payload'])
+        return {'schema': SCHEMA, 'version': VERSION, 'stage': scenario['stage'],
+                'generated_at': datetime.now().isoformat(timespec='seconds'),
+                'count': len(scenario['payload']), 'items': scenario['payload']}
+
+    def record(self, index: int, result: dict):
+        trial = self.trials[index]
+        counts = score(self.args.script, trial['scenario'], result['snapshot'])
+        stats = result['snapshot']['stats']
+        minutes = result['elapsed_s'] / 60
+        row = {
+            'finished_at': datetime.now().isoformat(timespec='seconds'),
+            'script': self.args.script,
+            'delay_set': trial['delay_set']['name'],
+            'repeat': trial['repeat'],
+            'latency_ms': self.args.latency,
+            'jitter_ms': self.args.jitter,
+            'error_rate': self.args.error_rate,
+            'elapsed_s': round(result['elapsed_s'], 1),
+            **counts,
+            'items_per_min': round(counts['items_ok'] / minutes, 2) if minutes else None,
+            'wo_failure_rate': round(1 - counts['work_orders_ok'] / counts['work_orders'], 3),
+            'item_failure_rate': round(1 - counts['items_ok'] / counts['items'], 3),
+            'dropped': json.dumps(stats['dropped'], sort_keys=True),
+            'jde_errors': stats['errors'],
+            'console_errors': result['console_errors'],
+            'error': result['error'] or '',
+        }
+        with self.lock:
+            write_header = not os.path.exists(self.args.output)
+            pd.DataFrame([row], columns=RESULT_COLUMNS).to_csv(self.args.output, mode='a', header=write_header,
+                                                             index=False)
+            self.received += 1
+            print(f"[{self.received}/{len(self.trials)}] {row['delay_set']} repeat {row['repeat'] + 1}: "
+                  f"{row['elapsed_s']}s, {row['items_per_min']} items/min, "
+                  f"{counts['work_orders'] - counts['work_orders_ok']} failed WOs, dropped {row['dropped']}"
+                  + (f", {row['error']}" if row['error'] else ''))
+            if self.received >= len(self.trials):
+                self.finished.set()
+
+
+def make_handler(bench: Benchmark):
+    class Handler(SimpleHTTPRequestHandler):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, directory=HERE, **kwargs)
+
+        def log_message(self, format, *args):
+            pass
+
+        def send_json(self, data, status=200):
+            body = json.dumps(data).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('Cache-Control', 'no-store')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            path = self.path.split('?')[0]
+            if path.startswith('/api/trial/'):
+                return self.send_json(bench.spec(int(path.rsplit('/', 1)[1])))
+            if path.startswith('/api/payload/'):
+                return self.send_json(bench.payload(int(path.rsplit('/', 1)[1])))
+            if path.startswith('/scripts/'):
+                name = os.path.splitext(os.path.basename(path))[0]
+                if name not in SCRIPTS:
+                    return self.send_error(404)
+                with open(SCRIPTS[name], 'rb') as f:
+                    body = f.read()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/javascript; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('Cache-Control', 'no-store')
+                self.end_headers()
+                self.wfile.write(body)
+                return
+            return super().do_GET()
+
+        def do_POST(self):
+            path = self.path.split('?')[0]
+            if not path.startswith('/api/result/'):
+                return self.send_error(404)
+            length = int(self.headers.get('Content-Length', 0))
+            bench.record(int(path.rsplit('/', 1)[1]), json.loads(self.rfile.read(length)))
+            self.send_json({'ok': True})
+
+    return Handler
+
+
+def summarize(df: pd.DataFrame) -> str:
+    """Mean per delay set, fastest reliable set first"""
+    grouped = df.groupby(['script', 'latency_ms', 'jitter_ms', 'delay_set'])
+    summary = grouped.agg(trials=('elapsed_s', 'size'), elapsed_s=('elapsed_s', 'mean'),
+                          items_per_min=('items_per_min', 'mean'), wo_failure_rate=('wo_failure_rate', 'mean'),
+                          item_failure_rate=('item_failure_rate', 'mean'), jde_errors=('jde_errors', 'sum'))
+    summary = summary.sort_values(['wo_failure_rate', 'items_per_min'], ascending=[True, False])
+    return summary.round(3).to_string()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure throughput and failures of the browser scripts' delays "
+                                                 "against a mock JDE")
+    parser.add_argument('script', nargs='?', choices=list(SCRIPTS))
+    parser.add_argument('--scale', type=float, nargs='*', default=None,
+                        help="Delay sets that scale every default delay (default: 1 when --delays is not given)")
+    parser.add_argument('--delays', default=None, help="JSON list of named delay sets")
+    parser.add_argument('--repeat', type=int, default=1, help="Runs of each delay set")
+    parser.add_argument('--work-orders', type=int, default=3, help="Work orders per run")
+    parser.add_argument('--items', type=int, default=6, help="Parts lines per work order")
+    parser.add_argument('--latency', type=float, default=800, help="Minimum mock round trip in ms")
+    parser.add_argument('--jitter', type=float, default=400, help="Random extra round trip time in ms")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Chance an OK comes back with a JDE error")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--trial-timeout', type=float, default=1800, help="Seconds before a trial is abandoned")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--no-browser', action='store_true', help="Print the URL instead of opening a browser")
+    parser.add_argument('--output', default='bench_results.csv', help="Per-trial results (appended)")
+    parser.add_argument('--report', metavar='CSV', help="Summarise an existing results file and exit")
+    args = parser.parse_args()
+
+    pd.set_option('display.width', 200)
+    if args.report:
+        print(summarize(pd.read_csv(args.report)))
+        return
+    if not args.script:
+        parser.error("choose a script to benchmark (dragon3 or issues4)")
+    if args.scale is None and not args.delays:
+        args.scale = [1.0]
+
+    bench = Benchmark(args)
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), make_handler(bench))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{args.port}/index.html?trial=0"
+    print(f"Running {len(bench.trials)} trials of {args.script} at {url}")
+    if args.no_browser:
+        print("Open the URL in Chrome or Edge and keep the tab in the foreground")
+    else:
+        webbrowser.open(url)
+
+    try:
+        bench.finished.wait()
+        bench.done_served.wait(timeout=10)  # let the page show that the run is over
+    except KeyboardInterrupt:
+        print("\nStopped before all trials finished")
+    finally:
+        server.shutdown()
+    if os.path.exists(args.output):
+        df = pd.read_csv(args.output)
+        print("\n" + summarize(df[df['script'] == args.script]))
+
+
+if __name__ == '__main__':
+    main()
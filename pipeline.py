@@ -0,0 +1,443 @@
+"""In-process runner for the work order pipeline (stages 00-05).
+
+Stages form a small dependency graph. DataFrames are handed from stage to
+stage in memory, and every stage that produces one also writes it to its
+usual CSV so it can be inspected and reused by later runs. A fingerprint of
+each stage's inputs (files, upstream fingerprints and the stage's own code)
+is stored in .pipeline_state.json; stages whose fingerprint is unchanged
+are skipped and their output is reloaded from disk only if a downstream
+stage needs it.
+
+    python pipeline.py                 # run whatever changed
+    python pipeline.py --list          # show stages and whether they are stale
+    python pipeline.py --force map     # re-run a stage (and everything after it)
+    python pipeline.py --skip extract  # use the existing extract output as-is
+    python pipeline.py --timing-log timing_spans.jsonl   # record timing spans
+"""
+import argparse
+import hashlib
+import importlib.util
+import json
+import os
+import sys
+
+import pandas as pd
+
+from queue_payload import PAYLOAD_FILES
+from timing import span, configure
+import wo_ledger
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+STATE_FILE = '.pipeline_state.json'
+
+_modules = {}
+
+
+def load_module(relpath: str):
+    """Import a stage script by path (stage folders contain spaces, so they are not packages)"""
+    path = os.path.join(ROOT, relpath)
+    if path not in _modules:
+        folder = os.path.dirname(path)
+        if folder not in sys.path:
+            sys.path.insert(0, folder)
+        name = 'stage_' + hashlib.sha1(relpath.encode('utf-8')).hexdigest()[:8]
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _modules[path] = module
+    return _modules[path]
+
+
+def digest_path(path: str, suffix: str = None) -> str:
+    """Content hash of a file, or of the names/sizes/mtimes of a directory's files (those ending in suffix)"""
+    digest = hashlib.sha256()
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            if suffix and not name.lower().endswith(suffix):
+                continue
+            stat = os.stat(os.path.join(path, name))
+            digest.update(f"{name}:{stat.st_size}:{stat.st_mtime_ns}\n".encode('utf-8'))
+    elif os.path.exists(path):
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+    else:
+        digest.update(b'<missing>')
+    return digest.hexdigest()
+
+
+class Stage:
+    """One pipeline step.
+
+    run(ctx, inputs) receives the outputs of its dependencies by stage name
+    and returns a DataFrame (or None for stages that only write a script).
+    inputs_fn(ctx) lists the files or strings whose change should trigger a
+    re-run; artifact(ctx) is where a DataFrame output is saved and reloaded,
+    and output_file(ctx) is the file written by stages without a DataFrame.
+    """
+
+    def __init__(self, name, run, deps=(), inputs_fn=lambda ctx: [], code=(), artifact=None,
+                 output_file=None, description=''):
+        self.name = name
+        self.run = run
+        self.deps = list(deps)
+        self.inputs_fn = inputs_fn
+        self.code = list(code)
+        self.artifact = artifact
+        self.output_file = output_file
+        self.description = description
+
+    def fingerprint(self, ctx, dep_fingerprints: list) -> str:
+        digest = hashlib.sha256(self.name.encode('utf-8'))
+        for relpath in self.code:
+            digest.update(digest_path(os.path.join(ROOT, relpath)).encode('utf-8'))
+        for item in self.inputs_fn(ctx):
+            value = item() if callable(item) else digest_path(item)
+            digest.update(str(value).encode('utf-8'))
+        for dep in dep_fingerprints:
+            digest.update(dep.encode('utf-8'))
+        return digest.hexdigest()
+
+
+class Context:
+    """Resolved paths for one run; everything is relative to the repository root"""
+
+    def __init__(self, root: str, workers: int = 1, rpm: float = None):
+        self.root = root
+        self.workers = workers
+        self.rpm = rpm
+        self.preprocess = os.path.join(root, '00 preprocess')
+        self.pdf_dir = os.path.join(self.preprocess, 'pdfs')
+        self.extract_csv = os.path.join(self.preprocess, 'csvs', 'work_orders.csv')
+        self.normalized_csv = os.path.join(self.preprocess, 'output.csv')
+        self.validated_csv = os.path.join(self.preprocess, 'validated_output.csv')
+        self.quarantine_csv = os.path.join(self.preprocess, 'quarantined_rows.csv')
+        self.item_master_db = os.path.join(self.preprocess, 'item_master.db')
+        self.item_corrections_csv = os.path.join(self.preprocess, 'item_corrections.csv')
+        self.updated_csv = os.path.join(self.preprocess, 'updated_output.csv')
+        self.unmatched_csv = os.path.join(self.preprocess, 'unmatched_work_orders.csv')
+        self.consolidated_csv = os.path.join(root, '02 enterWO', 'consolidated_parts.csv')
+        self.consolidation_audit = os.path.join(root, '02 enterWO', 'consolidation_audit.csv')
+        self.system_wo_txt = os.path.join(self.preprocess, 'systemwo.txt')
+        self.system_wo_db = os.path.join(self.preprocess, 'system_wo.db')
+        self.wo_data = os.path.join(root, '01 woCreation', 'WoData.txt')
+        self.issue_txt = os.path.join(root, '03 issue', 'issue.txt')
+        self.payloads = {stage: os.path.join(root, path) for stage, path in PAYLOAD_FILES.items()}
+        self.upload_txt = os.path.join(root, '04 upload', 'upload.txt')
+        self.upload_vbs = os.path.join(root, '04 upload', 'workorder_process.vbs')
+        self.ledger_db = os.path.join(root, 'wo_ledger.db')
+
+
+# --- Stage implementations ---
+
+def run_extract(ctx, inputs):
+    claude = load_module('00 preprocess/claude.py')
+    router = claude.PageRouter(claude.RenderCache(os.path.join(ctx.preprocess, '.render_cache')))
+    # Same cache as claude.py, so a re-run only bills the pages that are new or changed
+    cache = claude.ExtractionCache(os.path.join(ctx.preprocess, '.extraction_cache'))
+    processor = claude.PDFProcessor(max_workers=ctx.workers, requests_per_minute=ctx.rpm, cache=cache,
+                                    item_rules=None, fast_path_threshold=claude.DEFAULT_THRESHOLD,
+                                    router=router)
+    processor.process_directory(ctx.pdf_dir, os.path.dirname(ctx.extract_csv))
+    if not os.path.exists(ctx.extract_csv) or os.path.getsize(ctx.extract_csv) == 0:
+        # Header-only, so later runs can reload the artifact like any other
+        print("No rows extracted")
+        pd.DataFrame(columns=claude.COLUMNS).to_csv(ctx.extract_csv, index=False)
+    return read_csv(ctx.extract_csv)
+
+
+def run_normalize(ctx, inputs):
+    normalizer = load_module('00 preprocess/item_normalizer.py')
+    df, counts = normalizer.normalize_item_numbers(inputs['extract'])
+    print(normalizer.format_counts(counts))
+    df.to_csv(ctx.normalized_csv, index=False)
+    return df
+
+
+def run_validate(ctx, inputs):
+    validator = load_module('00 preprocess/row_validator.py')
+    df, extra_masks = inputs['normalize'], None
+    if os.path.exists(ctx.item_master_db):
+        item_master = load_module('00 preprocess/item_master.py')
+        df, audit = item_master.snap_item_numbers(df, item_master.load_index(ctx.item_master_db))
+        audit.to_csv(ctx.item_corrections_csv, index=False)
+        print(item_master.format_summary(audit))
+        extra_masks = item_master.item_masks(df, audit)
+    clean, quarantined = validator.validate_rows(df, skip=validator.DEFAULT_SKIP, extra_masks=extra_masks)
+    print(validator.format_summary(clean, quarantined))
+    clean.to_csv(ctx.validated_csv, index=False)
+    if not quarantined.empty:
+        quarantined.to_csv(ctx.quarantine_csv, index=False)
+        print(f"Warning: {len(quarantined)} rows quarantined. See '{ctx.quarantine_csv}'")
+    elif os.path.exists(ctx.quarantine_csv):
+        os.remove(ctx.quarantine_csv)
+    return clean
+
+
+def run_map(ctx, inputs):
+    mapper = load_module('00 preprocess/process_work_orders.py')
+    store_module = load_module('00 preprocess/system_wo_store.py')
+    store = store_module.SystemWOStore(ctx.system_wo_db)
+    try:
+        if os.path.exists(ctx.system_wo_txt):
+            store.import_file(ctx.system_wo_txt)
+        mapping = store.mapping()
+    finally:
+        store.close()
+
+    matched, unmatched = mapper.map_system_work_orders(inputs['validate'], mapping)
+    matched.to_csv(ctx.updated_csv, index=False)
+    if not unmatched.empty:
+        unmatched.to_csv(ctx.unmatched_csv, index=False)
+        print(f"Warning: {len(unmatched)} rows had no system WO. See '{ctx.unmatched_csv}'")
+    elif os.path.exists(ctx.unmatched_csv):
+        os.remove(ctx.unmatched_csv)
+    print(f"Mapped {len(matched)} rows to system work orders")
+    ledger = wo_ledger.WOLedger(ctx.ledger_db)
+    try:
+        ledger.mark('extracted', matched['System_Work_Order'].dropna().unique())
+    finally:
+        ledger.close()
+    return matched
+
+
+def run_wo_creation(ctx, inputs):
+    load_module('01 woCreation/wo.py').update_work_order_queue(ctx.wo_data, ctx.payloads['wo_creation'],
+                                                                ctx.ledger_db)
+
+
+def run_consolidate(ctx, inputs):
+    consolidate = load_module('02 enterWO/consolidate_parts.py')
+    lines, audit, stats = consolidate.consolidate_lines(inputs['map'])
+    print(consolidate.format_report(stats))
+    lines.to_csv(ctx.consolidated_csv, index=False)
+    audit.to_csv(ctx.consolidation_audit, index=False)
+    return lines
+
+
+def run_dragon(ctx, inputs):
+    load_module('02 enterWO/update_csv.py').write_batches(ctx.payloads['dragon3'], inputs['consolidate'], ctx.ledger_db)
+
+
+def run_issues(ctx, inputs):
+    load_module('03 issue/updatearray.py').update_work_orders(ctx.payloads['issues4'], ctx.issue_txt, ctx.ledger_db)
+
+
+def run_parts_check(ctx, inputs):
+    if load_module('05 check/update.py').update_javascript_work_order_queue(
+            ctx.issue_txt, ctx.payloads['parts_check'], ctx.ledger_db) is None:
+        raise RuntimeError("Failed to write the partsDetailAutomation payload")
+
+
+def run_upload(ctx, inputs):
+    update_vbs = load_module('04 upload/update_vbs.py')
+    work_orders = update_vbs.read_work_orders(ctx.upload_txt)
+    if work_orders is None:
+        raise RuntimeError(f"Could not read work orders from {ctx.upload_txt}")
+    work_orders = wo_ledger.skip_completed('uploaded', work_orders, key=lambda wo: wo, db_path=ctx.ledger_db)
+    if not work_orders:
+        # Clear the array so the previous run's work orders can't be replayed
+        print("No work orders left to upload")
+    if not update_vbs.update_vbs_array(ctx.upload_vbs, work_orders, allow_empty=True):
+        raise RuntimeError("Failed to update workOrders in workorder_process.vbs")
+
+
+def read_csv(path):
+    with span('csv_read', os.path.basename(path)) as s:
+        df = pd.read_csv(path, dtype={'Project Number': str, 'Work Order Number': str,
+                                      'System_Work_Order': str, 'Item Number': str})
+        s.set(rows=len(df))
+    return df
+
+
+def system_wo_fingerprint(ctx):
+    """Hash of the effective mapping (store plus systemwo.txt), which importing does not change"""
+    store_module = load_module('00 preprocess/system_wo_store.py')
+    frames = []
+    if os.path.exists(ctx.system_wo_db):
+        store = store_module.SystemWOStore(ctx.system_wo_db)
+        try:
+            frames.append(store.mapping())
+        finally:
+            store.close()
+    if os.path.exists(ctx.system_wo_txt):
+        frames.append(store_module.read_system_wo_file(ctx.system_wo_txt))
+    if not frames:
+        return '<missing>'
+    mapping = (pd.concat(frames, ignore_index=True)[['Project Number', 'Work Order Number', 'systemWO']]
+                 .astype(str)
+                 .drop_duplicates(subset=['Project Number', 'Work Order Number'], keep='last')
+                 .sort_values(['Project Number', 'Work Order Number']))
+    return hashlib.sha256(mapping.to_csv(index=False).encode('utf-8')).hexdigest()
+
+
+STAGES = [
+    Stage('extract', run_extract,
+          inputs_fn=lambda ctx: [lambda: digest_path(ctx.pdf_dir, '.pdf')],
+          code=['00 preprocess/claude.py', '00 preprocess/checkpoint.py', '00 preprocess/batching.py',
+                '00 preprocess/extraction_cache.py', '00 preprocess/page_source.py', '00 preprocess/page_router.py',
+                '00 preprocess/throttle.py', '00 preprocess/text_layer.py'],
+          artifact=lambda ctx: ctx.extract_csv,
+          description='Extract rows from PDFs with the Claude API'),
+    Stage('normalize', run_normalize, deps=['extract'],
+          code=['00 preprocess/item_normalizer.py'],
+          artifact=lambda ctx: ctx.normalized_csv,
+          description='Normalize Item Numbers'),
+    Stage('validate', run_validate, deps=['normalize'],
+          inputs_fn=lambda ctx: [ctx.item_master_db],
+          code=['00 preprocess/row_validator.py', '00 preprocess/item_master.py'],
+          artifact=lambda ctx: ctx.validated_csv,
+          description='Quarantine rows that would fail in JDE'),
+    Stage('map', run_map, deps=['validate'],
+          inputs_fn=lambda ctx: [lambda: system_wo_fingerprint(ctx)],
+          code=['00 preprocess/process_work_orders.py', '00 preprocess/system_wo_store.py'],
+          artifact=lambda ctx: ctx.updated_csv,
+          description='Map project/WO numbers to system work orders'),
+    Stage('wo_creation', run_wo_creation,
+          inputs_fn=lambda ctx: [ctx.wo_data, lambda: wo_ledger.fingerprint('created', ctx.ledger_db)],
+          code=['01 woCreation/wo.py', 'queue_payload.py', 'wo_ledger.py'],
+          output_file=lambda ctx: ctx.payloads['wo_creation'],
+          description='Write the WoCreation.js queue payload'),
+    Stage('consolidate', run_consolidate, deps=['map'],
+          code=['02 enterWO/consolidate_parts.py'],
+          artifact=lambda ctx: ctx.consolidated_csv,
+          description='Merge duplicate parts lines per work order'),
+    Stage('dragon3', run_dragon, deps=['consolidate'],
+          inputs_fn=lambda ctx: [lambda: wo_ledger.fingerprint('parts_entered', ctx.ledger_db)],
+          code=['02 enterWO/update_csv.py', 'queue_payload.py', 'wo_ledger.py'],
+          output_file=lambda ctx: ctx.payloads['dragon3'],
+          description='Write the dragon3.js parts payload'),
+    Stage('issues4', run_issues,
+          inputs_fn=lambda ctx: [ctx.issue_txt, lambda: wo_ledger.fingerprint('issued', ctx.ledger_db)],
+          code=['03 issue/updatearray.py', 'queue_payload.py', 'wo_ledger.py'],
+          output_file=lambda ctx: ctx.payloads['issues4'],
+          description='Write the issues4.js queue payload'),
+    Stage('parts_check', run_parts_check,
+          inputs_fn=lambda ctx: [ctx.issue_txt, lambda: wo_ledger.fingerprint('checked', ctx.ledger_db)],
+          code=['05 check/update.py', 'queue_payload.py', 'wo_ledger.py'],
+          output_file=lambda ctx: ctx.payloads['parts_check'],
+          description='Write the partsDetailAutomation.js queue payload'),
+    Stage('upload', run_upload,
+          inputs_fn=lambda ctx: [ctx.upload_txt, lambda: wo_ledger.fingerprint('uploaded', ctx.ledger_db)],
+          code=['04 upload/update_vbs.py', 'wo_ledger.py'],
+          description='Generate the workorder_process.vbs array'),
+]
+
+
+class Pipeline:
+    def __init__(self, ctx: Context, stages: list = None):
+        self.ctx = ctx
+        self.stages = {stage.name: stage for stage in (stages or STAGES)}
+        self.state_path = os.path.join(ctx.root, STATE_FILE)
+        self.state = {}
+        if os.path.exists(self.state_path):
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                self.state = json.load(f)
+        self.outputs = {}
+
+    def order(self, targets: list = None) -> list:
+        """Topological order of the target stages and their dependencies"""
+        ordered = []
+
+        def visit(name, trail=()):
+            if name in trail:
+                raise ValueError(f"Dependency cycle: {' -> '.join(trail + (name,))}")
+            if name not in self.stages:
+                raise ValueError(f"Unknown stage '{name}'")
+            if name in ordered:
+                return
+            for dep in self.stages[name].deps:
+                visit(dep, trail + (name,))
+            ordered.append(name)
+
+        for name in targets or self.stages:
+            visit(name)
+        return ordered
+
+    def output_of(self, name: str):
+        """Output of a stage from this run, or reloaded from its artifact"""
+        if name not in self.outputs:
+            stage = self.stages[name]
+            if stage.artifact is None:
+                self.outputs[name] = None
+            else:
+                path = stage.artifact(self.ctx)
+                if not os.path.exists(path):
+                    raise FileNotFoundError(f"Output of stage '{name}' not found: {path}")
+                self.outputs[name] = read_csv(path)
+        return self.outputs[name]
+
+    def is_fresh(self, stage: Stage, fingerprint: str) -> bool:
+        if self.state.get(stage.name) != fingerprint:
+            return False
+        written = stage.artifact or stage.output_file
+        return written is None or os.path.exists(written(self.ctx))
+
+    def save_state(self):
+        with open(self.state_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, indent=2, sort_keys=True)
+
+    def plan(self, targets=None, force=(), skip=()):
+        """Yield (stage, fingerprint, action) where action is 'run', 'fresh' or 'skip'"""
+        fingerprints = {}
+        forced = set(force)
+        for name in self.order(targets):
+            stage = self.stages[name]
+            fingerprint = stage.fingerprint(self.ctx, [fingerprints[dep] for dep in stage.deps])
+            if name in skip:
+                # Treat the existing artifact as the stage's output; downstream keys off its contents
+                if stage.artifact is not None:
+                    fingerprint = digest_path(stage.artifact(self.ctx))
+                action = 'skip'
+            elif name in forced or any(dep in forced for dep in stage.deps) or not self.is_fresh(stage, fingerprint):
+                forced.add(name)
+                action = 'run'
+            else:
+                action = 'fresh'
+            fingerprints[name] = fingerprint
+            yield stage, fingerprint, action
+
+    def run(self, targets=None, force=(), skip=()):
+        for stage, fingerprint, action in self.plan(targets, force, skip):
+            if action != 'run':
+                print(f"[{stage.name}] {'skipped' if action == 'skip' else 'up to date'}")
+                continue
+            print(f"\n[{stage.name}] {stage.description}...")
+            with span('stage', stage.name) as s:
+                inputs = {dep: self.output_of(dep) for dep in stage.deps}
+                self.outputs[stage.name] = stage.run(self.ctx, inputs)
+                if self.outputs[stage.name] is not None:
+                    s.set(rows=len(self.outputs[stage.name]))
+            self.state[stage.name] = fingerprint
+            self.save_state()
+        print("\nPipeline complete.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the work order pipeline, re-executing only changed stages")
+    parser.add_argument('stages', nargs='*', help="Stages to bring up to date (default: all)")
+    parser.add_argument('--root', default=ROOT, help="Folder containing the numbered stage folders")
+    parser.add_argument('--force', nargs='*', default=[], metavar='STAGE',
+                        help="Re-run these stages and everything downstream")
+    parser.add_argument('--skip', nargs='*', default=[], metavar='STAGE',
+                        help="Use these stages' existing outputs without running them")
+    parser.add_argument('--workers', type=int, default=1, help="Concurrent API calls for extraction")
+    parser.add_argument('--rpm', type=float, default=None, help="API requests per minute for extraction")
+    parser.add_argument('--list', action='store_true', help="Show stages and whether they would run")
+    parser.add_argument('--timing-log', default=None,
+                        help="Append JSON-lines timing spans to this file (see timing.py report)")
+    args = parser.parse_args()
+    if args.timing_log:
+        configure(args.timing_log)
+
+    pipeline = Pipeline(Context(args.root, workers=args.workers, rpm=args.rpm))
+    if args.list:
+        for stage, _, action in pipeline.plan(args.stages or None, args.force, args.skip):
+            deps = f" (after {', '.join(stage.deps)})" if stage.deps else ''
+            print(f"{stage.name:<12} {action:<6} {stage.description}{deps}")
+        return
+    pipeline.run(args.stages or None, args.force, args.skip)
+
+
+if __name__ == "__main__":
+    main()
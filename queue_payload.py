@@ -0,0 +1,91 @@
+"""Shared writer for the JSON queue payloads loaded by the browser scripts.
+
+Instead of regex-rewriting data into WoCreation.js, dragon3.js, issues4.js
+and partsDetailAutomation.js, each stage writes a small JSON file next to
+its script. The script loads it at run time (file picker or URL) and checks
+the schema name, version and stage before using it.
+
+    {"schema": "jde-automation-queue", "version": 1, "stage": "issues4",
+     "generated_at": "...", "count": 2, "items": [{"wo": "615053", "date": "04/07/2026"}, ...]}
+"""
+import json
+import os
+from datetime import datetime
+
+from timing import span
+
+SCHEMA = 'jde-automation-queue'
+VERSION = 1
+
+# Required item fields and their JSON types for each stage; a dict describes a list of nested items
+STAGE_FIELDS = {
+    'wo_creation': {'branch': str, 'wo': str, 'isFirstRun': bool, 'branchChanged': bool},
+    'dragon3': {'wo': str, 'lines': {'itemNumber': str, 'quantity': (int, float)}},
+    'issues4': {'wo': str, 'date': (str, type(None))},
+    'parts_check': {'wo': str},
+}
+
+PAYLOAD_FILES = {
+    'wo_creation': os.path.join('01 woCreation', 'WoCreation.payload.json'),
+    'dragon3': os.path.join('02 enterWO', 'dragon3.payload.json'),
+    'issues4': os.path.join('03 issue', 'issues4.payload.json'),
+    'parts_check': os.path.join('05 check', 'partsDetailAutomation.payload.json'),
+}
+
+
+def validate_items(stage: str, items: list):
+    """Raise ValueError if any item is missing a field or has the wrong type"""
+    if stage not in STAGE_FIELDS:
+        raise ValueError(f"Unknown payload stage '{stage}'")
+    _validate_fields(stage, STAGE_FIELDS[stage], items)
+
+
+def _validate_fields(label: str, fields: dict, items: list):
+    for index, item in enumerate(items):
+        for field, expected in fields.items():
+            if field not in item:
+                raise ValueError(f"{label} item {index} is missing '{field}': {item}")
+            value = item[field]
+            if isinstance(expected, dict):
+                if not isinstance(value, list) or not value:
+                    raise ValueError(f"{label} item {index} field '{field}' must be a non-empty list")
+                _validate_fields(f"{label} item {index} {field}", expected, value)
+            # bool is an int subclass; don't let True pass as a quantity
+            elif not isinstance(value, expected) or (isinstance(value, bool) and expected is not bool):
+                raise ValueError(f"{label} item {index} field '{field}' has invalid value {value!r}")
+
+
+def write_payload(path: str, stage: str, items: list) -> int:
+    """Validate and write a stage's queue as compact JSON; returns the item count"""
+    with span('payload', stage, rows=len(items)):
+        _write_payload(path, stage, items)
+    print(f"Wrote {len(items)} {stage} items to {path}")
+    return len(items)
+
+
+def _write_payload(path: str, stage: str, items: list):
+    validate_items(stage, items)
+    payload = {
+        'schema': SCHEMA,
+        'version': VERSION,
+        'stage': stage,
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'count': len(items),
+        'items': items,
+    }
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8', newline='\n') as f:
+        json.dump(payload, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+def read_payload(path: str, stage: str) -> list:
+    """Load a payload and return its items after checking schema, version and stage"""
+    with open(path, 'r', encoding='utf-8') as f:
+        payload = json.load(f)
+    if payload.get('schema') != SCHEMA or payload.get('version') != VERSION:
+        raise ValueError(f"{path} is not a {SCHEMA} v{VERSION} payload")
+    if payload.get('stage') != stage:
+        raise ValueError(f"{path} holds '{payload.get('stage')}' data, expected '{stage}'")
+    validate_items(stage, payload['items'])
+    return payload['items']
@@ -0,0 +1,209 @@
+"""Lightweight timing spans written as JSON lines.
+
+    from timing import span
+    with span('page', pdf=filename, page=3) as s:
+        ...
+        s.set(rows=len(df))
+
+Spans are only recorded when a log is configured, via configure(path) or the
+JDE_TIMING_LOG environment variable (which worker processes inherit);
+otherwise span() does almost nothing. Each line holds the span kind, name,
+start time, duration, span/parent/trace ids, pid, thread and any attributes.
+Token counts recorded on a span are also added to its parent, so a page
+carries the tokens of its API calls and a stage the tokens of its pages.
+
+    python timing.py report timing_spans.jsonl          # latest run
+    python timing.py report timing_spans.jsonl --all    # every run in the file
+"""
+import argparse
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+import pandas as pd
+
+LOG_ENV = 'JDE_TIMING_LOG'
+TRACE_ENV = 'JDE_TIMING_TRACE'
+# Attributes summed into the parent span when a span ends
+ROLLUP = ('input_tokens', 'output_tokens', 'cache_read_tokens', 'cache_write_tokens', 'api_calls')
+
+_lock = threading.Lock()
+_current = contextvars.ContextVar('timing_span', default=None)
+
+
+class Span:
+    def __init__(self, kind, name, parent, attrs):
+        self.kind = kind
+        self.name = name
+        self.id = uuid.uuid4().hex[:12]
+        self.parent = parent
+        self.attrs = attrs
+
+    def set(self, **attrs):
+        """Record attributes (row counts, token counts, ...) on the span"""
+        self.attrs.update(attrs)
+
+    def add(self, **counts):
+        """Add to numeric attributes; safe to call from other threads"""
+        with _lock:
+            for key, value in counts.items():
+                if value:
+                    self.attrs[key] = self.attrs.get(key, 0) + value
+
+
+class _NullSpan:
+    id = None
+
+    def set(self, **attrs):
+        pass
+
+    def add(self, **counts):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+def configure(path: str, new_trace: bool = True) -> str:
+    """Send spans from this process and its workers to `path`; returns the trace id"""
+    os.environ[LOG_ENV] = os.path.abspath(path)
+    if new_trace or TRACE_ENV not in os.environ:
+        os.environ[TRACE_ENV] = uuid.uuid4().hex[:12]
+    return os.environ[TRACE_ENV]
+
+
+def current():
+    """The innermost open span in this thread (pass it as parent= to work done on other threads)"""
+    return _current.get() or NULL_SPAN
+
+
+@contextmanager
+def span(kind: str, name: str = None, parent=None, **attrs):
+    """Time the enclosed block as one span of the given kind"""
+    path = os.environ.get(LOG_ENV)
+    if not path:
+        yield NULL_SPAN
+        return
+
+    parent = parent if parent is not None else _current.get()
+    if parent is NULL_SPAN:
+        parent = None
+    record = Span(kind, name, parent, attrs)
+    token = _current.set(record)
+    started = time.time()
+    clock = time.perf_counter()
+    try:
+        yield record
+    except BaseException as e:
+        record.attrs['error'] = type(e).__name__
+        raise
+    finally:
+        duration = time.perf_counter() - clock
+        _current.reset(token)
+        if parent is not None:
+            parent.add(**{key: record.attrs[key] for key in ROLLUP if key in record.attrs})
+        _write(path, {
+            'kind': kind,
+            'name': name,
+            'start': round(started, 6),
+            'duration_s': round(duration, 6),
+            'span_id': record.id,
+            'parent_id': parent.id if parent is not None else None,
+            'trace_id': os.environ.get(TRACE_ENV),
+            'pid': os.getpid(),
+            'thread': threading.current_thread().name,
+            **record.attrs,
+        })
+
+
+def _write(path: str, entry: dict):
+    line = json.dumps(entry, default=str) + '\n'
+    with _lock:
+        # One append per line keeps lines from different processes whole
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(line)
+
+
+# --- Report ---
+
+def load_spans(path: str, trace: str = 'last') -> pd.DataFrame:
+    """Read a span log; trace='last' keeps only the most recent run, None keeps all"""
+    with open(path, 'r', encoding='utf-8') as f:
+        df = pd.DataFrame([json.loads(line) for line in f if line.strip()])
+    if df.empty or trace is None:
+        return df
+    if trace == 'last':
+        trace = df.loc[df['start'].idxmax(), 'trace_id']
+    return df[df['trace_id'] == trace].reset_index(drop=True)
+
+
+def _table(df, columns):
+    columns = [col for col in columns if col in df.columns and df[col].notna().any()]
+    return df[columns].round(3).to_string(index=False)
+
+
+def report(df: pd.DataFrame, top: int = 10) -> str:
+    """Text summary: time per span kind, stages, slowest PDFs, pages and API calls"""
+    if df.empty:
+        return "No spans recorded"
+    for column in ROLLUP + ('rows', 'pdf', 'page', 'pages'):
+        if column not in df.columns:
+            df[column] = None
+    lines = []
+
+    by_kind = df.groupby('kind')['duration_s'].agg(['count', 'sum', 'mean', 'max'])
+    by_kind['p95'] = df.groupby('kind')['duration_s'].quantile(0.95)
+    lines.append("Time by span kind (seconds):")
+    lines.append(by_kind.sort_values('sum', ascending=False).round(3).to_string())
+
+    stages = df[df['kind'] == 'stage']
+    if len(stages):
+        lines.append("\nStages:")
+        lines.append(_table(stages.sort_values('start'), ['name', 'duration_s', 'rows'] + list(ROLLUP)))
+
+    pdfs = df[df['pdf'].notna() & df['kind'].isin(['pdf_read', 'page', 'batch'])]
+    if len(pdfs):
+        per_pdf = pdfs.pivot_table(index='pdf', columns='kind', values='duration_s', aggfunc='sum', fill_value=0)
+        per_pdf['total'] = per_pdf.sum(axis=1)
+        lines.append("\nSlowest PDFs (summed span seconds):")
+        lines.append(per_pdf.sort_values('total', ascending=False).head(top).round(3).to_string())
+
+    pages = df[df['kind'].isin(['page', 'batch'])]
+    if len(pages):
+        lines.append("\nSlowest pages:")
+        lines.append(_table(pages.nlargest(top, 'duration_s'),
+                            ['kind', 'name', 'duration_s', 'rows', 'input_tokens', 'output_tokens', 'error']))
+
+    calls = df[df['kind'] == 'api_call']
+    if len(calls):
+        lines.append(f"\nAPI calls: {len(calls)}, p50 {calls['duration_s'].median():.2f}s, "
+                     f"p95 {calls['duration_s'].quantile(0.95):.2f}s")
+        lines.append(_table(calls.nlargest(top, 'duration_s'),
+                            ['name', 'duration_s', 'input_tokens', 'output_tokens', 'error']))
+        totals = {key: int(calls[key].fillna(0).sum()) for key in ROLLUP if key in calls and calls[key].notna().any()}
+        if totals:
+            lines.append("Tokens: " + ", ".join(f"{key}={value}" for key, value in totals.items()))
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarise a JSON-lines timing span log")
+    sub = parser.add_subparsers(dest='command', required=True)
+    report_parser = sub.add_parser('report', help="Show the slowest stages, PDFs, pages and API calls")
+    report_parser.add_argument('log', help="Span log written by --timing-log")
+    report_parser.add_argument('--top', type=int, default=10)
+    report_parser.add_argument('--all', action='store_true', help="Include every run, not just the latest")
+    report_parser.add_argument('--trace', default=None, help="Report one run by trace id")
+    args = parser.parse_args()
+
+    pd.set_option('display.width', 200)
+    df = load_spans(args.log, None if args.all else (args.trace or 'last'))
+    print(report(df, args.top))
+
+
+if __name__ == '__main__':
+    main()
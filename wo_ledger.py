@@ -0,0 +1,245 @@
+"""Per-work-order status ledger shared by every stage.
+
+One SQLite row per (work order, stage) records whether that step is done or
+failed, so a re-run after a partial failure only queues the work that is
+left. The queue generators (wo.py, update_csv.py, updatearray.py,
+update_vbs.py and 05 check/update.py) drop work orders already done for
+their stage; results come back from the browser scripts as
+<stage>.results.json downloads and from the AutoIt upload log.
+
+Work orders are system WOs, except for 'created', which is keyed by the
+WoData.txt work order (the system WO only exists afterwards and is kept in
+the detail column).
+
+    python wo_ledger.py show                       # status of every work order
+    python wo_ledger.py show 615053 --stage issued
+    python wo_ledger.py import created created.results.json
+    python wo_ledger.py import uploaded "04 upload/Autoit/upload_log.csv"
+    python wo_ledger.py mark issued 615053 615054
+    python wo_ledger.py reset 615053 --stage issued # queue it again
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sqlite3
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DB_ENV = 'JDE_WO_LEDGER'
+DEFAULT_DB = os.environ.get(DB_ENV) or os.path.join(ROOT, 'wo_ledger.db')
+
+STAGES = ['extracted', 'created', 'parts_entered', 'issued', 'uploaded', 'checked']
+STATUSES = ['done', 'failed']
+RESULTS_SCHEMA = 'jde-automation-results'
+
+
+class WOLedger:
+    """(work order, stage) -> status store backed by SQLite"""
+
+    def __init__(self, db_path: str = DEFAULT_DB):
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS wo_status (
+                wo TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                status TEXT NOT NULL,
+                detail TEXT,
+                updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (wo, stage)
+            )""")
+        self.conn.commit()
+
+    def mark(self, stage: str, work_orders, status: str = 'done', detail: str = None) -> int:
+        """Set the status of work orders for a stage; work_orders may also be (wo, detail) pairs"""
+        _check(stage, status)
+        rows = []
+        for entry in work_orders:
+            wo, wo_detail = entry if isinstance(entry, tuple) else (entry, detail)
+            wo = str(wo).strip()
+            if wo:
+                rows.append((wo, stage, status, wo_detail))
+        with self.conn:
+            self.conn.executemany("""
+                INSERT INTO wo_status (wo, stage, status, detail) VALUES (?, ?, ?, ?)
+                ON CONFLICT (wo, stage)
+                DO UPDATE SET status = excluded.status, detail = excluded.detail, updated_at = CURRENT_TIMESTAMP
+                """, rows)
+        return len(rows)
+
+    def completed(self, stage: str) -> set:
+        _check(stage)
+        return {row[0] for row in self.conn.execute(
+            "SELECT wo FROM wo_status WHERE stage = ? AND status = 'done'", (stage,))}
+
+    def reset(self, stage: str = None, work_orders=None) -> int:
+        """Forget statuses so the work is queued again; no arguments clears everything"""
+        if stage is not None:
+            _check(stage)
+        clauses, params = [], []
+        if stage is not None:
+            clauses.append("stage = ?")
+            params.append(stage)
+        if work_orders:
+            work_orders = [str(wo).strip() for wo in work_orders]
+            clauses.append(f"wo IN ({','.join('?' * len(work_orders))})")
+            params.extend(work_orders)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ''
+        with self.conn:
+            return self.conn.execute(f"DELETE FROM wo_status{where}", params).rowcount
+
+    def statuses(self, work_orders=None, stage: str = None, status: str = None) -> pd.DataFrame:
+        query = "SELECT wo, stage, status, detail, updated_at FROM wo_status WHERE 1 = 1"
+        params = []
+        if work_orders:
+            query += f" AND wo IN ({','.join('?' * len(work_orders))})"
+            params.extend(str(wo) for wo in work_orders)
+        if stage:
+            query += " AND stage = ?"
+            params.append(stage)
+        if status:
+            query += " AND status = ?"
+            params.append(status)
+        return pd.read_sql_query(query + " ORDER BY wo, stage", self.conn, params=params, dtype='string')
+
+    def close(self):
+        self.conn.close()
+
+
+def _check(stage: str, status: str = 'done'):
+    if stage not in STAGES:
+        raise ValueError(f"Unknown ledger stage '{stage}' (expected one of {', '.join(STAGES)})")
+    if status not in STATUSES:
+        raise ValueError(f"Unknown status '{status}' (expected one of {', '.join(STATUSES)})")
+
+
+def completed_work_orders(stage: str, db_path: str = DEFAULT_DB) -> set:
+    """Work orders done for a stage; an empty set when there is no ledger yet"""
+    if not db_path or not os.path.exists(db_path):
+        return set()
+    ledger = WOLedger(db_path)
+    try:
+        return ledger.completed(stage)
+    finally:
+        ledger.close()
+
+
+def skip_completed(stage: str, items: list, key=lambda item: item['wo'], db_path: str = DEFAULT_DB) -> list:
+    """Drop queue items whose work order is already done for the stage (db_path=None keeps all)"""
+    done = completed_work_orders(stage, db_path)
+    if not done:
+        return items
+    pending = [item for item in items if str(key(item)).strip() not in done]
+    skipped = {str(key(item)).strip() for item in items} & done
+    if skipped:
+        print(f"Skipping {len(skipped)} work orders already {stage} (see wo_ledger.py show --stage {stage})")
+    return pending
+
+
+def fingerprint(stage: str, db_path: str = DEFAULT_DB) -> str:
+    """Hash of the done set for a stage, so cached queues are rebuilt when it changes"""
+    done = sorted(completed_work_orders(stage, db_path))
+    return hashlib.sha256("\n".join(done).encode('utf-8')).hexdigest()
+
+
+def read_results(path: str, stage: str) -> list:
+    """(wo, status, detail) tuples from a results file
+
+    Accepts the <stage>.results.json downloads written by the browser
+    scripts, the upload_log.csv built by txtToCsv.py (one uploaded PDF per
+    row, named after its work order) and plain text lists of work orders.
+    """
+    if path.lower().endswith('.json'):
+        with open(path, 'r', encoding='utf-8') as f:
+            payload = json.load(f)
+        if payload.get('schema') != RESULTS_SCHEMA:
+            raise ValueError(f"{path} is not a {RESULTS_SCHEMA} file")
+        if payload.get('stage') != stage:
+            raise ValueError(f"{path} holds '{payload.get('stage')}' results, expected '{stage}'")
+        # A work order retried within one run keeps its last outcome
+        latest = {str(item['wo']).split()[0]: item for item in payload['items'] if str(item.get('wo', '')).strip()}
+        return [(wo, item.get('status', 'done'), item.get('detail')) for wo, item in latest.items()]
+    if path.lower().endswith('.csv'):
+        with open(path, 'r', newline='', encoding='utf-8') as f:
+            return [(os.path.splitext(row['Filename'])[0], 'done', row.get('Timestamp'))
+                    for row in csv.DictReader(f) if row.get('Filename')]
+    with open(path, 'r', encoding='utf-8') as f:
+        return [(line.split()[0], 'done', None) for line in f if line.strip()]
+
+
+def import_results(ledger: WOLedger, stage: str, path: str) -> dict:
+    """Record a results file in the ledger; returns the count per status"""
+    counts = {}
+    for status in STATUSES:
+        rows = [(wo, detail) for wo, row_status, detail in read_results(path, stage) if row_status == status]
+        counts[status] = ledger.mark(stage, rows, status=status)
+    return counts
+
+
+def summary_table(df: pd.DataFrame) -> pd.DataFrame:
+    """One row per work order with a column per stage ('done', 'failed' or blank)"""
+    table = df.pivot(index='wo', columns='stage', values='status')
+    return table.reindex(columns=[stage for stage in STAGES if stage in table.columns]).fillna('')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect and update the per-work-order status ledger")
+    parser.add_argument('--db', default=DEFAULT_DB, help=f"Ledger database (default: ${DB_ENV} or wo_ledger.db)")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    show_parser = sub.add_parser('show', help="Show status per work order and stage")
+    show_parser.add_argument('work_orders', nargs='*')
+    show_parser.add_argument('--stage', choices=STAGES)
+    show_parser.add_argument('--status', choices=STATUSES)
+    show_parser.add_argument('--details', action='store_true', help="List rows with detail and time instead of a grid")
+
+    mark_parser = sub.add_parser('mark', help="Record work orders as done (or failed) for a stage")
+    mark_parser.add_argument('stage', choices=STAGES)
+    mark_parser.add_argument('work_orders', nargs='*')
+    mark_parser.add_argument('--file', help="Text file with one work order per line (first column)")
+    mark_parser.add_argument('--status', choices=STATUSES, default='done')
+    mark_parser.add_argument('--detail')
+
+    import_parser = sub.add_parser('import', help="Record a <stage>.results.json or upload_log.csv")
+    import_parser.add_argument('stage', choices=STAGES)
+    import_parser.add_argument('path')
+
+    reset_parser = sub.add_parser('reset', help="Forget statuses so the work is queued again")
+    reset_parser.add_argument('work_orders', nargs='*')
+    reset_parser.add_argument('--stage', choices=STAGES)
+    reset_parser.add_argument('--all', action='store_true', help="Required to reset every stage of every work order")
+    args = parser.parse_args()
+
+    ledger = WOLedger(args.db)
+    try:
+        if args.command == 'show':
+            df = ledger.statuses(args.work_orders, args.stage, args.status)
+            if df.empty:
+                print("No matching work orders in the ledger")
+                return
+            pd.set_option('display.width', 200)
+            print(df.to_string(index=False) if args.details else summary_table(df).to_string())
+            counts = df.groupby(['stage', 'status']).size().unstack(fill_value=0)
+            print(f"\n{df['wo'].nunique()} work orders\n{counts.reindex([s for s in STAGES if s in counts.index])}")
+        elif args.command == 'mark':
+            work_orders = list(args.work_orders)
+            if args.file:
+                work_orders += [wo for wo, _, _ in read_results(args.file, args.stage)]
+            count = ledger.mark(args.stage, work_orders, args.status, args.detail)
+            print(f"Marked {count} work orders {args.status} for {args.stage}")
+        elif args.command == 'import':
+            counts = import_results(ledger, args.stage, args.path)
+            print(f"Imported {args.path}: " + ", ".join(f"{count} {status}" for status, count in counts.items()))
+        elif args.command == 'reset':
+            if args.stage is None and not args.work_orders and not args.all:
+                parser.error("name a stage and/or work orders, or pass --all")
+            count = ledger.reset(args.stage, args.work_orders)
+            print(f"Reset {count} ledger entries")
+    finally:
+        ledger.close()
+
+
+if __name__ == '__main__':
+    main()